@@ -98,9 +98,20 @@ from state import CareerBotState
 from config import OPENAI_API_KEY
 import json
 import re
+import os
+import sys
+import time
 
-# 🔐 Set up OpenAI client
-llm = OpenAI(api_key=OPENAI_API_KEY)
+# Shared LLM utilities live with the career simulator in demo/
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "demo"))
+from agents.career_simulator.utils.http_client import get_http_client
+from agents.career_simulator.utils.json_repair import loads_tolerant
+from agents.career_simulator.utils.llm_metrics import track_llm_call
+from agents.career_simulator.utils.model_router import get_model_router
+from agents.career_simulator.utils.rate_limiter import Priority, estimate_tokens, get_rate_limiter
+
+# 🔐 Set up OpenAI client (on the shared keep-alive connection pool)
+llm = OpenAI(api_key=OPENAI_API_KEY, http_client=get_http_client())
 
 # 📋 Required fields for each downstream agent
 AGENT_REQUIRED_FIELDS = {
@@ -109,6 +120,38 @@ AGENT_REQUIRED_FIELDS = {
     "planning_agent": ["current_role", "goal", "timeline_months"],
 }
 
+# 🧾 Reply schema: the model answers through a forced function call with these arguments
+INTERFACE_REPLY_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "interface_reply",
+        "description": "Reply to the user and report the career data collected so far",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "assistant_message": {"type": "string", "description": "Your friendly reply to the user"},
+                "updated_user_data": {"type": "object", "description": "Only fields found in this input"},
+                "missing_fields": {"type": "array", "items": {"type": "string"}},
+                "agent_queue": {
+                    "type": "array",
+                    "items": {"type": "string", "enum": [
+                        "salary_agent", "planning_agent", "transition_agent", "upskill_agent", "simulator_agent"
+                    ]}
+                }
+            },
+            "required": ["assistant_message", "updated_user_data", "missing_fields", "agent_queue"]
+        }
+    }
+}
+
+# 🔥 Background prefetch of simulator data for roles mentioned in chat
+def prefetch_roles(user_data: dict) -> None:
+    try:
+        from graph_flow import prefetch_career_data
+        prefetch_career_data(user_data)
+    except Exception as e:
+        print("⚠️ Role prefetch unavailable:", e)
+
 # 🧠 Interface agent node — this runs on each user message
 def interface(state: CareerBotState) -> CareerBotState:
     # Initialize defaults
@@ -224,23 +267,45 @@ Your reply must ALWAYS be in valid JSON format like this:
     # # No routing yet — stay in convo
     # state["next"] = "interface"
     # return state
-    # Send to LLM
-    response = llm.chat.completions.create(
-        model="gpt-4",
-        temperature=0.3,
-        messages=messages
-    )
-
-    # Parse response
-    raw_output = response.choices[0].message.content.strip()
+    # Send to LLM (the reply is user-facing, so the router sends it to the strong tier)
+    model_router = get_model_router()
+    tier = model_router.tier_for("manager_interface")
+    rate_limiter = get_rate_limiter()
+    reserved_tokens = estimate_tokens(messages, tier.model_name)
+    start = time.perf_counter()
+    with track_llm_call("manager_interface", tier.model_name) as call:
+        rate_limiter.acquire(reserved_tokens, Priority.INTERACTIVE)
+        try:
+            response = llm.chat.completions.create(
+                model=tier.model_name,
+                temperature=0.3,
+                messages=messages,
+                tools=[INTERFACE_REPLY_TOOL],
+                tool_choice={"type": "function", "function": {"name": "interface_reply"}},
+                timeout=tier.latency_budget_seconds
+            )
+        except Exception:
+            model_router.record(tier, time.perf_counter() - start, error=True)
+            raise
+        model_router.record(tier, time.perf_counter() - start)
+        if response.usage is not None:
+            call.add_tokens(response.usage.prompt_tokens, response.usage.completion_tokens)
+            rate_limiter.settle(reserved_tokens, response.usage.total_tokens)
+
+    # Parse response: the function call arguments, or the message text if the model answered directly
+    message = response.choices[0].message
+    if message.tool_calls:
+        raw_output = message.tool_calls[0].function.arguments
+    else:
+        raw_output = (message.content or "").strip()
 
     # Just print the output for debugging (you can remove this after the issue is resolved)
     print('raw op', raw_output, type(raw_output))
 
-    # Parse the raw_output as a JSON string
+    # Parse the raw_output as a JSON string, repairing near-valid JSON instead of failing the turn
     try:
         print('trying json loads')
-        parsed = json.loads(raw_output)
+        parsed = loads_tolerant(raw_output)
         print(parsed["assistant_message"])
     except Exception as e:
         print("❌ Failed to parse JSON:", e)
@@ -257,6 +322,10 @@ Your reply must ALWAYS be in valid JSON format like this:
     state["user_data"].update(updated_data)
     state["chat_history"].append({"role": "assistant", "content": reply})
     state["agent_queue"] = agent_queue
+
+    # Warm simulator data for newly mentioned roles while the conversation continues
+    if "current_role" in updated_data or "target_role" in updated_data:
+        prefetch_roles(state["user_data"])
     print('built state sucessfully', state)
 
     # Check if we need more info for next agent
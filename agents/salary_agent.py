@@ -8,9 +8,18 @@ from tools.salary_tools import (
     compare_state_industries
 )
 from config import OPENAI_API_KEY
+import os
+import sys
 
-# 🔐 LLM setup
-llm = ChatOpenAI(model="gpt-4", temperature=0.3, api_key=OPENAI_API_KEY)
+# Shared LLM utilities live with the career simulator in demo/
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "demo"))
+from agents.career_simulator.utils.http_client import get_async_http_client, get_http_client
+from agents.career_simulator.utils.rate_limiter import LangChainRateLimiter, Priority, get_rate_limiter
+
+# 🔐 LLM setup (shares the process-wide OpenAI rate limit and connection pool)
+llm = ChatOpenAI(model="gpt-4", temperature=0.3, api_key=OPENAI_API_KEY,
+                 rate_limiter=LangChainRateLimiter(get_rate_limiter(), Priority.INTERACTIVE),
+                 http_client=get_http_client(), http_async_client=get_async_http_client())
 
 # 📦 LangGraph-compatible ToolNode (no initialize_agent anymore!)
 salary_node = ToolNode(
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The career simulator package lives under demo/ (see graph_flow.py)
+sys.path.append(os.path.join(os.path.dirname(__file__), "demo"))
+
+# Interactive script, not a test module
+collect_ignore = ["interface_test.py"]
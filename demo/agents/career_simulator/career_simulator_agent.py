@@ -1,12 +1,17 @@
 import os
-from typing import Dict, List, Any
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future
+from typing import Dict, List, Any, Optional
 
 from .models.transition_model import CareerTransitionModel
+from .models.simulation_executors import SimulationExecutor
 from .models.salary_model import SalaryModel
 from .models.skill_model import SkillModel
 from .models.market_model import MarketModel
 from .utils.llm_manager import LLMManager
 from .utils.data_loader import DataLoader
+from .utils.prefetch import RolePrefetcher
 
 class CareerSimulatorAgent:
     """
@@ -19,24 +24,52 @@ class CareerSimulatorAgent:
     Each simulation includes detailed transition steps, timeline estimates, and rationales.
     """
     
-    def __init__(self, salary_data_dir: str = "salary_trends_datasets", use_llm: bool = True):
+    def __init__(self, salary_data_dir: str = "salary_trends_datasets", use_llm: bool = True,
+                 executor: SimulationExecutor = None):
         """
         Initialize CareerSimulatorAgent with necessary components.
+        
+        Args:
+            salary_data_dir: Salary data directory or compensation CSV path
+            use_llm: Whether to use the LLM for dynamic data
+            executor: Executor that runs simulation blocks (None runs in process)
         """
         # Print the exact path being used (for debugging)
         print(f"Initializing CareerSimulatorAgent with salary_data_dir: {salary_data_dir}")
         
-        # Initialize data loader
+        # Initialize data loader (datasets load on first use or warmup())
         self.data_loader = DataLoader(salary_data_dir)
         
         # Initialize LLM manager if enabled
         self.llm_manager = LLMManager(use_llm)
         
         # Initialize models
-        self.transition_model = CareerTransitionModel(self.llm_manager)
+        self.transition_model = CareerTransitionModel(self.llm_manager, executor=executor)
         self.salary_model = SalaryModel(self.data_loader, self.llm_manager)
         self.skill_model = SkillModel(self.data_loader, self.llm_manager)
         self.market_model = MarketModel(self.data_loader, self.llm_manager)
+        
+        # Warms role data in the background while the user is still chatting
+        self.prefetcher = RolePrefetcher(self.llm_manager, self.data_loader)
+    
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the salary and job posting data has been loaded."""
+        return self.data_loader.is_loaded
+    
+    def warmup(self) -> "CareerSimulatorAgent":
+        """Load the salary and job posting data now instead of on the first simulation."""
+        self.data_loader.warmup()
+        return self
+    
+    def prefetch_roles(self, current_role: Optional[str], target_role: Optional[str] = None,
+                       current_skills: Optional[List[str]] = None) -> Optional[Future]:
+        """
+        Start warming the caches a simulation for these roles will read.
+        
+        Returns immediately; see RolePrefetcher.prefetch.
+        """
+        return self.prefetcher.prefetch(current_role, target_role, current_skills)
     
     def load_profile_from_dict(self, profile_dict: Dict) -> Dict:
         """
@@ -85,6 +118,13 @@ class CareerSimulatorAgent:
         # Get simulation parameters
         n_steps = input_dict.get('n_steps', 48)
         n_simulations = input_dict.get('n_simulations', 1000)
+        step_resolution = input_dict.get('step_resolution', 'monthly')
+        seed = input_dict.get('seed')
+        # Exact long-horizon outlook; computed without sampling, so it may exceed n_steps cheaply
+        horizon_months = input_dict.get('horizon_months', n_steps)
+        
+        # Fetch all LLM data for this request in one round trip
+        self._prefetch_career_context(user_profile)
         
         # Get intermediate roles
         intermediate_roles = self.transition_model.identify_intermediate_roles(
@@ -100,7 +140,12 @@ class CareerSimulatorAgent:
         
         # Run simulation
         simulation_results = self.transition_model.simulate_career_paths(
-            user_profile, n_steps, n_simulations
+            user_profile, n_steps, n_simulations, step_resolution, seed
+        )
+        
+        # Evaluate the outlook at the horizon from the same transition matrix
+        horizon = self.transition_model.evaluate_horizon(
+            user_profile, horizon_months, simulation_results.get('transition_data')
         )
         
         # Create career graph
@@ -208,7 +253,14 @@ class CareerSimulatorAgent:
                 "transition_time_years": years,
                 "transition_time_months": months,
                 "difficulty": difficulty,
-                "n_simulations": n_simulations
+                "n_simulations": n_simulations,
+                "step_resolution": step_resolution,
+                "horizon": {
+                    "months": horizon['horizon_months'],
+                    "target_role_prob": horizon['target_role_prob'],
+                    "reached_target_prob": horizon['reached_target_prob'],
+                    "state_probs": dict(zip(horizon['states'], horizon['state_probs']))
+                }
             },
             "skills": {
                 "match_percentage": skill_gap_analysis.get('skill_match_percent', 0),
@@ -225,22 +277,71 @@ class CareerSimulatorAgent:
             "intermediate_roles": intermediate_roles
         }
     
+    async def aprocess(self, input_dict: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Async version of process for callers running inside an event loop.
+        
+        The combined LLM context is awaited first to warm the caches, then the
+        rest of the pipeline runs in a worker thread so the event loop stays
+        free for other requests.
+        """
+        user_profile = self.load_profile_from_dict(input_dict)
+        await self._awarm_llm_caches(user_profile)
+        return await asyncio.to_thread(self.process, input_dict)
+    
+    def _prefetch_career_context(self, user_profile: Dict[str, Any]) -> None:
+        """Warm the LLM caches with one combined call; the models fall back to individual calls on failure."""
+        if not self.llm_manager.llm_available:
+            return
+        
+        try:
+            self.llm_manager.get_career_context(
+                user_profile['current_role'], user_profile['target_role'], user_profile['current_skills']
+            )
+        except Exception as e:
+            print(f"Combined career context unavailable, using individual LLM calls: {str(e)}")
+    
+    async def _awarm_llm_caches(self, user_profile: Dict[str, Any]) -> None:
+        """Async version of _prefetch_career_context."""
+        if not self.llm_manager.llm_available or not user_profile['current_role'] or not user_profile['target_role']:
+            return
+        
+        try:
+            await self.llm_manager.aget_career_context(
+                user_profile['current_role'], user_profile['target_role'], user_profile['current_skills']
+            )
+        except Exception as e:
+            print(f"Combined career context unavailable, using individual LLM calls: {str(e)}")
+    
+    def process_batch(self, input_dicts: List[Dict[str, Any]], max_concurrency: int = 4) -> List[Dict[str, Any]]:
+        """
+        Process many user profiles, e.g. when re-scoring the whole user base.
+        
+        Profiles are processed concurrently on threads (the LLM calls are I/O bound),
+        while every simulation is distributed through the configured executor.
+        
+        Args:
+            input_dicts: User profiles in the same format as process()
+            max_concurrency: Maximum number of profiles processed at once
+            
+        Returns:
+            Results in the same order as input_dicts; failed profiles get an error entry
+        """
+        def process_one(input_dict):
+            try:
+                return self.process(input_dict)
+            except Exception as e:
+                return {"error": f"Simulation error: {str(e)}"}
+        
+        with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+            return list(pool.map(process_one, input_dicts))
+    
     def _extract_path_data(self, path_data: Dict, path_type: str, current_role: str, target_role: str) -> Dict:
         """
         Extract structured data from a path simulation.
         """
-        states = path_data.get('states', [])
-        
-        # Extract roles
-        roles = []
-        for state in states:
-            if '_' in state:
-                role = state.split('_')[0]
-                if role not in roles:
-                    roles.append(role)
-            else:
-                if state not in roles:
-                    roles.append(state)
+        # Extract roles from the run-length encoded segments
+        roles = CareerTransitionModel.roles_from_segments(path_data.get('segments', []))
         
         # If path type is management, modify target
         if path_type == "management" and roles:
@@ -369,18 +470,8 @@ Based on your profile and our simulation of {simulation_results.get('n_simulatio
         option1_title = f"Option 1: Fastest Path to {target_role}"
         if sample_paths and len(sample_paths) > 0:
             fastest_path = sample_paths[0]
-            path_states = fastest_path.get('states', [])
-            
             # Extract role names (remove level suffixes)
-            clean_path = []
-            for state in path_states:
-                if '_' in state:
-                    role = state.split('_')[0]
-                    if role not in clean_path:
-                        clean_path.append(role)
-                else:
-                    if state not in clean_path:
-                        clean_path.append(state)
+            clean_path = CareerTransitionModel.roles_from_segments(fastest_path.get('segments', []))
             
             if clean_path:
                 path_str = " → ".join(clean_path)
@@ -483,18 +574,8 @@ Based on your profile and our simulation of {simulation_results.get('n_simulatio
             })
         elif sample_paths and len(sample_paths) > 1:
             medium_path = sample_paths[1]
-            path_states = medium_path.get('states', [])
-            
             # Extract role names (remove level suffixes)
-            clean_path = []
-            for state in path_states:
-                if '_' in state:
-                    role = state.split('_')[0]
-                    if role not in clean_path:
-                        clean_path.append(role)
-                else:
-                    if state not in clean_path:
-                        clean_path.append(state)
+            clean_path = CareerTransitionModel.roles_from_segments(medium_path.get('segments', []))
             
             if clean_path:
                 path_str = " → ".join(clean_path)
@@ -585,18 +666,8 @@ Based on your profile and our simulation of {simulation_results.get('n_simulatio
             })
         elif sample_paths and len(sample_paths) > 2:
             slow_path = sample_paths[2]
-            path_states = slow_path.get('states', [])
-            
             # Extract role names (remove level suffixes)
-            clean_path = []
-            for state in path_states:
-                if '_' in state:
-                    role = state.split('_')[0]
-                    if role not in clean_path:
-                        clean_path.append(role)
-                else:
-                    if state not in clean_path:
-                        clean_path.append(state)
+            clean_path = CareerTransitionModel.roles_from_segments(slow_path.get('segments', []))
             
             # Add management title to final role
             if clean_path and len(clean_path) > 1:
@@ -699,10 +770,14 @@ Based on your profile and our simulation of {simulation_results.get('n_simulatio
             A description of the career path
         """
         # First try using LLM if available
-        if self.llm_manager.use_llm:
-            description = self.llm_manager.get_career_path_description(
-                path_roles, current_role, target_role, path_type, time_estimate
-            )
+        if self.llm_manager.llm_available:
+            try:
+                description = self.llm_manager.get_career_path_description(
+                    path_roles, current_role, target_role, path_type, time_estimate
+                )
+            except RuntimeError as e:
+                print(f"Using a generated path description: {str(e)}")
+                description = None
             if description:
                 return description
         
@@ -25,8 +25,11 @@ class MarketModel:
         
         # Get LLM-generated insights if available
         llm_insights = {}
-        if self.llm_manager.use_llm:
-            llm_insights = self.llm_manager.get_job_market_insights(role)
+        if self.llm_manager.llm_available:
+            try:
+                llm_insights = self.llm_manager.get_job_market_insights(role)
+            except RuntimeError as e:
+                print(f"Using job postings data only for market insights: {str(e)}")
         
         # Combine all insights, prioritizing real data over LLM-generated data
         insights = {
@@ -52,13 +55,8 @@ class MarketModel:
         if not self.data_loader.job_postings_loaded or self.data_loader.job_postings_data is None:
             return insights
             
-        role_lower = role.lower()
-        
         # Find matching job postings
-        matching_postings = self.data_loader.job_postings_data[
-            self.data_loader.job_postings_data['normalized_title'].str.lower().str.contains(role_lower) |
-            self.data_loader.job_postings_data['job_title'].str.lower().str.contains(role_lower)
-        ]
+        matching_postings = self.data_loader.find_matching_postings(role)
         
         if matching_postings.empty:
             return insights
@@ -60,8 +60,12 @@ class SalaryModel:
                 return salary_stats
         
         # Try to get dynamic salary data from LLM
-        if self.llm_manager.use_llm:
-            dynamic_salaries = self.llm_manager.get_default_salaries(level)
+        if self.llm_manager.llm_available:
+            try:
+                dynamic_salaries = self.llm_manager.get_default_salaries(level)
+            except RuntimeError as e:
+                print(f"Using default salary data: {str(e)}")
+                dynamic_salaries = {}
             if dynamic_salaries:
                 salary_stats.update(dynamic_salaries)
                 salary_stats["source"] = f"llm_generated_{level}"
@@ -0,0 +1,309 @@
+"""
+Simulation kernels for the career transition Markov model.
+
+Both engines consume the same pre-drawn uniforms and apply the same
+inverse-CDF comparison, so for a given seed they produce identical paths.
+The Numba engine is optional and used automatically when numba is installed.
+If the kernel fails to compile or to run, the NumPy engine is used instead
+for the rest of the process. Compiled kernels are cached on disk only when
+NUMBA_CACHE_DIR is set (before start), so nothing is written into the
+package tree by default.
+
+Simulations are split into fixed-size blocks, and block b draws from a
+generator seeded with (seed, b). A block range can therefore run anywhere
+(in process, in a process pool or on a remote worker) and the merged counts
+are the same regardless of how the blocks were distributed.
+"""
+import os
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    numba = None
+    NUMBA_AVAILABLE = False
+
+# Number of simulations drawn from one seeded generator
+BLOCK_SIZE = 256
+
+
+def numpy_kernel(cumulative: np.ndarray, start_idx: int, target_mask: np.ndarray,
+                 uniforms: np.ndarray, paths: np.ndarray, first_hit: np.ndarray,
+                 state_counts: np.ndarray) -> None:
+    """
+    Vectorized walk over all simulations at once, one step at a time.
+
+    Fills the preallocated paths, first_hit and state_counts arrays in place.
+    """
+    n_simulations, n_periods = uniforms.shape
+    n_states = cumulative.shape[0]
+
+    current = np.full(n_simulations, start_idx, dtype=paths.dtype)
+    paths[:, 0] = current
+
+    for step in range(n_periods):
+        # Next state is the number of cumulative bounds at or below the draw
+        current = (cumulative[current, :-1] <= uniforms[:, step, None]).sum(axis=1)
+        paths[:, step + 1] = current
+
+    for step in range(n_periods + 1):
+        state_counts[step] += np.bincount(paths[:, step], minlength=n_states)
+
+    hits = target_mask[paths]
+    reached = hits.any(axis=1)
+    first_hit[:] = np.where(reached, hits.argmax(axis=1), -1)
+
+
+def _fused_kernel(cumulative, start_idx, target_mask, uniforms, paths, first_hit, state_counts):
+    """
+    Single pass over preallocated arrays: sampling, first-hit tracking and
+    occupancy counting are fused per simulation. Compiled with Numba.
+    """
+    n_simulations, n_periods = uniforms.shape
+    n_states = cumulative.shape[0]
+
+    for sim in range(n_simulations):
+        current = start_idx
+        paths[sim, 0] = current
+        state_counts[0, current] += 1
+        first_hit[sim] = 0 if target_mask[current] else -1
+
+        for step in range(n_periods):
+            u = uniforms[sim, step]
+            next_idx = 0
+            for j in range(n_states - 1):
+                if cumulative[current, j] <= u:
+                    next_idx += 1
+            current = next_idx
+
+            paths[sim, step + 1] = current
+            state_counts[step + 1, current] += 1
+            if first_hit[sim] < 0 and target_mask[current]:
+                first_hit[sim] = step + 1
+
+
+_compiled_kernel = None
+# Set once the compiled kernel has run successfully
+_numba_verified = False
+# Set when the kernel failed to compile or run; the NumPy engine is used from then on
+_numba_failed = False
+
+
+def _disable_numba(error: Exception) -> None:
+    global _compiled_kernel, _numba_failed
+    _compiled_kernel = None
+    _numba_failed = True
+    print(f"Numba simulation kernel unavailable, falling back to the NumPy engine: {str(error)}")
+
+
+def _get_numba_kernel() -> Optional[Callable]:
+    """Wrap the fused kernel for compilation on first use; None if Numba cannot be used."""
+    global _compiled_kernel
+    if _compiled_kernel is None and not _numba_failed:
+        try:
+            _compiled_kernel = numba.njit(cache=bool(os.getenv("NUMBA_CACHE_DIR")), nogil=True)(_fused_kernel)
+        except Exception as e:
+            _disable_numba(e)
+    return _compiled_kernel
+
+
+def _run_numba_kernel(cumulative: np.ndarray, start_idx: int, target_mask: np.ndarray, uniforms: np.ndarray,
+                      paths: np.ndarray, first_hit: np.ndarray, state_counts: np.ndarray) -> bool:
+    """
+    Run the compiled kernel; returns False, leaving the outputs untouched, if it cannot be used.
+
+    The first call compiles the kernel (or loads it from the cache). It counts
+    into scratch state counts, so a failure part way leaves state_counts as it was.
+    """
+    global _numba_verified
+    kernel = _get_numba_kernel()
+    if kernel is None:
+        return False
+    if _numba_verified:
+        kernel(cumulative, start_idx, target_mask, uniforms, paths, first_hit, state_counts)
+        return True
+
+    scratch_counts = np.zeros_like(state_counts)
+    try:
+        kernel(cumulative, start_idx, target_mask, uniforms, paths, first_hit, scratch_counts)
+    except Exception as e:
+        _disable_numba(e)
+        return False
+    state_counts += scratch_counts
+    _numba_verified = True
+    return True
+
+
+def resolve_engine(engine: str = "auto") -> str:
+    """
+    Resolve the engine name to use.
+
+    'auto' selects Numba when available; requesting 'numba' without it installed,
+    or after its kernel failed, falls back to the NumPy engine.
+    """
+    if engine not in ("auto", "numba", "numpy"):
+        raise ValueError(f"Unknown simulation engine '{engine}'. Expected 'auto', 'numba' or 'numpy'")
+
+    if engine == "numpy":
+        return "numpy"
+    if NUMBA_AVAILABLE and not _numba_failed:
+        return "numba"
+    if engine == "numba" and not NUMBA_AVAILABLE:
+        print("Numba is not installed; falling back to the NumPy simulation engine.")
+    return "numpy"
+
+
+def build_simulation_spec(matrix: np.ndarray, start_idx: int, target_mask: np.ndarray, n_periods: int,
+                          n_simulations: int, seed: Optional[int] = None, engine: str = "auto",
+                          block_size: int = BLOCK_SIZE) -> Dict[str, Any]:
+    """
+    Build a JSON-serializable description of a simulation run.
+
+    A missing seed is replaced with fresh entropy so every block of the run
+    still shares one root seed.
+    """
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy)
+
+    return {
+        "matrix": np.asarray(matrix, dtype=np.float64).tolist(),
+        "start_idx": int(start_idx),
+        "target_mask": [bool(flag) for flag in target_mask],
+        "n_periods": int(n_periods),
+        "n_simulations": int(n_simulations),
+        "seed": int(seed),
+        "engine": engine,
+        "block_size": int(block_size)
+    }
+
+
+def count_blocks(spec: Dict[str, Any]) -> int:
+    """Return the number of seeded blocks in a simulation run."""
+    return -(-spec["n_simulations"] // spec["block_size"])
+
+
+def _block_uniforms(spec: Dict[str, Any], block: int) -> np.ndarray:
+    """Draw the uniforms for one block from its own seeded generator."""
+    start = block * spec["block_size"]
+    size = min(spec["block_size"], spec["n_simulations"] - start)
+    rng = np.random.default_rng([spec["seed"], block])
+    return rng.random((size, spec["n_periods"]))
+
+
+def _run_kernel(spec: Dict[str, Any], cumulative: np.ndarray, uniforms: np.ndarray,
+                state_counts: np.ndarray) -> Dict[str, Any]:
+    """Run the selected kernel over one batch of uniforms."""
+    n_walks = uniforms.shape[0]
+    paths = np.empty((n_walks, spec["n_periods"] + 1), dtype=np.int64)
+    first_hit = np.empty(n_walks, dtype=np.int64)
+    target_mask = np.asarray(spec["target_mask"], dtype=np.bool_)
+
+    engine = resolve_engine(spec["engine"])
+    if engine != "numba" or not _run_numba_kernel(cumulative, spec["start_idx"], target_mask, uniforms,
+                                                  paths, first_hit, state_counts):
+        engine = "numpy"
+        numpy_kernel(cumulative, spec["start_idx"], target_mask, uniforms, paths, first_hit, state_counts)
+
+    return {"paths": paths, "first_hit": first_hit, "engine": engine}
+
+
+def simulate_blocks(spec: Dict[str, Any], block_start: int, block_end: int) -> Dict[str, Any]:
+    """
+    Simulate blocks [block_start, block_end) of a run and return partial counts.
+
+    This is the unit of work shipped to executors and remote workers.
+
+    Returns:
+        Dictionary with state_counts per step, first_hit per simulation in the
+        range (-1 if the target is never reached) and the engine used
+    """
+    cumulative = np.cumsum(np.asarray(spec["matrix"], dtype=np.float64), axis=1)
+    n_states = cumulative.shape[0]
+    state_counts = np.zeros((spec["n_periods"] + 1, n_states), dtype=np.int64)
+
+    first_hits = []
+    engine = resolve_engine(spec["engine"])
+    for block in range(block_start, block_end):
+        output = _run_kernel(spec, cumulative, _block_uniforms(spec, block), state_counts)
+        first_hits.append(output["first_hit"])
+        engine = output["engine"]
+
+    return {
+        "block_start": block_start,
+        "block_end": block_end,
+        "state_counts": state_counts,
+        "first_hit": np.concatenate(first_hits) if first_hits else np.empty(0, dtype=np.int64),
+        "engine": engine
+    }
+
+
+def merge_partials(spec: Dict[str, Any], partials: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge partial block results into totals for the whole run."""
+    n_states = len(spec["matrix"])
+    state_counts = np.zeros((spec["n_periods"] + 1, n_states), dtype=np.int64)
+    first_hits = []
+    engines = []
+
+    for partial in sorted(partials, key=lambda p: p["block_start"]):
+        state_counts += np.asarray(partial["state_counts"], dtype=np.int64)
+        first_hits.append(np.asarray(partial["first_hit"], dtype=np.int64))
+        if partial["engine"] not in engines:
+            engines.append(partial["engine"])
+
+    return {
+        "first_hit": np.concatenate(first_hits) if first_hits else np.empty(0, dtype=np.int64),
+        "state_counts": state_counts,
+        "engine": "+".join(engines)
+    }
+
+
+def replay_path(spec: Dict[str, Any], sim_index: int) -> np.ndarray:
+    """Regenerate the full path of a single simulation from its block seed."""
+    block, row = divmod(sim_index, spec["block_size"])
+    uniforms = _block_uniforms(spec, block)[row:row + 1]
+    cumulative = np.cumsum(np.asarray(spec["matrix"], dtype=np.float64), axis=1)
+    state_counts = np.zeros((spec["n_periods"] + 1, cumulative.shape[0]), dtype=np.int64)
+    return _run_kernel(spec, cumulative, uniforms, state_counts)["paths"][0]
+
+
+def run_simulation(matrix: np.ndarray, start_idx: int, target_mask: np.ndarray, n_periods: int,
+                   n_simulations: int, seed: Optional[int] = None, engine: str = "auto",
+                   executor=None) -> Dict[str, Any]:
+    """
+    Simulate n_simulations walks of n_periods steps through a transition matrix.
+
+    Args:
+        matrix: Row-stochastic transition matrix for one step
+        start_idx: Index of the starting state
+        target_mask: Boolean mask of target states
+        n_periods: Number of steps per walk
+        n_simulations: Number of walks
+        seed: Seed for the random draws (None for a fresh seed)
+        engine: 'auto', 'numba' or 'numpy'
+        executor: SimulationExecutor to distribute blocks with (None runs in process)
+
+    Returns:
+        Dictionary with first_hit step per walk (-1 if the target is never
+        reached), state_counts per step, the engine used and the run spec,
+        which replay_path uses to regenerate individual paths
+    """
+    spec = build_simulation_spec(matrix, start_idx, target_mask, n_periods, n_simulations, seed, engine)
+    n_blocks = count_blocks(spec)
+
+    if executor is None:
+        partials = [simulate_blocks(spec, 0, n_blocks)]
+    else:
+        partials = executor.run_blocks(spec, split_blocks(n_blocks, executor.n_partitions))
+
+    result = merge_partials(spec, partials)
+    result["spec"] = spec
+    return result
+
+
+def split_blocks(n_blocks: int, n_partitions: int) -> List[tuple]:
+    """Split block ids into at most n_partitions contiguous (start, end) ranges."""
+    n_partitions = max(1, min(n_partitions, n_blocks))
+    bounds = np.linspace(0, n_blocks, n_partitions + 1).round().astype(int)
+    return [(int(bounds[i]), int(bounds[i + 1])) for i in range(n_partitions) if bounds[i] < bounds[i + 1]]
@@ -0,0 +1,331 @@
+"""
+Executor backends for distributing career simulations.
+
+Every backend runs the same unit of work, simulate_blocks(spec, start, end),
+and returns partial counts that run_simulation merges:
+
+- InProcessExecutor: runs block ranges in the calling thread
+- LocalProcessExecutor: runs block ranges in a local process pool
+- RemoteExecutor: sends block ranges to SimulationWorkerServer instances over TCP
+
+The remote protocol is a 4-byte big-endian length prefix followed by a UTF-8
+JSON body. Requests carry the serialized transition matrix and a block (seed)
+range; responses carry the partial state counts and first-hit steps. Workers
+can be started on localhost for testing:
+
+    python -m agents.career_simulator.models.simulation_executors --port 8765
+"""
+import argparse
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .simulation_engine import simulate_blocks
+
+_HEADER = struct.Struct(">I")
+
+
+class SimulationExecutor:
+    """
+    Interface for running simulation block ranges.
+    """
+
+    # Number of block ranges a run is split into for this executor
+    n_partitions = 1
+
+    def run_blocks(self, spec: Dict[str, Any], block_ranges: List[Tuple[int, int]]) -> List[Dict[str, Any]]:
+        """Run each (start, end) block range of a spec and return the partial results."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release any resources held by the executor."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class InProcessExecutor(SimulationExecutor):
+    """
+    Runs simulations in the calling thread.
+    """
+
+    def run_blocks(self, spec: Dict[str, Any], block_ranges: List[Tuple[int, int]]) -> List[Dict[str, Any]]:
+        return [simulate_blocks(spec, start, end) for start, end in block_ranges]
+
+
+class LocalProcessExecutor(SimulationExecutor):
+    """
+    Runs simulation block ranges in a local process pool.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """Initialize the pool with max_workers processes (defaults to the CPU count)."""
+        self.n_partitions = max_workers or os.cpu_count() or 1
+        self._pool = ProcessPoolExecutor(max_workers=self.n_partitions)
+
+    def run_blocks(self, spec: Dict[str, Any], block_ranges: List[Tuple[int, int]]) -> List[Dict[str, Any]]:
+        futures = [self._pool.submit(simulate_blocks, spec, start, end) for start, end in block_ranges]
+        return [future.result() for future in futures]
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+
+
+class RemoteExecutor(SimulationExecutor):
+    """
+    Sends simulation block ranges to remote workers over TCP.
+
+    Ranges are assigned to workers round-robin and sent concurrently. If a
+    worker is unreachable, returns an error or a malformed response, the range
+    is retried on the remaining workers before giving up.
+    """
+
+    def __init__(self, addresses: Sequence[Tuple[str, int]], timeout: float = 60.0,
+                 partitions_per_worker: int = 1):
+        """
+        Initialize with worker addresses.
+
+        Args:
+            addresses: (host, port) pairs of running workers
+            timeout: Socket timeout in seconds for one request
+            partitions_per_worker: Number of block ranges to send to each worker
+        """
+        if not addresses:
+            raise ValueError("RemoteExecutor requires at least one worker address")
+
+        self.addresses = [(host, int(port)) for host, port in addresses]
+        self.timeout = timeout
+        self.n_partitions = len(self.addresses) * partitions_per_worker
+        self._threads = ThreadPoolExecutor(max_workers=self.n_partitions)
+
+    def run_blocks(self, spec: Dict[str, Any], block_ranges: List[Tuple[int, int]]) -> List[Dict[str, Any]]:
+        futures = [
+            self._threads.submit(self._run_range, spec, start, end, i)
+            for i, (start, end) in enumerate(block_ranges)
+        ]
+        return [future.result() for future in futures]
+
+    def ping(self) -> List[bool]:
+        """Check which workers are reachable."""
+        status = []
+        for address in self.addresses:
+            try:
+                response = request(address, {"type": "ping"}, self.timeout)
+            except _WORKER_ERRORS:
+                status.append(False)
+                continue
+            status.append(isinstance(response, dict) and response.get("status") == "ok")
+        return status
+
+    def close(self) -> None:
+        self._threads.shutdown(wait=True)
+
+    def _run_range(self, spec: Dict[str, Any], block_start: int, block_end: int, offset: int) -> Dict[str, Any]:
+        """Run one block range, trying each worker in turn starting at offset."""
+        message = {"type": "simulate", "spec": spec, "block_start": block_start, "block_end": block_end}
+        errors = []
+
+        for attempt in range(len(self.addresses)):
+            address = self.addresses[(offset + attempt) % len(self.addresses)]
+            try:
+                return _decode_partial(request(address, message, self.timeout), spec, block_start, block_end)
+            except _WORKER_ERRORS as e:
+                errors.append(f"{address[0]}:{address[1]}: {str(e)}")
+
+        raise RuntimeError(f"All simulation workers failed for blocks {block_start}-{block_end}: {'; '.join(errors)}")
+
+
+# Failures of one worker that the range is retried elsewhere for: network errors,
+# undecodable messages (json and unicode errors are ValueErrors) and bad payloads
+_WORKER_ERRORS = (OSError, ValueError, KeyError, TypeError, struct.error)
+
+
+def _decode_partial(response: Any, spec: Dict[str, Any], block_start: int, block_end: int) -> Dict[str, Any]:
+    """Check a worker's response to a simulate request and convert its counts to arrays."""
+    if not isinstance(response, dict):
+        raise ValueError(f"Unexpected response: {type(response).__name__}")
+    if "error" in response:
+        raise ValueError(response["error"])
+    if (response["block_start"], response["block_end"]) != (block_start, block_end):
+        raise ValueError(f"Response is for blocks {response['block_start']}-{response['block_end']}")
+
+    state_counts = np.asarray(response["state_counts"], dtype=np.int64)
+    first_hit = np.asarray(response["first_hit"], dtype=np.int64)
+    n_walks = min(block_end * spec["block_size"], spec["n_simulations"]) - block_start * spec["block_size"]
+    if state_counts.shape != (spec["n_periods"] + 1, len(spec["matrix"])) or first_hit.shape != (n_walks,):
+        raise ValueError("Response counts do not match the request")
+
+    return dict(response, state_counts=state_counts, first_hit=first_hit)
+
+
+def send_message(sock: socket.socket, message: Dict[str, Any]) -> None:
+    """Send one length-prefixed JSON message."""
+    body = json.dumps(message).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(body)) + body)
+
+
+def receive_message(sock: socket.socket) -> Dict[str, Any]:
+    """Receive one length-prefixed JSON message."""
+    (length,) = _HEADER.unpack(_receive_exactly(sock, _HEADER.size))
+    return json.loads(_receive_exactly(sock, length).decode("utf-8"))
+
+
+def _receive_exactly(sock: socket.socket, size: int) -> bytes:
+    """Read exactly size bytes from a socket."""
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(min(remaining, 1 << 16))
+        if not chunk:
+            raise ConnectionError("Connection closed before the message was complete")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def request(address: Tuple[str, int], message: Dict[str, Any], timeout: float = 60.0) -> Dict[str, Any]:
+    """Send a single request to a worker and wait for its response."""
+    with socket.create_connection(address, timeout=timeout) as sock:
+        send_message(sock, message)
+        return receive_message(sock)
+
+
+class _WorkerHandler(socketserver.BaseRequestHandler):
+    """Handles simulation requests on a worker connection."""
+
+    def handle(self):
+        while True:
+            try:
+                message = receive_message(self.request)
+            except (ConnectionError, struct.error):
+                return
+            except ValueError as e:
+                # Invalid JSON or UTF-8: report it and close, as the client is not speaking the protocol
+                self._reply({"error": f"Malformed message: {str(e)}"})
+                return
+            if not self._reply(handle_message(message)):
+                return
+
+    def _reply(self, response: Dict[str, Any]) -> bool:
+        """Send a response; returns False if the client has gone away."""
+        try:
+            send_message(self.request, response)
+        except OSError:
+            return False
+        return True
+
+
+def handle_message(message: Any) -> Dict[str, Any]:
+    """Process one protocol message and build the response."""
+    if not isinstance(message, dict):
+        return {"error": f"Malformed message: expected an object, got {type(message).__name__}"}
+
+    if message.get("type") == "ping":
+        return {"status": "ok"}
+
+    if message.get("type") != "simulate":
+        return {"error": f"Unknown message type: {message.get('type')}"}
+
+    try:
+        partial = simulate_blocks(message["spec"], message["block_start"], message["block_end"])
+    except Exception as e:
+        return {"error": f"Simulation failed: {str(e)}"}
+
+    return {
+        "block_start": partial["block_start"],
+        "block_end": partial["block_end"],
+        "state_counts": partial["state_counts"].tolist(),
+        "first_hit": partial["first_hit"].tolist(),
+        "engine": partial["engine"]
+    }
+
+
+class SimulationWorkerServer(socketserver.ThreadingTCPServer):
+    """
+    TCP worker that runs simulation block ranges for a RemoteExecutor.
+
+    Use port 0 to bind a free port; the bound address is in server_address.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _WorkerHandler)
+
+    def start_background(self) -> threading.Thread:
+        """Serve requests on a daemon thread, e.g. for a stand-in worker on localhost."""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+def create_executor(kind: str = "inprocess", **kwargs) -> SimulationExecutor:
+    """
+    Create an executor by name.
+
+    Args:
+        kind: 'inprocess', 'process' or 'remote'
+        **kwargs: Backend arguments (max_workers for 'process', addresses for 'remote')
+    """
+    if kind == "inprocess":
+        return InProcessExecutor()
+    if kind == "process":
+        return LocalProcessExecutor(kwargs.get("max_workers"))
+    if kind == "remote":
+        return RemoteExecutor(kwargs["addresses"], timeout=kwargs.get("timeout", 60.0))
+    raise ValueError(f"Unknown executor '{kind}'. Expected 'inprocess', 'process' or 'remote'")
+
+
+def executor_from_env() -> Optional[SimulationExecutor]:
+    """
+    Create an executor from environment variables.
+
+    SIMULATION_EXECUTOR selects the backend ('inprocess', 'process', 'remote');
+    SIMULATION_MAX_WORKERS sizes the process pool and SIMULATION_WORKERS lists
+    remote workers as comma-separated host:port pairs. Returns None when unset.
+    """
+    kind = os.getenv("SIMULATION_EXECUTOR")
+    if not kind:
+        return None
+
+    if kind == "remote":
+        addresses = []
+        for entry in os.getenv("SIMULATION_WORKERS", "").split(","):
+            if entry.strip():
+                host, port = entry.strip().rsplit(":", 1)
+                addresses.append((host, int(port)))
+        return create_executor(kind, addresses=addresses)
+
+    max_workers = os.getenv("SIMULATION_MAX_WORKERS")
+    return create_executor(kind, max_workers=int(max_workers) if max_workers else None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a career simulation worker")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server = SimulationWorkerServer(args.host, args.port)
+    print(f"Simulation worker listening on {server.server_address[0]}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -18,7 +18,12 @@ class SkillModel:
         job_posting_skills = self.data_loader.extract_skills_from_job_posting(role)
         
         # Get skills from LLM
-        llm_skills = self.llm_manager.get_role_skills(role)
+        llm_skills = []
+        if self.llm_manager.llm_available:
+            try:
+                llm_skills = self.llm_manager.get_role_skills(role)
+            except RuntimeError as e:
+                print(f"Using job postings skills only: {str(e)}")
         
         # Combine skills from different sources
         if job_posting_skills:
@@ -73,7 +78,7 @@ class SkillModel:
         
         # Add additional skill insights using LLM
         skill_insights = ""
-        if self.llm_manager.use_llm:
+        if self.llm_manager.llm_available:
             try:
                 skill_insights = self.llm_manager.get_skill_gap_insights(current_skills, target_skills, target_role)
             except Exception as e:
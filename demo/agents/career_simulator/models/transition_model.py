@@ -1,24 +1,50 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Callable
 import numpy as np
 import networkx as nx
 from ..utils.llm_manager import LLMManager
+from .simulation_engine import run_simulation, replay_path
+from .simulation_executors import SimulationExecutor
 import random
 
+# Number of months covered by a single simulation step at each resolution.
+# Transition matrices are built at monthly resolution and converted from there.
+STEP_RESOLUTIONS = {
+    "monthly": 1,
+    "quarterly": 3,
+    "yearly": 12
+}
+
 class CareerTransitionModel:
     """
     Model for simulating career transitions using Markov models.
     """
     
-    def __init__(self, llm_manager: LLMManager):
-        """Initialize with LLM manager."""
+    def __init__(self, llm_manager: LLMManager, engine: str = "auto",
+                 executor: SimulationExecutor = None):
+        """
+        Initialize with LLM manager.
+        
+        Args:
+            llm_manager: LLM manager used for role suggestions
+            engine: Simulation engine ('auto' uses Numba when installed, else NumPy)
+            executor: Executor used to distribute simulation blocks (None runs in process)
+        """
         self.llm_manager = llm_manager
+        self.engine = engine
+        self.executor = executor
     
     def identify_intermediate_roles(self, current_role: str, target_role: str) -> List[str]:
         """
         Identify potential intermediate roles between current and target roles.
         """
-        # Get intermediate roles from LLM
-        intermediate_roles = self.llm_manager.get_intermediate_roles(current_role, target_role)
+        # Get intermediate roles from LLM; without it the simulation uses the direct path only
+        if not self.llm_manager.llm_available:
+            return []
+        try:
+            intermediate_roles = self.llm_manager.get_intermediate_roles(current_role, target_role)
+        except RuntimeError as e:
+            print(f"Simulating the direct path only: {str(e)}")
+            return []
         return intermediate_roles if intermediate_roles else []
     
     def create_career_path_states(self, profile: Dict) -> List[str]:
@@ -56,42 +82,119 @@ class CareerTransitionModel:
         
         return states
     
-    def simulate_career_paths(self, profile: Dict, n_steps: int = 48, n_simulations: int = 1000) -> Dict:
+    def simulate_career_paths(self, profile: Dict, n_steps: int = 48, n_simulations: int = 1000,
+                              step_resolution: str = "monthly", seed: int = None) -> Dict:
         """
         Simulate career paths using Markov models.
+        
+        Args:
+            profile: User profile
+            n_steps: Simulation horizon in months
+            n_simulations: Number of simulated careers
+            step_resolution: Length of one simulation step ('monthly', 'quarterly' or 'yearly')
+            seed: Random seed; the same seed gives the same results on every engine
+            
+        Returns:
+            Simulation results; transition times are always reported in months
         """
-        # Create transition matrix
+        months_per_step = self._months_per_step(step_resolution)
+        n_periods = -(-n_steps // months_per_step)  # Round up so the horizon is fully covered
+        
+        # Create transition matrix and convert it to the requested step length
         transition_data = self.create_transition_matrix(profile)
-        matrix = np.array(transition_data["matrix"])
+        matrix = self.convert_transition_matrix(np.array(transition_data["matrix"]), step_resolution)
         states = transition_data["states"]
         
-        # Find start state
-        start_state_pattern = f"{profile['current_role']}_{profile['current_level']}"
-        start_idx = 0
-        for i, state in enumerate(states):
-            if state == start_state_pattern:
-                start_idx = i
-                break
+        # Find start and target states
+        start_idx = self._find_start_index(states, profile)
+        target_mask = np.array([profile["target_role"] in state for state in states])
         
         # Run simulations
-        all_paths = []
-        for _ in range(n_simulations):
-            current_idx = start_idx
-            path = [current_idx]
+        simulation = run_simulation(matrix, start_idx, target_mask, n_periods, n_simulations,
+                                    seed=seed, engine=self.engine, executor=self.executor)
+        
+        # Analyze results; executors only return counts, so sample paths are replayed from their seeds
+        spec = simulation["spec"]
+        results = self._analyze_simulation_results(
+            None, states, profile, n_periods, months_per_step,
+            first_hit=simulation["first_hit"], state_counts=simulation["state_counts"],
+            path_lookup=lambda sim_index: replay_path(spec, sim_index)
+        )
+        results["transition_data"] = transition_data
+        results["step_resolution"] = step_resolution
+        results["months_per_step"] = months_per_step
+        results["engine"] = simulation["engine"]
+        
+        return results
+    
+    def convert_transition_matrix(self, matrix: np.ndarray, step_resolution: str = "monthly",
+                                  base_resolution: str = "monthly") -> np.ndarray:
+        """
+        Convert a transition matrix from one step resolution to another.
+        
+        Coarser steps use an integer matrix power (P^3 for monthly -> quarterly);
+        finer steps take the corresponding matrix root. Simulations build their
+        matrices monthly, the finest resolution, so they only take powers; the
+        root applies to matrices estimated at a coarser base_resolution (e.g.
+        yearly transition rates converted to monthly steps).
+        
+        Args:
+            matrix: Row-stochastic transition matrix at base_resolution
+            step_resolution: Target step resolution
+            base_resolution: Resolution the matrix was built at
             
-            for step in range(n_steps):
-                probs = matrix[current_idx, :]
-                next_idx = np.random.choice(len(states), p=probs)
-                path.append(next_idx)
-                current_idx = next_idx
+        Returns:
+            Row-stochastic transition matrix at step_resolution
+        """
+        ratio = self._months_per_step(step_resolution) / self._months_per_step(base_resolution)
+        
+        if ratio == 1:
+            return np.array(matrix, dtype=float)
+        if float(ratio).is_integer():
+            return self._matrix_power(matrix, int(ratio))
+        return self._fractional_matrix_power(matrix, ratio)
+    
+    def evaluate_horizon(self, profile: Dict, horizon_months: int, transition_data: Dict = None) -> Dict:
+        """
+        Evaluate the exact state distribution after horizon_months without sampling.
+        
+        Uses repeated squaring, so a 15-year horizon costs a handful of matrix
+        multiplications instead of 180 simulated steps per career.
+        
+        Args:
+            profile: User profile
+            horizon_months: Horizon in months
+            transition_data: Precomputed output of create_transition_matrix (optional)
             
-            all_paths.append(path)
+        Returns:
+            State probabilities at the horizon, probability of being in the target role
+            at the horizon, and probability of having reached it at any point before
+        """
+        if transition_data is None:
+            transition_data = self.create_transition_matrix(profile)
+        matrix = np.array(transition_data["matrix"])
+        states = transition_data["states"]
         
-        # Analyze results
-        results = self._analyze_simulation_results(all_paths, states, profile, n_steps)
-        results["transition_data"] = transition_data
+        start = np.zeros(len(states))
+        start[self._find_start_index(states, profile)] = 1.0
+        target_mask = np.array([profile["target_role"] in state for state in states])
         
-        return results
+        state_probs = start @ self._matrix_power(matrix, horizon_months)
+        
+        # Make target states absorbing so their mass at the horizon is the first-hit probability
+        absorbing = matrix.copy()
+        absorbing[target_mask, :] = 0.0
+        absorbing[target_mask, target_mask] = 1.0
+        reached_probs = start @ self._matrix_power(absorbing, horizon_months)
+        
+        return {
+            "horizon_months": horizon_months,
+            "states": states,
+            "state_probs": state_probs.tolist(),
+            # Clip the rounding error of the repeated products
+            "target_role_prob": float(min(1.0, state_probs[target_mask].sum())),
+            "reached_target_prob": float(min(1.0, reached_probs[target_mask].sum()))
+        }
     
     def create_transition_matrix(self, profile: Dict) -> Dict:
         """Create transition matrix for career simulations."""
@@ -215,6 +318,84 @@ class CareerTransitionModel:
             "paths": paths_data[:5]  # Return top 5 paths
         }
     
+    def _months_per_step(self, step_resolution: str) -> int:
+        """Return the number of months covered by one step at the given resolution."""
+        if step_resolution not in STEP_RESOLUTIONS:
+            raise ValueError(f"Unknown step resolution '{step_resolution}'. "
+                             f"Expected one of: {', '.join(STEP_RESOLUTIONS)}")
+        return STEP_RESOLUTIONS[step_resolution]
+    
+    def _find_start_index(self, states: List[str], profile: Dict) -> int:
+        """Find the index of the user's current state, defaulting to the first state."""
+        start_state_pattern = f"{profile['current_role']}_{profile['current_level']}"
+        for i, state in enumerate(states):
+            if state == start_state_pattern:
+                return i
+        return 0
+    
+    def _matrix_power(self, matrix: np.ndarray, power: int) -> np.ndarray:
+        """Raise a transition matrix to an integer power by repeated squaring."""
+        result = np.eye(len(matrix))
+        base = np.array(matrix, dtype=float)
+        
+        while power > 0:
+            if power & 1:
+                result = result @ base
+            base = base @ base
+            power >>= 1
+        
+        return result
+    
+    def _fractional_matrix_power(self, matrix: np.ndarray, power: float) -> np.ndarray:
+        """
+        Take a fractional power (matrix root) of a transition matrix.
+        
+        Rule-based matrices are usually defective (repeated 0.7 diagonals), so an
+        eigendecomposition is not reliable. Instead, repeated square roots bring the
+        matrix close to the identity, after which the binomial series for
+        (I + D)^power converges quickly. Small negative residue is clipped and rows
+        are renormalized so the result stays row-stochastic.
+        """
+        matrix = np.array(matrix, dtype=float)
+        identity = np.eye(len(matrix))
+        
+        try:
+            scaled = matrix
+            for _ in range(20):
+                if np.abs(scaled - identity).sum(axis=1).max() < 0.25:
+                    break
+                scaled = self._matrix_sqrt(scaled)
+                power *= 2
+            
+            delta = scaled - identity
+            root = identity.copy()
+            term = identity.copy()
+            for k in range(1, 200):
+                term = term @ delta * ((power - k + 1) / k)
+                root += term
+                if np.abs(term).max() < 1e-12:
+                    break
+        except np.linalg.LinAlgError:
+            # Singular matrix: fall back to linear interpolation towards the identity
+            root = identity + (matrix - identity) * power
+        
+        root = np.clip(root, 0.0, None)
+        row_sums = root.sum(axis=1, keepdims=True)
+        row_sums[row_sums == 0] = 1.0
+        return root / row_sums
+    
+    def _matrix_sqrt(self, matrix: np.ndarray, iterations: int = 50) -> np.ndarray:
+        """Principal matrix square root via the Denman-Beavers iteration."""
+        y = matrix
+        z = np.eye(len(matrix))
+        for _ in range(iterations):
+            y_next = (y + np.linalg.inv(z)) / 2
+            z = (z + np.linalg.inv(y)) / 2
+            if np.abs(y_next - y).max() < 1e-13:
+                return y_next
+            y = y_next
+        return y
+    
     def _is_next_level(self, current_level: str, next_level: str) -> bool:
         """Check if next_level is the next career level after current_level."""
         levels = ["Entry", "Mid", "Senior", "Director"]
@@ -228,42 +409,51 @@ class CareerTransitionModel:
     def _roles_are_adjacent(self, role1: str, role2: str, profile: Dict) -> bool:
         """Check if two roles are adjacent in typical career paths."""
         # Use LLM to determine if roles are adjacent
-        next_roles = self.llm_manager.get_intermediate_roles(role1, profile.get("target_role", ""))
+        if not self.llm_manager.llm_available:
+            return False
+        try:
+            next_roles = self.llm_manager.get_intermediate_roles(role1, profile.get("target_role", ""))
+        except RuntimeError:
+            return False
         return role2 in next_roles
     
-    def _analyze_simulation_results(self, paths: List[List[int]], states: List[str], 
-                                   profile: Dict, n_steps: int) -> Dict:
-        """Analyze simulation results to extract insights."""
-        target_role = profile["target_role"]
-        total_simulations = len(paths)
-        
-        # Track how many simulations reach target role at each step
-        target_role_counts = np.zeros(n_steps + 1)
-        state_counts = np.zeros((n_steps + 1, len(states)))
+    def _analyze_simulation_results(self, paths: np.ndarray, states: List[str], 
+                                   profile: Dict, n_steps: int, months_per_step: int = 1,
+                                   first_hit: np.ndarray = None, state_counts: np.ndarray = None,
+                                   path_lookup: Callable[[int], np.ndarray] = None) -> Dict:
+        """
+        Analyze simulation results to extract insights.
         
-        for path in paths:
-            for step, state_idx in enumerate(path):
-                state_counts[step, state_idx] += 1
-                
-                state_name = states[state_idx]
-                if target_role in state_name:
-                    target_role_counts[step] += 1
+        n_steps is the number of simulated steps; months_per_step converts step
+        indices back to months for transition times. first_hit and state_counts
+        are recomputed from paths when the engine did not provide them. Without
+        paths, path_lookup must return the path of a simulation by index.
+        """
+        target_role = profile["target_role"]
+        target_mask = np.array([target_role in state for state in states])
+        if paths is not None:
+            paths = np.asarray(paths)
+            path_lookup = path_lookup or (lambda sim_index: paths[sim_index])
+        total_simulations = len(first_hit) if first_hit is not None else len(paths)
+        
+        # Occupancy of each state at each step
+        if state_counts is None:
+            state_counts = np.zeros((n_steps + 1, len(states)))
+            for step in range(n_steps + 1):
+                state_counts[step] = np.bincount(paths[:, step], minlength=len(states))
         
         # Calculate probabilities
-        target_role_probs = target_role_counts / total_simulations
+        target_role_probs = state_counts[:, target_mask].sum(axis=1) / total_simulations
         state_probs = state_counts / total_simulations
         
-        # Track transition times
-        transition_times = []
-        success_paths = []
+        # Track transition times (first step spent in the target role)
+        if first_hit is None:
+            hits = target_mask[paths]
+            first_hit = np.where(hits.any(axis=1), hits.argmax(axis=1), -1)
         
-        for path in paths:
-            for step, state_idx in enumerate(path):
-                state_name = states[state_idx]
-                if target_role in state_name:
-                    transition_times.append(step)
-                    success_paths.append(path)
-                    break
+        reached = first_hit >= 0
+        transition_times = (first_hit[reached] * months_per_step).tolist()
+        success_indices = np.flatnonzero(reached)
         
         # Calculate success metrics
         success_rate = len(transition_times) / total_simulations
@@ -271,7 +461,7 @@ class CareerTransitionModel:
         
         # Sample paths for examples (ensure we have 3 distinct paths)
         sample_paths = []
-        if success_paths:
+        if len(success_indices) > 0:
             if len(transition_times) >= 3:
                 sorted_indices = np.argsort(transition_times)
                 
@@ -290,25 +480,9 @@ class CareerTransitionModel:
                 
                 # Generate the path data
                 for idx in sample_indices:
-                    path_indices = success_paths[idx]
-                    path_states = [states[i] for i in path_indices]
-                    transition_step = transition_times[idx]
-                    
-                    # Extract roles from path_states for later comparison
-                    roles_in_path = []
-                    for state in path_states:
-                        if '_' in state:
-                            role = state.split('_')[0]
-                            if role not in roles_in_path:
-                                roles_in_path.append(role)
-                    
-                    sample_paths.append({
-                        "indices": path_indices,
-                        "states": path_states,
-                        "transition_month": transition_step,
-                        "final_state": path_states[-1],
-                        "roles": roles_in_path
-                    })
+                    sample_paths.append(self._build_sample_path(
+                        path_lookup(success_indices[idx]), states, transition_times[idx], months_per_step
+                    ))
                 
                 # If we have fewer than 3 distinct paths, add more from other percentiles
                 if len(sample_paths) < 3:
@@ -319,61 +493,31 @@ class CareerTransitionModel:
                             break
                             
                         idx = sorted_indices[int(len(sorted_indices) * percentile)]
-                        # Check if this path is different from existing ones
-                        path_indices = success_paths[idx]
-                        path_states = [states[i] for i in path_indices]
-                        transition_step = transition_times[idx]
                         
                         # Skip if we already have this path
                         if idx in sample_indices:
                             continue
-                            
-                        # Extract roles
-                        roles_in_path = []
-                        for state in path_states:
-                            if '_' in state:
-                                role = state.split('_')[0]
-                                if role not in roles_in_path:
-                                    roles_in_path.append(role)
+                        
+                        candidate = self._build_sample_path(
+                            path_lookup(success_indices[idx]), states, transition_times[idx], months_per_step
+                        )
                         
                         # Check if this path has a unique role sequence
                         is_unique = True
                         for existing_path in sample_paths:
-                            if set(roles_in_path) == set(existing_path.get("roles", [])):
+                            if set(candidate["roles"]) == set(existing_path.get("roles", [])):
                                 is_unique = False
                                 break
                                 
                         if is_unique:
-                            sample_paths.append({
-                                "indices": path_indices,
-                                "states": path_states,
-                                "transition_month": transition_step,
-                                "final_state": path_states[-1],
-                                "roles": roles_in_path
-                            })
+                            sample_paths.append(candidate)
                             sample_indices.append(idx)
             elif len(transition_times) > 0:
                 # If we have fewer than 3 successful paths, just use what we have
-                for i, idx in enumerate(range(min(len(transition_times), 3))):
-                    path_indices = success_paths[idx]
-                    path_states = [states[i] for i in path_indices]
-                    transition_step = transition_times[idx]
-                    
-                    # Extract roles
-                    roles_in_path = []
-                    for state in path_states:
-                        if '_' in state:
-                            role = state.split('_')[0]
-                            if role not in roles_in_path:
-                                roles_in_path.append(role)
-                    
-                    sample_paths.append({
-                        "indices": path_indices,
-                        "states": path_states,
-                        "transition_month": transition_step,
-                        "final_state": path_states[-1],
-                        "roles": roles_in_path
-                    })
+                for idx in range(min(len(transition_times), 3)):
+                    sample_paths.append(self._build_sample_path(
+                        path_lookup(success_indices[idx]), states, transition_times[idx], months_per_step
+                    ))
         
         # Sort sample paths by transition time (fastest first)
         sample_paths.sort(key=lambda x: x.get("transition_month", float('inf')))
@@ -388,6 +532,43 @@ class CareerTransitionModel:
             "states": states
         }
     
+    def _build_sample_path(self, path_indices: np.ndarray, states: List[str],
+                           transition_month: int, months_per_step: int = 1) -> Dict:
+        """
+        Build a run-length encoded sample path.
+        
+        Each segment is a maximal run of consecutive steps in one state, given as
+        the state id, the month the run starts and its duration in months.
+        """
+        segments = []
+        run_start = 0
+        for step in range(1, len(path_indices) + 1):
+            if step == len(path_indices) or path_indices[step] != path_indices[run_start]:
+                segments.append({
+                    "state_idx": int(path_indices[run_start]),
+                    "state": states[path_indices[run_start]],
+                    "start_month": run_start * months_per_step,
+                    "duration": (step - run_start) * months_per_step
+                })
+                run_start = step
+        
+        return {
+            "segments": segments,
+            "transition_month": transition_month,
+            "final_state": segments[-1]["state"] if segments else None,
+            "roles": self.roles_from_segments(segments)
+        }
+    
+    @staticmethod
+    def roles_from_segments(segments: List[Dict]) -> List[str]:
+        """Extract the ordered, de-duplicated role sequence from path segments."""
+        roles = []
+        for segment in segments:
+            role = segment["state"].split('_')[0]
+            if role not in roles:
+                roles.append(role)
+        return roles
+    
     def get_realistic_transition_time(self, from_role, to_role, years_experience=0, initial_estimate=None):
         """
         Get a realistic transition time estimate between roles.
@@ -1,2 +1,14 @@
 from .data_loader import DataLoader
-from .llm_manager import LLMManager 
\ No newline at end of file
+from .llm_manager import LLMManager
+from .llm_cache import LLMResponseCache
+from .single_flight import SingleFlight
+from .role_names import canonical_role, normalize_job_title
+from .llm_backends import LLMBackend, OpenAIBackend, RecordingBackend, ReplayBackend, create_llm_backend
+from .llm_metrics import LLMMetrics, get_metrics, observe_llm_calls, track_llm_call
+from .rate_limiter import Priority, TokenBucketRateLimiter, get_rate_limiter
+from .http_client import aclose_http_clients, get_async_http_client, get_http_client, http_pool_stats
+from .model_router import ModelRouter, ModelTier, get_model_router
+from .json_repair import loads_tolerant, repair_stats
+from .title_index import TitleIndex
+from .skill_matrix import PostingSkillMatrix
+from .data_snapshot import DataSnapshot
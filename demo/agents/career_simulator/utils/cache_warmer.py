@@ -0,0 +1,238 @@
+"""
+Cache warmer for the most common roles.
+
+Runs the LLMManager and DataLoader computations for the most frequent job
+titles in the posting datasets, so the first users after a deploy do not pay
+cold-cache latency. LLM results are written to the persistent response
+cache; posting skills are computed in process, so the warmer is also useful
+at application startup (see CacheWarmer.warm).
+
+    python -m agents.career_simulator.utils.cache_warmer --top 25 --concurrency 4
+
+Offline, against a recording made with LLM_BACKEND=record:
+
+    python -m agents.career_simulator.utils.cache_warmer --backend replay --recording llm_recordings.jsonl
+"""
+import argparse
+import json
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from .data_loader import DataLoader
+from .llm_manager import LLMManager
+from .llm_metrics import observe_llm_calls
+from .role_names import canonical_role, normalize_job_title
+
+# Career levels whose default salaries are warmed
+WARM_LEVELS = ("Entry", "Mid", "Senior")
+
+# A normalized title is only taken for a role if it ends in one of these nouns;
+# the free-text title column of filtered_job_description.csv holds many sentence fragments
+ROLE_NOUNS = {
+    'engineer', 'developer', 'analyst', 'scientist', 'manager', 'designer', 'architect',
+    'specialist', 'strategist', 'consultant', 'administrator', 'director', 'lead', 'researcher',
+    'coordinator', 'associate', 'technician', 'officer', 'representative', 'programmer',
+    'intern', 'executive', 'accountant', 'recruiter', 'nurse', 'writer', 'editor', 'tester'
+}
+MAX_TITLE_WORDS = 5
+
+_TITLE_WORD = re.compile(r"[A-Za-z+#/&-]+$")
+
+
+def _data_dir() -> str:
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../../data"))
+
+
+def default_posting_files() -> List[str]:
+    """Posting datasets the top titles are taken from."""
+    return [os.path.join(_data_dir(), name) for name in ("filtered_job_description.csv", "job_postings.csv")]
+
+
+def is_role_title(title: str) -> bool:
+    """Whether a normalized title looks like a job role rather than free text."""
+    words = title.split()
+    if not words or len(words) > MAX_TITLE_WORDS:
+        return False
+    if not all(_TITLE_WORD.match(word) for word in words):
+        return False
+    return words[-1].lower() in ROLE_NOUNS
+
+
+def top_titles(paths: Sequence[str], limit: int = 25) -> List[Tuple[str, int]]:
+    """
+    Most frequent canonical role titles across posting files.
+
+    Args:
+        paths: CSV files with a job_title column
+        limit: Number of titles to return
+
+    Returns:
+        (role, posting count) pairs, most frequent first
+    """
+    counts: Counter = Counter()
+    for path in paths:
+        if not os.path.exists(path):
+            print(f"Posting file not found, skipping: {path}")
+            continue
+
+        titles = pd.read_csv(path, usecols=['job_title'], on_bad_lines='skip', encoding='utf-8',
+                             low_memory=False)['job_title'].dropna().astype(str)
+        for title, count in titles.value_counts().items():
+            role = canonical_role(normalize_job_title(title))
+            if role and is_role_title(role):
+                counts[role] += int(count)
+
+    return counts.most_common(limit)
+
+
+class CacheWarmer:
+    """
+    Precomputes the LLM and posting artefacts of a set of roles.
+
+    Roles are warmed concurrently on a bounded thread pool; LLM calls still
+    go through the shared rate limiter at background priority.
+    """
+
+    def __init__(self, llm_manager: LLMManager, data_loader: Optional[DataLoader] = None, concurrency: int = 4):
+        """
+        Initialize the warmer.
+
+        Args:
+            llm_manager: LLMManager whose caches are filled
+            data_loader: DataLoader whose posting skills are computed (optional)
+            concurrency: Roles warmed at once
+        """
+        self.llm_manager = llm_manager
+        self.data_loader = data_loader
+        self.concurrency = max(1, concurrency)
+
+    def tasks(self, role: str) -> List[Tuple[str, Callable[[], Any]]]:
+        """Named computations that warm one role."""
+        tasks = []
+        if self.llm_manager.llm_available:
+            tasks.append(("role_skills", lambda: self.llm_manager.get_role_skills(role)))
+            tasks.append(("job_market_insights", lambda: self.llm_manager.get_job_market_insights(role)))
+        if self.data_loader is not None:
+            tasks.append(("posting_skills", lambda: self.data_loader.extract_skills_from_job_posting(role)))
+        return tasks
+
+    def warm(self, roles: Sequence[str]) -> Dict[str, Any]:
+        """
+        Warm the roles and the default salaries of every career level.
+
+        Returns:
+            Report with per-role results, coverage and elapsed time
+        """
+        start = time.perf_counter()
+        level_results = []
+        if self.llm_manager.llm_available:
+            level_results = [
+                self._run(f"default_salaries:{level}", lambda level=level: self.llm_manager.get_default_salaries(level))
+                for level in WARM_LEVELS
+            ]
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            role_results = list(pool.map(self._warm_role, roles))
+
+        results = level_results + [result for role in role_results for result in role["tasks"]]
+        warmed_roles = sum(1 for role in role_results if role["tasks"] and all(t["ok"] for t in role["tasks"]))
+        return {
+            "roles": role_results,
+            "levels": level_results,
+            "role_coverage": warmed_roles / len(role_results) if role_results else 0.0,
+            "posting_coverage": (
+                sum(1 for role in role_results if role["postings"]) / len(role_results)
+                if role_results and self.data_loader is not None else None
+            ),
+            "artefacts": len(results),
+            "failed": sum(1 for result in results if not result["ok"]),
+            "cache_hits": sum(1 for result in results if result["cache_hit"]),
+            "elapsed_seconds": time.perf_counter() - start
+        }
+
+    def _warm_role(self, role: str) -> Dict[str, Any]:
+        start = time.perf_counter()
+        tasks = [self._run(name, fn) for name, fn in self.tasks(role)]
+        postings = next((t["size"] for t in tasks if t["name"] == "posting_skills" and t["ok"]), 0)
+        return {"role": role, "tasks": tasks, "postings": postings, "elapsed_seconds": time.perf_counter() - start}
+
+    def _run(self, name: str, fn: Callable[[], Any]) -> Dict[str, Any]:
+        """Run one computation, recording whether it was already cached."""
+        start = time.perf_counter()
+        result = {"name": name, "ok": True, "cache_hit": False, "size": 0, "error": None}
+        try:
+            # Observe rather than track, so the calls keep their own operations in the metrics
+            with observe_llm_calls() as calls:
+                value = fn()
+            result["cache_hit"] = bool(calls) and all(call.cache_hit is True for call in calls)
+            result["size"] = len(value) if hasattr(value, "__len__") else 1
+        except Exception as e:
+            result["ok"] = False
+            result["error"] = str(e)
+        result["elapsed_seconds"] = time.perf_counter() - start
+        return result
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Human-readable summary of a warm() report."""
+    lines = []
+    for role in report["roles"]:
+        status = ", ".join(
+            f"{t['name']}={'hit' if t['cache_hit'] else 'ok' if t['ok'] else 'FAILED'}" for t in role["tasks"]
+        )
+        lines.append(f"  {role['role']:<40} {role['elapsed_seconds']:6.2f}s  {status}")
+
+    posting_coverage = report["posting_coverage"]
+    lines.append(
+        f"Warmed {len(report['roles'])} roles ({report['artefacts']} artefacts, {report['cache_hits']} already cached, "
+        f"{report['failed']} failed) in {report['elapsed_seconds']:.2f}s"
+    )
+    lines.append(f"Role coverage: {report['role_coverage']:.0%}"
+                 + (f", roles with postings: {posting_coverage:.0%}" if posting_coverage is not None else ""))
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Warm the career simulator caches for the most common roles")
+    parser.add_argument("--top", type=int, default=25, help="Number of most frequent titles to warm")
+    parser.add_argument("--role", action="append", default=[], help="Additional role to warm (repeatable)")
+    parser.add_argument("--postings", action="append", help="Posting CSV to rank titles from (repeatable)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Roles warmed at once")
+    parser.add_argument("--backend", choices=("openai", "record", "replay"), help="Overrides LLM_BACKEND")
+    parser.add_argument("--recording", help="Recording file for record/replay (overrides LLM_RECORDING_PATH)")
+    parser.add_argument("--cache-path", help="Persistent cache file (overrides LLM_CACHE_PATH)")
+    parser.add_argument("--no-postings", action="store_true", help="Skip the DataLoader posting computations")
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON")
+    args = parser.parse_args(argv)
+
+    # Backend and cache settings are read from the environment when the LLMManager is created
+    if args.backend:
+        os.environ["LLM_BACKEND"] = args.backend
+    if args.recording:
+        os.environ["LLM_RECORDING_PATH"] = args.recording
+    if args.cache_path:
+        os.environ["LLM_CACHE_PATH"] = args.cache_path
+
+    titles = top_titles(args.postings or default_posting_files(), args.top)
+    roles = list(dict.fromkeys([role for role, _ in titles] + [canonical_role(role) for role in args.role]))
+    print(f"Warming {len(roles)} roles: {', '.join(roles)}")
+
+    llm_manager = LLMManager(use_llm=True)
+    if not llm_manager.llm_available:
+        print("LLM unavailable; only posting data will be computed")
+    data_loader = None if args.no_postings else DataLoader(_data_dir())
+
+    report = CacheWarmer(llm_manager, data_loader, args.concurrency).warm(roles)
+    report["titles"] = titles
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
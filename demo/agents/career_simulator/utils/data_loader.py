@@ -1,16 +1,78 @@
 import os
+import json
+import threading
+import numpy as np
 import pandas as pd
-import re
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+from .data_snapshot import pack_frame, pack_strings, snapshot_from_env, unpack_frame, unpack_strings
+from .role_names import canonical_role, normalize_job_title
+from .skill_matrix import PostingSkillMatrix
+from .title_index import LRUCache, TitleIndex
+
+# Roles whose matching posting rows are kept
+MAX_CACHED_ROLES = 1024
+
+
+def default_salary_data_path() -> Optional[str]:
+    """
+    The company compensation CSV the application loads: the agent's bundled copy, else the project data directory.
+    
+    Returns:
+        Path of the file, or None if neither exists
+    """
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../.."))
+    possible_paths = [
+        os.path.join(project_root, "demo/agents/career_simulator/data/Level_compensation_by_company.csv"),
+        os.path.join(project_root, "data/Level_compensation_by_company.csv")
+    ]
+    return next((path for path in possible_paths if os.path.exists(path)), None)
+
+
+def _loaded_attribute(name: str, doc: str) -> property:
+    """Attribute holding loaded data; reading it loads the data on first access."""
+    private = f"_{name}"
+    
+    def getter(self):
+        self._ensure_loaded()
+        return getattr(self, private)
+    
+    def setter(self, value):
+        setattr(self, private, value)
+    
+    return property(getter, setter, doc=doc)
 
 
 class DataLoader:
     """
     Utility for loading and managing data used by the career simulator.
+    
+    Data is loaded on first access to any of the datasets or indexes below (or
+    by warmup()), so creating a DataLoader is cheap for processes that never
+    run a simulation.
     """
     
-    def __init__(self, salary_data_dir: str = "salary_trends_datasets"):
-        """Initialize with path to salary data directory."""
+    company_salary_data = _loaded_attribute("company_salary_data", "Compensation by company and level")
+    general_salary_data = _loaded_attribute("general_salary_data", "Compensation by level")
+    job_postings_data = _loaded_attribute("job_postings_data", "Preprocessed job postings")
+    job_postings_loaded = _loaded_attribute("job_postings_loaded", "Whether job postings are available")
+    normalized_title_index = _loaded_attribute("normalized_title_index", "Index over the normalized titles")
+    job_title_index = _loaded_attribute("job_title_index", "Index over the raw titles")
+    skill_matrix = _loaded_attribute("skill_matrix", "Skills of every posting")
+    
+    def __init__(self, salary_data_dir: str = "salary_trends_datasets", use_snapshot: bool = True, lazy: bool = True):
+        """
+        Initialize with path to salary data directory.
+        
+        Args:
+            salary_data_dir: Salary data directory or CSV file
+            use_snapshot: Load from the preprocessed data snapshot while its sources are unchanged
+                (see data_snapshot), and write one after loading from CSV
+            lazy: Defer loading until the data is first used (False loads it now)
+        """
+        self._loaded = False
+        self._loading = False
+        self._load_lock = threading.RLock()
+        
         self.salary_data_dir = salary_data_dir
         self.salary_data = None
         self.company_salary_data = None
@@ -20,86 +82,265 @@ class DataLoader:
         self.job_postings_loaded = False
         self.job_postings_skills = {}
         
-        self._load_salary_data()
-        self.load_job_postings_data()
+        # Inverted indexes over the normalized and raw titles, built at load
+        self.normalized_title_index: Optional[TitleIndex] = None
+        self.job_title_index: Optional[TitleIndex] = None
+        # Matching rows of recently looked up roles
+        self._matching_ids = LRUCache(MAX_CACHED_ROLES)
+        
+        # Skills of every posting, extracted once at load
+        self.skill_matrix: Optional[PostingSkillMatrix] = None
+        
+        # CSV files the data was read from, recorded for snapshot invalidation
+        self.source_files: List[str] = []
+        self._source_paths: Optional[Dict[str, Optional[str]]] = None
+        self._use_snapshot = use_snapshot
+        
+        if not lazy:
+            self.warmup()
+    
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the data has been loaded."""
+        return self._loaded
+    
+    def warmup(self) -> "DataLoader":
+        """Load the datasets and build the indexes now rather than on first use."""
+        self._ensure_loaded()
+        return self
+    
+    def _ensure_loaded(self) -> None:
+        """Load the data once; concurrent first accesses wait for the same load."""
+        if self._loaded:
+            return
+        with self._load_lock:
+            # The loading thread itself reads the attributes while they are filled in
+            if self._loaded or self._loading:
+                return
+            self._loading = True
+            try:
+                if not self._load_snapshot():
+                    self._load_salary_data()
+                    self.load_job_postings_data()
+                    if self._use_snapshot:
+                        self.save_snapshot()
+            finally:
+                self._loading = False
+                self._loaded = True
+    
+    def _read_csv(self, path: str, **kwargs) -> pd.DataFrame:
+        """Read a CSV file and record it as a source of the loaded data."""
+        frame = pd.read_csv(path, **kwargs)
+        self.source_files.append(os.path.abspath(path))
+        return frame
+    
+    def _snapshot_key(self) -> str:
+        # Snapshots are identified by the files they are built from, however the data directory was given
+        return json.dumps(self.resolve_source_files(), sort_keys=True)
+    
+    def save_snapshot(self) -> Optional[str]:
+        """
+        Write the loaded frames and indexes to the data snapshot.
+        
+        Returns:
+            Path of the snapshot, or None if nothing was written
+        """
+        self._ensure_loaded()
+        if not self.source_files:
+            return None
+        snapshot = snapshot_from_env(self._snapshot_key())
+        if snapshot is None:
+            return None
+        
+        arrays: Dict[str, np.ndarray] = {}
+        meta: Dict[str, Any] = {"frames": {}}
+        frames = {
+            "company_salary_data": self.company_salary_data,
+            "general_salary_data": self.general_salary_data,
+            "job_postings_data": self.job_postings_data if self.job_postings_loaded else None
+        }
+        for name, frame in frames.items():
+            if frame is not None:
+                meta["frames"][name] = pack_frame(name, frame, arrays)
+        
+        if self.job_postings_loaded:
+            for name, index in (("normalized_title_index", self.normalized_title_index),
+                                ("job_title_index", self.job_title_index)):
+                index_arrays, vocabulary = index.to_arrays()
+                arrays[f"{name}/indptr"], arrays[f"{name}/rows"] = index_arrays["indptr"], index_arrays["rows"]
+                arrays[f"{name}/vocabulary"], arrays[f"{name}/vocabulary_offsets"], _ = pack_strings(vocabulary)
+            arrays["skill_matrix/indptr"] = self.skill_matrix.indptr
+            arrays["skill_matrix/indices"] = self.skill_matrix.indices
+            arrays["skill_matrix/skills"], arrays["skill_matrix/skill_offsets"], _ = pack_strings(self.skill_matrix.skills)
+        
+        try:
+            snapshot.save(self._snapshot_key(), self.source_files, arrays, meta)
+            print(f"Saved data snapshot to: {snapshot.path}")
+            return snapshot.path
+        except Exception as e:
+            print(f"Error saving data snapshot: {str(e)}")
+            return None
+    
+    def _load_snapshot(self) -> bool:
+        """Restore the frames and indexes from the data snapshot; returns False if there is no valid one."""
+        snapshot = snapshot_from_env(self._snapshot_key()) if self._use_snapshot else None
+        if snapshot is None:
+            return False
+        loaded = snapshot.load(self._snapshot_key())
+        if loaded is None:
+            return False
+        arrays, meta = loaded
+        
+        try:
+            frames = {name: unpack_frame(name, layout, arrays) for name, layout in meta["frames"].items()}
+            self.company_salary_data = frames.get("company_salary_data")
+            self.general_salary_data = frames.get("general_salary_data")
+            self.job_postings_data = frames.get("job_postings_data")
+            self.job_postings_loaded = self.job_postings_data is not None
+            
+            if self.job_postings_loaded:
+                for name, column in (("normalized_title_index", "normalized_title"), ("job_title_index", "job_title")):
+                    vocabulary = unpack_strings(arrays[f"{name}/vocabulary"], arrays[f"{name}/vocabulary_offsets"])
+                    index = TitleIndex.from_arrays(
+                        self.job_postings_data[column].fillna(''),
+                        {"indptr": arrays[f"{name}/indptr"], "rows": arrays[f"{name}/rows"]},
+                        vocabulary
+                    )
+                    setattr(self, name, index)
+                skills = unpack_strings(arrays["skill_matrix/skills"], arrays["skill_matrix/skill_offsets"])
+                self.skill_matrix = PostingSkillMatrix.from_arrays(
+                    skills, arrays["skill_matrix/indptr"], arrays["skill_matrix/indices"]
+                )
+        except Exception as e:
+            print(f"Error restoring data snapshot, loading from CSV: {str(e)}")
+            self.company_salary_data = self.general_salary_data = self.job_postings_data = None
+            self.job_postings_loaded = False
+            return False
+        
+        self.source_files = [source["path"] for source in meta["sources"]]
+        print(f"Loaded data snapshot from: {snapshot.path}")
+        return True
+    
+    def _resolve_salary_files(self) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Find the salary CSV files for salary_data_dir without reading them.
+        
+        Returns:
+            (company compensation file, level bucket file), None where not found
+        """
+        company_file = bucket_file = None
+        
+        # If the path points directly to a CSV file (Level_compensation_by_company.csv)
+        if self.salary_data_dir.endswith('.csv') and os.path.exists(self.salary_data_dir):
+            file_name = os.path.basename(self.salary_data_dir)
+            data_dir = os.path.dirname(self.salary_data_dir)
+            
+            if "Level_compensation_by_company" in file_name:
+                company_file = self.salary_data_dir
+                # Look for level bucket file in the same directory
+                sibling = os.path.join(data_dir, 'Level_compensation_by_bucket.csv')
+                bucket_file = sibling if os.path.exists(sibling) else None
+            elif "Level_compensation_by_bucket" in file_name:
+                bucket_file = self.salary_data_dir
+                # Look for company file in the same directory
+                sibling = os.path.join(data_dir, 'Level_compensation_by_company.csv')
+                company_file = sibling if os.path.exists(sibling) else None
+            else:
+                print(f"Unrecognized salary data file: {file_name}")
+            return company_file, bucket_file
+        
+        # If it's a directory
+        if os.path.isdir(self.salary_data_dir):
+            level_company_path = os.path.join(self.salary_data_dir, 'Level_compensation_by_company.csv')
+            level_bucket_path = os.path.join(self.salary_data_dir, 'Level_compensation_by_bucket.csv')
+            return (level_company_path if os.path.exists(level_company_path) else None,
+                    level_bucket_path if os.path.exists(level_bucket_path) else None)
+        
+        # Try to find the directory by checking various paths
+        print("Trying to find salary data files in various locations...")
+        possible_dirs = [
+            self.salary_data_dir,  # Specified directory
+            os.path.dirname(self.salary_data_dir) if not os.path.isdir(self.salary_data_dir) else self.salary_data_dir,  # Parent directory if it's a file
+            os.path.join(os.path.dirname(__file__), "..", "..", "..", "data"),  # Project data directory
+            os.path.join(os.path.dirname(__file__), "..", "data"),  # Agent data directory
+            os.path.abspath(self.salary_data_dir)  # Absolute path
+        ]
+        
+        for directory in possible_dirs:
+            if not os.path.exists(directory):
+                continue
+                
+            print(f"Checking directory: {directory}")
+            level_company_path = os.path.join(directory, 'Level_compensation_by_company.csv')
+            level_bucket_path = os.path.join(directory, 'Level_compensation_by_bucket.csv')
+            
+            if os.path.exists(level_company_path):
+                return level_company_path, None
+            if os.path.exists(level_bucket_path):
+                return None, level_bucket_path
+        
+        return None, None
+    
+    def _resolve_job_postings_file(self, company_file: Optional[str]) -> Optional[str]:
+        """Find the job postings CSV file without reading it."""
+        # Determine project root directory
+        file_dir = os.path.dirname(os.path.abspath(__file__))
+        project_root = os.path.abspath(os.path.join(file_dir, "../../../.."))
+        
+        # Try various possible locations for the job postings file
+        possible_paths = [
+            os.path.join(project_root, "data/filtered_job_description.csv"),  # Project data directory
+            os.path.join(project_root, "filtered_job_description.csv"),  # Project root
+            "filtered_job_description.csv",  # Current directory
+            "../filtered_job_description.csv",  # Parent directory
+            os.path.join(file_dir, "../../../filtered_job_description.csv"),  # Relative to this file
+            os.path.join(file_dir, "../../../data/filtered_job_description.csv"),  # Project data directory
+        ]
+        
+        # If we have company data from a file, check the same directory
+        if company_file is not None and isinstance(self.salary_data_dir, str) and os.path.exists(self.salary_data_dir):
+            data_dir = os.path.dirname(self.salary_data_dir)
+            possible_paths.append(os.path.join(data_dir, "filtered_job_description.csv"))
+            
+            # Also check parent directories
+            possible_paths.append(os.path.join(os.path.dirname(data_dir), "data/filtered_job_description.csv"))
+            possible_paths.append(os.path.join(os.path.dirname(os.path.dirname(data_dir)), "data/filtered_job_description.csv"))
+        
+        for path in possible_paths:
+            if os.path.exists(path):
+                return path
+        return None
+    
+    def resolve_source_files(self) -> Dict[str, Optional[str]]:
+        """
+        Absolute paths of the CSV files the data is loaded from, found without reading them.
+        
+        Returns:
+            {"company_salary", "general_salary", "job_postings"}: path, or None where not found
+        """
+        if self._source_paths is None:
+            company_file, bucket_file = self._resolve_salary_files()
+            job_postings_file = self._resolve_job_postings_file(company_file)
+            self._source_paths = {
+                name: os.path.abspath(path) if path else None
+                for name, path in (("company_salary", company_file), ("general_salary", bucket_file),
+                                   ("job_postings", job_postings_file))
+            }
+        return self._source_paths
     
     def _load_salary_data(self) -> None:
         """Load salary data from CSV files."""
         try:
             print(f"DataLoader attempting to load salary data from: {self.salary_data_dir}")
+            sources = self.resolve_source_files()
             
-            # If the path points directly to a CSV file (Level_compensation_by_company.csv)
-            if self.salary_data_dir.endswith('.csv') and os.path.exists(self.salary_data_dir):
-                file_name = os.path.basename(self.salary_data_dir)
-                
-                if "Level_compensation_by_company" in file_name:
-                    print(f"Loading company compensation data from: {self.salary_data_dir}")
-                    self.company_salary_data = pd.read_csv(self.salary_data_dir)
-                    
-                    # Look for level bucket file in the same directory
-                    data_dir = os.path.dirname(self.salary_data_dir)
-                    bucket_file = os.path.join(data_dir, 'Level_compensation_by_bucket.csv')
-                    if os.path.exists(bucket_file):
-                        print(f"Loading bucket compensation data from: {bucket_file}")
-                        self.general_salary_data = pd.read_csv(bucket_file)
-                elif "Level_compensation_by_bucket" in file_name:
-                    print(f"Loading bucket compensation data from: {self.salary_data_dir}")
-                    self.general_salary_data = pd.read_csv(self.salary_data_dir)
-                    
-                    # Look for company file in the same directory
-                    data_dir = os.path.dirname(self.salary_data_dir)
-                    company_file = os.path.join(data_dir, 'Level_compensation_by_company.csv')
-                    if os.path.exists(company_file):
-                        print(f"Loading company compensation data from: {company_file}")
-                        self.company_salary_data = pd.read_csv(company_file)
-                else:
-                    print(f"Unrecognized salary data file: {file_name}")
-                    
-                return
-                
-            # If it's a directory
-            if os.path.isdir(self.salary_data_dir):
-                level_company_path = os.path.join(self.salary_data_dir, 'Level_compensation_by_company.csv')
-                level_bucket_path = os.path.join(self.salary_data_dir, 'Level_compensation_by_bucket.csv')
-                
-                if os.path.exists(level_company_path):
-                    print(f"Loading company compensation data from: {level_company_path}")
-                    self.company_salary_data = pd.read_csv(level_company_path)
-                
-                if os.path.exists(level_bucket_path):
-                    print(f"Loading bucket compensation data from: {level_bucket_path}")
-                    self.general_salary_data = pd.read_csv(level_bucket_path)
-                    
-                return
-                
-            # Try to find the directory by checking various paths
-            print("Trying to find salary data files in various locations...")
-            # Original directory-based loading logic
-            possible_dirs = [
-                self.salary_data_dir,  # Specified directory
-                os.path.dirname(self.salary_data_dir) if not os.path.isdir(self.salary_data_dir) else self.salary_data_dir,  # Parent directory if it's a file
-                os.path.join(os.path.dirname(__file__), "..", "..", "..", "data"),  # Project data directory
-                os.path.join(os.path.dirname(__file__), "..", "data"),  # Agent data directory
-                os.path.abspath(self.salary_data_dir)  # Absolute path
-            ]
+            if sources["company_salary"]:
+                print(f"Loading company compensation data from: {sources['company_salary']}")
+                self.company_salary_data = self._read_csv(sources["company_salary"])
             
-            for directory in possible_dirs:
-                if not os.path.exists(directory):
-                    continue
-                    
-                print(f"Checking directory: {directory}")
-                level_company_path = os.path.join(directory, 'Level_compensation_by_company.csv')
-                level_bucket_path = os.path.join(directory, 'Level_compensation_by_bucket.csv')
-                
-                if os.path.exists(level_company_path):
-                    print(f"Loading company compensation data from: {level_company_path}")
-                    self.company_salary_data = pd.read_csv(level_company_path)
-                    break
-                
-                if os.path.exists(level_bucket_path):
-                    print(f"Loading bucket compensation data from: {level_bucket_path}")
-                    self.general_salary_data = pd.read_csv(level_bucket_path)
-                    break
+            if sources["general_salary"]:
+                print(f"Loading bucket compensation data from: {sources['general_salary']}")
+                self.general_salary_data = self._read_csv(sources["general_salary"])
             
             if self.company_salary_data is None and self.general_salary_data is None:
                 print(f"Salary data files not found. Using default values.")
@@ -113,41 +354,13 @@ class DataLoader:
         try:
             print("Attempting to load job postings data...")
             
-            # Determine project root directory
-            file_dir = os.path.dirname(os.path.abspath(__file__))
-            project_root = os.path.abspath(os.path.join(file_dir, "../../../.."))
-            
-            # Try various possible locations for the job postings file
-            possible_paths = [
-                os.path.join(project_root, "data/filtered_job_description.csv"),  # Project data directory
-                os.path.join(project_root, "filtered_job_description.csv"),  # Project root
-                "filtered_job_description.csv",  # Current directory
-                "../filtered_job_description.csv",  # Parent directory
-                os.path.join(file_dir, "../../../filtered_job_description.csv"),  # Relative to this file
-                os.path.join(file_dir, "../../../data/filtered_job_description.csv"),  # Project data directory
-            ]
-            
-            # If we have company data from a file, check the same directory
-            if self.company_salary_data is not None and isinstance(self.salary_data_dir, str) and os.path.exists(self.salary_data_dir):
-                data_dir = os.path.dirname(self.salary_data_dir)
-                possible_paths.append(os.path.join(data_dir, "filtered_job_description.csv"))
-                
-                # Also check parent directories
-                possible_paths.append(os.path.join(os.path.dirname(data_dir), "data/filtered_job_description.csv"))
-                possible_paths.append(os.path.join(os.path.dirname(os.path.dirname(data_dir)), "data/filtered_job_description.csv"))
-            
-            job_postings_path = None
-            for path in possible_paths:
-                if os.path.exists(path):
-                    job_postings_path = path
-                    print(f"Found job postings file at: {path}")
-                    break
-                    
+            job_postings_path = self.resolve_source_files()["job_postings"]
             if job_postings_path is None:
                 print("Job postings file not found. Continuing without job postings data.")
                 return
+            print(f"Found job postings file at: {job_postings_path}")
             
-            self.job_postings_data = pd.read_csv(job_postings_path, on_bad_lines='skip', 
+            self.job_postings_data = self._read_csv(job_postings_path, on_bad_lines='skip', 
                                                  encoding='utf-8', low_memory=False)
             if not self.job_postings_data.empty:
                 print(f"Job postings data loaded successfully from: {job_postings_path}")
@@ -168,85 +381,49 @@ class DataLoader:
         if not self.job_postings_loaded or self.job_postings_data is None:
             return
         
-        title_mapping = {
-            'software developer': 'Software Engineer',
-            'front end developer': 'Frontend Engineer',
-            'backend developer': 'Backend Engineer',
-            'full stack developer': 'Full Stack Engineer',
-            'data scientist': 'Data Scientist',
-            'data analyst': 'Data Analyst',
-            'data engineer': 'Data Engineer',
-            'machine learning engineer': 'Machine Learning Engineer',
-            'devops engineer': 'DevOps Engineer',
-            'product manager': 'Product Manager',
-            'ux designer': 'UX Designer',
-            'ui designer': 'UI Designer'
-        }
+        # Normalize each distinct title once, then map the column; missing titles stay empty rather than "nan"
+        titles = self.job_postings_data['job_title']
+        normalized = {title: normalize_job_title(title) for title in titles.dropna().unique()}
+        self.job_postings_data['normalized_title'] = titles.map(normalized).fillna('')
         
-        self.job_postings_data['normalized_title'] = self.job_postings_data['job_title'].str.lower()
-        for key, value in title_mapping.items():
-            mask = self.job_postings_data['normalized_title'].str.contains(key, na=False)
-            self.job_postings_data.loc[mask, 'normalized_title'] = value
+        # Title lookups resolve through token posting lists instead of scanning every row
+        self.normalized_title_index = TitleIndex(self.job_postings_data['normalized_title'])
+        self.job_title_index = TitleIndex(titles.fillna(''))
+        self._matching_ids.clear()
         
-        self.job_postings_data['normalized_title'] = self.job_postings_data['normalized_title'].str.title()
+        # Extract skills for the whole corpus in one pass; a role's skills are then a column sum
+        text_columns = self.job_postings_data.reindex(
+            columns=['description_text', 'qualifications', 'description'], fill_value=''
+        ).astype(str)
+        texts = text_columns['description_text'].str.cat(
+            [text_columns['qualifications'], text_columns['description']], sep=' '
+        ).str.lower()
+        self.skill_matrix = PostingSkillMatrix(texts)
+        self.job_postings_skills = {}
+    
+    def matching_posting_ids(self, role: str) -> np.ndarray:
+        """Row positions of postings whose normalized or raw title contains the role."""
+        key = (canonical_role(role).lower(), role.strip().lower())
+        ids = self._matching_ids.get(key)
+        if ids is None:
+            ids = np.union1d(self.normalized_title_index.search(key[0]), self.job_title_index.search(key[1]))
+            self._matching_ids[key] = ids
+        return ids
+    
+    def find_matching_postings(self, role: str) -> pd.DataFrame:
+        """Find postings whose normalized or raw title contains the role."""
+        return self.job_postings_data.iloc[self.matching_posting_ids(role)]
     
     def extract_skills_from_job_posting(self, role: str) -> List[str]:
-        """Extract relevant skills for a job role from job postings."""
+        """Extract relevant skills for a job role from job postings, most frequent first."""
+        role = canonical_role(role)
         if role in self.job_postings_skills:
             return self.job_postings_skills[role]
         
         if not self.job_postings_loaded or self.job_postings_data is None:
             return []
         
-        role_lower = role.lower()
-        
-        matching_postings = self.job_postings_data[
-            self.job_postings_data['normalized_title'].str.lower().str.contains(role_lower) |
-            self.job_postings_data['job_title'].str.lower().str.contains(role_lower)
-        ]
-        
-        if matching_postings.empty:
-            return []
-        
-        # Common skill keywords to look for
-        skill_keywords = {
-            'python', 'java', 'javascript', 'c++', 'sql', 'react', 'aws', 
-            'machine learning', 'data analysis', 'cloud', 'agile'
-        }
-        
-        skills = set()
-        
-        for _, posting in matching_postings.iterrows():
-            text = ' '.join([
-                str(posting.get('description_text', '')), 
-                str(posting.get('qualifications', '')),
-                str(posting.get('description', ''))
-            ]).lower()
-            
-            for skill in skill_keywords:
-                if skill in text:
-                    if skill in ['html', 'css', 'sql', 'aws']:
-                        skills.add(skill.upper())
-                    elif skill in ['javascript', 'python', 'java', 'c++']:
-                        skills.add(skill.capitalize())
-                    else:
-                        if ' ' in skill:
-                            skills.add(' '.join(word.capitalize() for word in skill.split()))
-                        else:
-                            skills.add(skill.capitalize())
-            
-            # Extract bullet point skills
-            bullet_points = re.findall(r'[•·■◦-]\s*(.*?)(?:\n|$)', text)
-            for point in bullet_points:
-                words = point.split()
-                if 1 <= len(words) <= 5:
-                    skills.add(' '.join(word.capitalize() for word in words))
-        
-        # Filter out common words and very short skills
-        filtered_skills = [skill for skill in skills if 
-                          len(skill) > 2 and 
-                          len(skill.split()) <= 3 and 
-                          skill.lower() not in {'the', 'and', 'or', 'with'}]
+        filtered_skills = self.skill_matrix.skills_for(self.matching_posting_ids(role))
         
         self.job_postings_skills[role] = filtered_skills
         
@@ -264,28 +441,19 @@ class DataLoader:
         if not self.job_postings_loaded or self.job_postings_data is None:
             return example
         
-        role_lower = role.lower()
+        ids = self.matching_posting_ids(role)
         
-        matching_postings = self.job_postings_data[
-            self.job_postings_data['normalized_title'].str.lower().str.contains(role_lower) |
-            self.job_postings_data['job_title'].str.lower().str.contains(role_lower)
-        ]
-        
-        if matching_postings.empty:
+        if not len(ids):
             return example
         
-        # Find a good example with sufficient description
-        best_posting = None
-        for _, posting in matching_postings.iterrows():
-            description = str(posting.get('description_text', ''))
-            qualifications = str(posting.get('qualifications', ''))
-            
-            if len(description) > 200 and len(qualifications) > 100:
-                best_posting = posting
-                break
+        # Find a good example with sufficient description, comparing text lengths of the matched rows only
+        def longer_than(column: str, length: int) -> np.ndarray:
+            if column not in self.job_postings_data:
+                return np.zeros(len(ids), dtype=bool)
+            return (self.job_postings_data[column].iloc[ids].astype(str).str.len() > length).to_numpy()
         
-        if best_posting is None and not matching_postings.empty:
-            best_posting = matching_postings.iloc[0]
+        good = np.flatnonzero(longer_than('description_text', 200) & longer_than('qualifications', 100))
+        best_posting = self.job_postings_data.iloc[ids[good[0]] if len(good) else ids[0]]
         
         if best_posting is not None:
             example["title"] = str(best_posting.get('job_title', ''))
@@ -0,0 +1,215 @@
+"""
+Columnar binary snapshot of the DataLoader's preprocessed data.
+
+Parsing the posting CSV, normalizing titles and extracting skills on every
+process start takes much longer than reading the result back. A snapshot
+stores the preprocessed frames and the derived indexes as flat numpy arrays
+in one uncompressed .npz file. Frame columns are stored one by one: numeric
+columns as arrays and text columns as a UTF-8 buffer with offsets.
+
+A snapshot records the size, mtime and SHA-256 of every source file it was
+built from. It is used only while all sources are unchanged. A changed
+mtime with identical content (e.g. a fresh checkout) still counts as
+unchanged. Configured by environment variables:
+
+- DATA_SNAPSHOT_DIR: directory of the snapshots (default ~/.cache/career_simulator)
+- DATA_SNAPSHOT_DISABLED=1: always load from the CSV files
+
+Snapshots are identified by the resolved source files, so the one built
+ahead of a deploy with
+
+    python -m agents.career_simulator.utils.data_snapshot
+
+(which loads the same files as the application; pass a data path to
+snapshot another one) is used by every process, whatever its working
+directory.
+"""
+import os
+import sys
+import json
+import hashlib
+import tempfile
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+SNAPSHOT_VERSION = 2
+
+_META_KEY = "__meta__"
+
+
+def file_fingerprint(path: str) -> Dict[str, Any]:
+    """Size, mtime and content hash of a source file."""
+    stat = os.stat(path)
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return {"path": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+            "sha256": digest.hexdigest()}
+
+
+def source_unchanged(fingerprint: Dict[str, Any]) -> bool:
+    """Whether a source file still matches its fingerprint; the content is hashed only if its mtime changed."""
+    try:
+        stat = os.stat(fingerprint["path"])
+    except OSError:
+        return False
+    if stat.st_size != fingerprint["size"]:
+        return False
+    if stat.st_mtime_ns == fingerprint["mtime_ns"]:
+        return True
+    return file_fingerprint(fingerprint["path"])["sha256"] == fingerprint["sha256"]
+
+
+def pack_strings(values: Sequence[Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Store strings as one UTF-8 buffer.
+
+    Returns:
+        (buffer, offsets, nulls): value i is buffer[offsets[i]:offsets[i + 1]], None where nulls[i]
+    """
+    nulls = np.array([value is None or (isinstance(value, float) and np.isnan(value)) for value in values],
+                     dtype=bool)
+    encoded = [b"" if null else str(value).encode("utf-8") for value, null in zip(values, nulls)]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(chunk) for chunk in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets, nulls
+
+
+def unpack_strings(buffer: np.ndarray, offsets: np.ndarray,
+                   nulls: Optional[np.ndarray] = None) -> List[Optional[str]]:
+    """Inverse of pack_strings (nulls may be omitted for lists without None)."""
+    data = buffer.tobytes()
+    bounds = offsets.tolist()
+    values = [data[bounds[i]:bounds[i + 1]].decode("utf-8") for i in range(len(bounds) - 1)]
+    if nulls is not None and nulls.any():
+        values = [None if null else value for value, null in zip(values, nulls.tolist())]
+    return values
+
+
+def pack_frame(name: str, frame: pd.DataFrame, arrays: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """Add a frame's columns to arrays under the name; returns the layout needed to restore it."""
+    columns = []
+    for i, column in enumerate(frame.columns):
+        key = f"{name}/{i}"
+        series = frame[column]
+        if series.dtype.kind in "biuf":
+            arrays[key] = series.to_numpy()
+            columns.append({"name": column, "kind": "numeric"})
+        else:
+            arrays[key + "/buffer"], arrays[key + "/offsets"], arrays[key + "/nulls"] = pack_strings(series.tolist())
+            columns.append({"name": column, "kind": "text"})
+    return {"columns": columns, "rows": len(frame)}
+
+
+def unpack_frame(name: str, layout: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """Restore a frame stored with pack_frame."""
+    data = {}
+    for i, column in enumerate(layout["columns"]):
+        key = f"{name}/{i}"
+        if column["kind"] == "numeric":
+            data[column["name"]] = arrays[key]
+        else:
+            data[column["name"]] = pd.Series(
+                unpack_strings(arrays[key + "/buffer"], arrays[key + "/offsets"], arrays[key + "/nulls"]),
+                dtype="object"
+            ).infer_objects()
+    return pd.DataFrame(data, index=pd.RangeIndex(layout["rows"]))
+
+
+class DataSnapshot:
+    """
+    A snapshot file: named arrays plus metadata, valid while its sources are unchanged.
+    """
+
+    def __init__(self, path: str):
+        """Initialize with the snapshot file path."""
+        self.path = path
+
+    def load(self, key: str) -> Optional[Tuple[Dict[str, np.ndarray], Dict[str, Any]]]:
+        """
+        Read the snapshot if it was built for the key from unchanged sources.
+
+        Returns:
+            (arrays, metadata), or None if there is no valid snapshot
+        """
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with np.load(self.path, allow_pickle=False) as npz:
+                meta = json.loads(npz[_META_KEY].tobytes().decode("utf-8"))
+                if meta.get("version") != SNAPSHOT_VERSION or meta.get("key") != key:
+                    return None
+                if not all(source_unchanged(source) for source in meta["sources"]):
+                    print(f"Data snapshot is stale, rebuilding: {self.path}")
+                    return None
+                arrays = {name: npz[name] for name in npz.files if name != _META_KEY}
+        except Exception as e:
+            print(f"Error reading data snapshot {self.path}: {str(e)}")
+            return None
+        return arrays, meta
+
+    def save(self, key: str, sources: Sequence[str], arrays: Dict[str, np.ndarray],
+             meta: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Write the snapshot atomically.
+
+        Args:
+            key: Identifies what the snapshot was built for
+            sources: Files the data was built from
+            arrays: Named arrays
+            meta: JSON-serializable metadata stored alongside the arrays
+        """
+        meta = dict(meta or {}, version=SNAPSHOT_VERSION, key=key,
+                    sources=[file_fingerprint(path) for path in sources])
+        payload = dict(arrays)
+        payload[_META_KEY] = np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".npz")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **payload)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+def snapshot_from_env(key: str) -> Optional[DataSnapshot]:
+    """
+    The snapshot for a key in DATA_SNAPSHOT_DIR, or None if DATA_SNAPSHOT_DISABLED is set.
+    """
+    if os.getenv("DATA_SNAPSHOT_DISABLED", "").lower() in ("1", "true", "yes"):
+        return None
+    directory = os.getenv("DATA_SNAPSHOT_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "career_simulator")
+    name = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    return DataSnapshot(os.path.join(directory, f"data_snapshot_{name}.npz"))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Rebuild the snapshot for a salary data path (default: the one the application loads)."""
+    from .data_loader import DataLoader, default_salary_data_path
+
+    argv = sys.argv[1:] if argv is None else argv
+    salary_data_path = argv[0] if argv else default_salary_data_path()
+    if salary_data_path is None:
+        print("Could not find the salary compensation data files")
+        return 1
+
+    os.environ.pop("DATA_SNAPSHOT_DISABLED", None)
+    data_loader = DataLoader(salary_data_path, use_snapshot=False)
+    path = data_loader.save_snapshot()
+    if path is None:
+        print("No data was loaded; nothing to snapshot")
+        return 1
+    print(f"Wrote data snapshot: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,238 @@
+"""
+Hedged LLM requests.
+
+A slow response on one call can dominate a simulation's latency. With
+hedging enabled, a call that has not returned after the observed p95
+latency of its operation is sent a second time, and whichever attempt
+finishes first wins. The loser is not cancelled: it still feeds the latency
+estimate, its tokens are settled with the rate limiter, and it stands in
+if the winner fails. Its response is otherwise discarded; the winner's is
+the one that gets cached.
+
+Synchronous callers block, so a hedged call runs both attempts on a small
+thread pool. Calls only move to the pool when a hedge could be sent (the
+operation has enough samples and there is hedge budget and two free
+threads); every other call runs on the caller's thread.
+
+Hedges are capped at a fraction of all requests and are only sent while
+the shared rate limiter has spare capacity, so they never queue behind or
+delay other calls. Configured by environment variables:
+
+- LLM_HEDGING=1: enable hedging (off by default)
+- LLM_HEDGE_QUANTILE: latency percentile that triggers a hedge (default 95)
+- LLM_HEDGE_MAX_RATE: maximum hedges per request (default 0.05)
+- LLM_HEDGE_MIN_SAMPLES: samples needed before an operation is hedged (default 20)
+"""
+import os
+import time
+import asyncio
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set
+
+from .rate_limiter import DEFAULT_COMPLETION_TOKENS, TokenBucketRateLimiter, get_rate_limiter
+
+# Latest latencies kept per operation for the percentile estimate
+LATENCY_WINDOW = 200
+
+
+class HedgePolicy:
+    """
+    Sends a duplicate of slow calls and returns whichever attempt finishes first.
+    """
+
+    def __init__(self, enabled: bool = True, quantile: float = 95.0, max_hedge_rate: float = 0.05,
+                 min_samples: int = 20, limiter: Optional[TokenBucketRateLimiter] = None, max_workers: int = 8):
+        """
+        Initialize the policy.
+
+        Args:
+            enabled: Whether calls are hedged (latencies are recorded either way)
+            quantile: Latency percentile (0-100) after which a hedge is sent
+            max_hedge_rate: Maximum ratio of hedges to requests
+            min_samples: Latency samples an operation needs before it is hedged
+            limiter: Rate limiter that must have spare capacity for a hedge
+            max_workers: Threads running synchronous hedged calls (two per call)
+        """
+        self.enabled = enabled
+        self.quantile = quantile
+        self.max_hedge_rate = max_hedge_rate
+        self.min_samples = min_samples
+        self.max_workers = max_workers
+        self.limiter = limiter or get_rate_limiter()
+
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._losers: Set[asyncio.Future] = set()
+        self._lock = threading.Lock()
+        # Pool threads taken by running attempts
+        self._busy_workers = 0
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-hedge") if enabled else None
+
+    @classmethod
+    def from_env(cls) -> "HedgePolicy":
+        """Create a policy configured by the LLM_HEDG* variables."""
+        return cls(
+            enabled=os.getenv("LLM_HEDGING", "").lower() in ("1", "true", "yes"),
+            quantile=float(os.getenv("LLM_HEDGE_QUANTILE", 95)),
+            max_hedge_rate=float(os.getenv("LLM_HEDGE_MAX_RATE", 0.05)),
+            min_samples=int(os.getenv("LLM_HEDGE_MIN_SAMPLES", 20))
+        )
+
+    def hedge_delay(self, operation: str) -> Optional[float]:
+        """Seconds after which a call of the operation is hedged, or None while too few samples exist."""
+        with self._lock:
+            samples = sorted(self._latencies.get(operation, ()))
+        if len(samples) < self.min_samples:
+            return None
+        index = min(len(samples) - 1, int(len(samples) * self.quantile / 100))
+        return samples[index]
+
+    def call(self, operation: str, fn: Callable[[], Any]) -> Any:
+        """Call fn, hedging it if it is slower than the operation's percentile."""
+        delay = self.hedge_delay(operation) if self.enabled else None
+        self._count_request()
+        if delay is None or not self._hedge_budget_left() or not self._reserve_workers(2):
+            return self._timed(operation, fn)
+
+        primary = self._submit(operation, fn)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._claim_hedge():
+            self._release_workers(1)
+            return primary.result()
+
+        hedge = self._submit(operation, fn)
+        attempts = [primary, hedge]
+        pending = set(attempts)
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for attempt in attempts:
+                if attempt in done and attempt.exception() is None:
+                    self._count_win(attempt is hedge)
+                    return attempt.result()
+                if attempt in done:
+                    error = attempt.exception()
+        raise error
+
+    async def acall(self, operation: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Async version of call; fn returns an awaitable."""
+        delay = self.hedge_delay(operation) if self.enabled else None
+        self._count_request()
+        if delay is None:
+            return await self._atimed(operation, fn)
+
+        primary = asyncio.ensure_future(self._atimed(operation, fn))
+        attempts = [primary]
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done or not self._claim_hedge():
+                return await primary
+
+            hedge = asyncio.ensure_future(self._atimed(operation, fn))
+            attempts.append(hedge)
+            pending = set(attempts)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in attempts:
+                    if attempt in done and attempt.exception() is None:
+                        self._count_win(attempt is hedge)
+                        for loser in pending:
+                            self._keep_loser(loser)
+                        return attempt.result()
+                    if attempt in done:
+                        error = attempt.exception()
+            raise error
+        except asyncio.CancelledError:
+            # The caller gave up (e.g. the retry policy's timeout); nobody will read the attempts
+            for attempt in attempts:
+                attempt.cancel()
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        """Request, hedge and hedge win counts, and the current hedge delay per operation."""
+        with self._lock:
+            operations = list(self._latencies)
+            stats = {
+                "enabled": self.enabled,
+                "requests": self.requests,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "hedge_rate": self.hedges / self.requests if self.requests else 0.0
+            }
+        stats["hedge_delay_seconds"] = {operation: self.hedge_delay(operation) for operation in operations}
+        return stats
+
+    def _submit(self, operation: str, fn: Callable[[], Any]) -> Future:
+        """Run an attempt on a reserved pool thread, freeing the thread when it finishes."""
+        attempt = self._pool.submit(contextvars.copy_context().run, self._timed, operation, fn)
+        attempt.add_done_callback(lambda _: self._release_workers(1))
+        return attempt
+
+    def _reserve_workers(self, count: int) -> bool:
+        with self._lock:
+            if self._busy_workers + count > self.max_workers:
+                return False
+            self._busy_workers += count
+            return True
+
+    def _release_workers(self, count: int) -> None:
+        with self._lock:
+            self._busy_workers -= count
+
+    def _keep_loser(self, attempt: asyncio.Future) -> None:
+        """Let a losing attempt finish in the background, still recording its latency."""
+        self._losers.add(attempt)
+        attempt.add_done_callback(self._discard_loser)
+
+    def _discard_loser(self, attempt: asyncio.Future) -> None:
+        self._losers.discard(attempt)
+        if not attempt.cancelled():
+            attempt.exception()
+
+    def _timed(self, operation: str, fn: Callable[[], Any]) -> Any:
+        start = time.perf_counter()
+        result = fn()
+        self._record(operation, time.perf_counter() - start)
+        return result
+
+    async def _atimed(self, operation: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        start = time.perf_counter()
+        result = await fn()
+        self._record(operation, time.perf_counter() - start)
+        return result
+
+    def _record(self, operation: str, latency: float) -> None:
+        with self._lock:
+            if operation not in self._latencies:
+                self._latencies[operation] = deque(maxlen=LATENCY_WINDOW)
+            self._latencies[operation].append(latency)
+
+    def _count_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def _hedge_budget_left(self) -> bool:
+        """Whether the hedge rate allows one more hedge (without claiming it)."""
+        with self._lock:
+            return self.hedges + 1 <= self.max_hedge_rate * self.requests
+
+    def _claim_hedge(self) -> bool:
+        """Take one hedge from the budget if the rate and the rate limiter allow it."""
+        if not self.limiter.has_capacity(DEFAULT_COMPLETION_TOKENS):
+            return False
+        with self._lock:
+            if self.hedges + 1 > self.max_hedge_rate * self.requests:
+                return False
+            self.hedges += 1
+            return True
+
+    def _count_win(self, hedge_won: bool) -> None:
+        if hedge_won:
+            with self._lock:
+                self.hedge_wins += 1
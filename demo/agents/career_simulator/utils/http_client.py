@@ -0,0 +1,198 @@
+"""
+Shared keep-alive HTTP clients for OpenAI calls.
+
+Every OpenAI client in the process (LangChain chat models and the raw
+OpenAI SDK client) is built on the same httpx.Client / httpx.AsyncClient,
+so connections and TLS sessions are reused across call sites instead of
+each client holding its own pool.
+
+Pool limits come from environment variables:
+
+- LLM_HTTP_MAX_CONNECTIONS: open connections per client (default 100)
+- LLM_HTTP_MAX_KEEPALIVE: idle connections kept alive (default 20)
+- LLM_HTTP_KEEPALIVE_EXPIRY: seconds an idle connection is kept (default 30)
+
+The transports trace each request, counting new and reused connections and
+timing how long requests wait for a free connection (see http_pool_stats).
+The async client belongs to the application's event loop and is closed
+with aclose_http_clients() on shutdown.
+"""
+import os
+import time
+import threading
+from typing import Any, Dict, Optional
+import httpx
+
+from .llm_metrics import Histogram
+
+POOL_WAIT_BUCKETS_SECONDS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+CONNECT_BUCKETS_SECONDS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Client-level timeout; the OpenAI SDK overrides it per request
+DEFAULT_TIMEOUT = httpx.Timeout(600.0, connect=5.0)
+
+
+def pool_limits_from_env() -> httpx.Limits:
+    """Connection pool limits configured by environment variables."""
+    return httpx.Limits(
+        max_connections=int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", 100)),
+        max_keepalive_connections=int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", 20)),
+        keepalive_expiry=float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", 30))
+    )
+
+
+class PoolStats:
+    """
+    Connection reuse and pool wait measurements of one client.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.reused_connections = 0
+        self.pool_wait = Histogram(POOL_WAIT_BUCKETS_SECONDS)
+        self.connect_time = Histogram(CONNECT_BUCKETS_SECONDS)
+
+    def record(self, trace: "_RequestTrace") -> None:
+        """Aggregate the trace of a request that reached the server."""
+        if trace.sent_at is None:
+            return
+        with self._lock:
+            self.requests += 1
+            if trace.connect_seconds is None:
+                self.reused_connections += 1
+            else:
+                self.new_connections += 1
+                self.connect_time.observe(trace.connect_seconds)
+            self.pool_wait.observe(trace.pool_wait_seconds())
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": self.reused_connections,
+                "reuse_rate": self.reused_connections / self.requests if self.requests else None,
+                "pool_wait_seconds": self.pool_wait.to_dict(),
+                "connect_seconds": self.connect_time.to_dict()
+            }
+
+
+class _RequestTrace:
+    """
+    Timeline of one request from httpcore's trace events.
+
+    Time until the request headers are sent, minus the time spent opening a
+    connection, is the time the request waited for a free connection.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.sent_at: Optional[float] = None
+        self.connect_seconds: Optional[float] = None
+        self._connect_started: Optional[float] = None
+
+    def __call__(self, event: str, info: Dict[str, Any]) -> None:
+        now = time.perf_counter()
+        if event == "connection.connect_tcp.started":
+            self._connect_started = now
+        elif event in ("connection.start_tls.complete", "connection.connect_tcp.complete"):
+            if self._connect_started is not None:
+                self.connect_seconds = now - self._connect_started
+        elif event.endswith("send_request_headers.started") and self.sent_at is None:
+            self.sent_at = now
+
+    async def atrace(self, event: str, info: Dict[str, Any]) -> None:
+        self(event, info)
+
+    def pool_wait_seconds(self) -> float:
+        return max(0.0, self.sent_at - self.started_at - (self.connect_seconds or 0.0))
+
+
+class _InstrumentedTransport(httpx.BaseTransport):
+    """Pooled transport that traces every request into PoolStats."""
+
+    def __init__(self, limits: httpx.Limits, stats: PoolStats):
+        self._transport = httpx.HTTPTransport(limits=limits)
+        self._stats = stats
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        trace = _RequestTrace()
+        request.extensions["trace"] = trace
+        try:
+            return self._transport.handle_request(request)
+        finally:
+            self._stats.record(trace)
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class _AsyncInstrumentedTransport(httpx.AsyncBaseTransport):
+    """Async version of _InstrumentedTransport."""
+
+    def __init__(self, limits: httpx.Limits, stats: PoolStats):
+        self._transport = httpx.AsyncHTTPTransport(limits=limits)
+        self._stats = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        trace = _RequestTrace()
+        request.extensions["trace"] = trace.atrace
+        try:
+            return await self._transport.handle_async_request(request)
+        finally:
+            self._stats.record(trace)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+_lock = threading.Lock()
+_client: Optional[httpx.Client] = None
+_async_client: Optional[httpx.AsyncClient] = None
+_stats = {"sync": PoolStats(), "async": PoolStats()}
+
+
+def get_http_client() -> httpx.Client:
+    """Return the process-wide keep-alive client for synchronous calls."""
+    global _client
+    with _lock:
+        if _client is None or _client.is_closed:
+            _client = httpx.Client(
+                transport=_InstrumentedTransport(pool_limits_from_env(), _stats["sync"]),
+                timeout=DEFAULT_TIMEOUT,
+                follow_redirects=True
+            )
+        return _client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Return the process-wide keep-alive client for async calls."""
+    global _async_client
+    with _lock:
+        if _async_client is None or _async_client.is_closed:
+            _async_client = httpx.AsyncClient(
+                transport=_AsyncInstrumentedTransport(pool_limits_from_env(), _stats["async"]),
+                timeout=DEFAULT_TIMEOUT,
+                follow_redirects=True
+            )
+        return _async_client
+
+
+def http_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Connection reuse and pool wait statistics of the sync and async clients."""
+    return {name: stats.to_dict() for name, stats in _stats.items()}
+
+
+async def aclose_http_clients() -> None:
+    """Close the shared clients and their idle connections."""
+    global _client, _async_client
+    with _lock:
+        client, async_client = _client, _async_client
+        _client = _async_client = None
+
+    if client is not None:
+        client.close()
+    if async_client is not None:
+        await async_client.aclose()
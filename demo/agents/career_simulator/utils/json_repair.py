@@ -0,0 +1,239 @@
+"""
+Tolerant parsing of JSON produced by language models.
+
+Model output is often almost JSON: wrapped in Markdown code fences or prose,
+with trailing or missing commas, single quotes, Python literals, unquoted
+keys, raw newlines in strings or a response cut off mid-object. Asking the
+model again costs a full round trip, so loads_tolerant repairs these defects
+locally and only gives up on output that holds no JSON at all.
+"""
+import re
+import json
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+_FENCE = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.S)
+_NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?$")
+_LITERALS = {"true": "true", "false": "false", "null": "null", "none": "null"}
+
+# Characters that can end a JSON value, after which a new value needs a comma
+_VALUE_END = set('"}]') | set("0123456789") | set("eElL")
+
+_stats = {"parsed": 0, "repaired": 0, "failed": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(outcome: str) -> None:
+    with _stats_lock:
+        _stats[outcome] += 1
+
+
+def repair_stats() -> Dict[str, int]:
+    """How many payloads parsed as-is, needed repair, or could not be parsed."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def loads_tolerant(text: str) -> Any:
+    """
+    Parse JSON from model output, repairing common defects.
+
+    Args:
+        text: Model output containing a JSON object or array
+
+    Returns:
+        The parsed value
+
+    Raises:
+        ValueError: If the output contains no recoverable JSON
+    """
+    if not isinstance(text, str):
+        raise ValueError(f"Expected text, got {type(text).__name__}")
+
+    fenced = _FENCE.search(text)
+    candidates = [fenced.group(1).strip()] if fenced else []
+    candidates.append(text.strip())
+    for candidate in candidates:
+        try:
+            value = json.loads(candidate)
+            _count("parsed")
+            return value
+        except ValueError:
+            pass
+
+    for candidate in candidates:
+        start = _json_start(candidate)
+        if start is None:
+            continue
+        try:
+            value = json.loads(repair_json(candidate[start:]))
+            _count("repaired")
+            return value
+        except ValueError:
+            pass
+
+    _count("failed")
+    raise ValueError(f"No parseable JSON in model output: {text[:200]!r}")
+
+
+def _json_start(text: str) -> Optional[int]:
+    positions = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    return min(positions) if positions else None
+
+
+def _next_significant(text: str, i: int) -> int:
+    while i < len(text) and text[i].isspace():
+        i += 1
+    return i
+
+
+def _last_significant(out: List[str]) -> str:
+    for chunk in reversed(out):
+        stripped = chunk.rstrip()
+        if stripped:
+            return stripped[-1]
+    return ""
+
+
+def _drop_last_significant(out: List[str]) -> None:
+    while out and not out[-1].strip():
+        out.pop()
+    if out:
+        out[-1] = out[-1].rstrip()[:-1]
+
+
+def _string_end(text: str, j: int) -> bool:
+    """Whether a quote at j closes its string rather than being part of it."""
+    k = _next_significant(text, j + 1)
+    if k >= len(text) or text[k] in ",:}]":
+        return True
+    # A value on the next line means a comma is missing after this string
+    return "\n" in text[j + 1:k]
+
+
+def _read_string(text: str, i: int) -> Tuple[str, int]:
+    """Read a single- or double-quoted string starting at i; returns it as JSON and the next index."""
+    quote = text[i]
+    buf = []
+    j = i + 1
+    while j < len(text):
+        ch = text[j]
+        if ch == "\\" and j + 1 < len(text):
+            nxt = text[j + 1]
+            buf.append("'" if nxt == "'" else text[j:j + 2])
+            j += 2
+            continue
+        if ch == quote and _string_end(text, j):
+            return '"' + "".join(buf) + '"', j + 1
+        if ch == '"':
+            buf.append('\\"')
+        elif ch == "\n":
+            buf.append("\\n")
+        elif ch == "\r":
+            buf.append("\\r")
+        elif ch == "\t":
+            buf.append("\\t")
+        elif ord(ch) < 0x20:
+            buf.append(f"\\u{ord(ch):04x}")
+        else:
+            buf.append(ch)
+        j += 1
+    # Cut off mid-string: close it
+    return '"' + "".join(buf) + '"', j
+
+
+def _read_token(text: str, i: int) -> Tuple[str, int]:
+    """Read a bare token (literal, number, unquoted key or word) starting at i."""
+    j = i
+    while j < len(text) and text[j] not in ",:{}[]\"'\n" and not (text[j] == "/" and text[j + 1:j + 2] in ("/", "*")):
+        j += 1
+    return text[i:j].strip(), j
+
+
+def repair_json(text: str) -> str:
+    """
+    Rewrite near-valid JSON starting at its first bracket into valid JSON.
+
+    Text after the outermost value is ignored and unclosed strings, arrays and
+    objects at the end are closed.
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    i = 0
+    n = len(text)
+
+    def needs_comma() -> bool:
+        return bool(stack) and _last_significant(out) in _VALUE_END
+
+    while i < n:
+        ch = text[i]
+
+        if ch.isspace():
+            out.append(ch)
+            i += 1
+        elif ch == "/" and text[i + 1:i + 2] == "/":
+            end = text.find("\n", i)
+            i = n if end < 0 else end
+        elif ch == "/" and text[i + 1:i + 2] == "*":
+            end = text.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+        elif ch in "\"'":
+            if needs_comma():
+                out.append(",")
+            string, i = _read_string(text, i)
+            out.append(string)
+        elif ch in "{[":
+            if needs_comma():
+                out.append(",")
+            stack.append("}" if ch == "{" else "]")
+            out.append(ch)
+            i += 1
+        elif ch in "}]":
+            i += 1
+            if ch not in stack:
+                continue
+            while stack:
+                last = _last_significant(out)
+                if last == ",":
+                    _drop_last_significant(out)
+                elif last == ":":
+                    out.append("null")
+                closer = stack.pop()
+                out.append(closer)
+                if closer == ch:
+                    break
+            if not stack:
+                break
+        elif ch == ",":
+            if _last_significant(out) not in (",", "[", "{", ""):
+                out.append(",")
+            i += 1
+        elif ch == ":":
+            out.append(":")
+            i += 1
+        else:
+            token, i = _read_token(text, i)
+            if not token:
+                i += 1
+                continue
+            if needs_comma():
+                out.append(",")
+            if text[_next_significant(text, i):_next_significant(text, i) + 1] == ":":
+                out.append(json.dumps(token))
+            elif token.lower() in _LITERALS:
+                out.append(_LITERALS[token.lower()])
+            elif _NUMBER.match(token):
+                out.append(token)
+            else:
+                out.append(json.dumps(token))
+
+    # Cut off mid-value: drop a dangling comma or key, then close what is open
+    while stack:
+        last = _last_significant(out)
+        if last == ",":
+            _drop_last_significant(out)
+        elif last == ":":
+            out.append("null")
+        out.append(stack.pop())
+
+    return "".join(out)
@@ -0,0 +1,329 @@
+"""
+Pluggable chat model backends.
+
+Every backend exposes invoke(messages) and ainvoke(messages) returning a
+message with a .content attribute, like a LangChain chat model:
+
+- OpenAIBackend: calls OpenAI through ChatOpenAI (needs OPENAI_API_KEY) over
+  the shared keep-alive HTTP clients
+- RecordingBackend: wraps another backend and appends every prompt and
+  response to a JSONL recording
+- ReplayBackend: answers from a recording with synthetic latency, without
+  network access or an API key
+- RateLimitedBackend: waits for the process-wide rate limiter before each call
+
+bind_schema(name, json_schema) returns a backend whose responses carry JSON
+matching the schema; OpenAI backends enforce it with function calling.
+
+create_llm_backend picks the backend from LLM_BACKEND ('openai', 'record' or
+'replay'). When benchmarking with replay, also set LLM_CACHE_DISABLED=1 so
+the persistent response cache does not hide the backend calls.
+"""
+import os
+import copy
+import json
+import time
+import random
+import asyncio
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional
+from langchain_core.messages import AIMessage
+
+from .http_client import get_async_http_client, get_http_client
+from .rate_limiter import Priority, TokenBucketRateLimiter, estimate_tokens, get_rate_limiter
+
+# Maps LangChain message types to chat roles, so dict and LangChain messages key alike
+_MESSAGE_ROLES = {"human": "user", "ai": "assistant", "system": "system"}
+
+
+def message_key(model_name: str, messages: List[Any]) -> str:
+    """Key a prompt by model and message roles and contents."""
+    normalized = []
+    for message in messages:
+        if isinstance(message, dict):
+            normalized.append([message.get("role"), message.get("content")])
+        elif isinstance(message, (tuple, list)):
+            normalized.append([message[0], message[1]])
+        else:
+            normalized.append([_MESSAGE_ROLES.get(message.type, message.type), message.content])
+
+    payload = json.dumps({"model": model_name, "messages": normalized}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMBackend:
+    """
+    Interface for chat model backends.
+    """
+
+    model_name = ""
+
+    def invoke(self, messages: List[Any]) -> Any:
+        """Send messages and return the response message."""
+        raise NotImplementedError
+
+    async def ainvoke(self, messages: List[Any]) -> Any:
+        """Async version of invoke; runs invoke in a thread unless overridden."""
+        return await asyncio.to_thread(self.invoke, messages)
+
+    def bind_schema(self, name: str, json_schema: Dict[str, Any]) -> "LLMBackend":
+        """
+        Return a backend whose response content is JSON matching the schema.
+
+        Backends that cannot constrain the model return themselves; the
+        prompt's format instructions and tolerant parsing then apply.
+        """
+        return self
+
+
+def function_call_message(response: Any) -> AIMessage:
+    """Turn a forced function call response into a message whose content is the call's JSON arguments."""
+    usage = getattr(response, "usage_metadata", None)
+    if getattr(response, "tool_calls", None):
+        content = json.dumps(response.tool_calls[0]["args"])
+    elif getattr(response, "invalid_tool_calls", None):
+        # Arguments that are not valid JSON are left to tolerant parsing
+        content = response.invalid_tool_calls[0].get("args") or ""
+    else:
+        content = response.content
+    return AIMessage(content=content, usage_metadata=usage) if usage else AIMessage(content=content)
+
+
+class OpenAIBackend(LLMBackend):
+    """
+    Calls OpenAI chat models through ChatOpenAI.
+    """
+
+    def __init__(self, model_name: str, temperature: float = 0.2, api_key: Optional[str] = None,
+                 timeout: Optional[float] = None):
+        """
+        Initialize the client.
+
+        Args:
+            model_name: OpenAI model name
+            temperature: Sampling temperature
+            api_key: API key (defaults to OPENAI_API_KEY)
+            timeout: Request timeout in seconds; retries are left to the caller's retry policy
+        """
+        from langchain_openai import ChatOpenAI
+
+        api_key = api_key or os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY environment variable not set. Please set it before running.")
+
+        self.model_name = model_name
+        self.client = ChatOpenAI(
+            model_name=model_name, temperature=temperature, api_key=api_key, timeout=timeout, max_retries=0,
+            http_client=get_http_client(), http_async_client=get_async_http_client()
+        )
+        self._runnable = self.client
+        self._function_name: Optional[str] = None
+
+    def bind_schema(self, name: str, json_schema: Dict[str, Any]) -> LLMBackend:
+        """Force a function call whose parameters are the schema; the response content is its arguments."""
+        bound = copy.copy(self)
+        bound._function_name = name
+        bound._runnable = self.client.bind_tools(
+            [{"type": "function", "function": {"name": name, "description": f"Return the {name} result",
+                                               "parameters": json_schema}}],
+            tool_choice=name
+        )
+        return bound
+
+    def invoke(self, messages: List[Any]) -> Any:
+        response = self._runnable.invoke(messages)
+        return function_call_message(response) if self._function_name else response
+
+    async def ainvoke(self, messages: List[Any]) -> Any:
+        response = await self._runnable.ainvoke(messages)
+        return function_call_message(response) if self._function_name else response
+
+
+class RateLimitedBackend(LLMBackend):
+    """
+    Waits for the shared rate limiter before every call of another backend.
+
+    Tokens are reserved for the prompt plus an expected completion and
+    settled against the reported usage once the response arrives.
+    """
+
+    def __init__(self, backend: LLMBackend, limiter: TokenBucketRateLimiter, priority: int = Priority.BACKGROUND):
+        """
+        Initialize the wrapper.
+
+        Args:
+            backend: Backend that sends the requests
+            limiter: Shared rate limiter
+            priority: Priority class of this backend's calls
+        """
+        self.backend = backend
+        self.model_name = backend.model_name
+        self.limiter = limiter
+        self.priority = priority
+
+    def bind_schema(self, name: str, json_schema: Dict[str, Any]) -> LLMBackend:
+        return RateLimitedBackend(self.backend.bind_schema(name, json_schema), self.limiter, self.priority)
+
+    def invoke(self, messages: List[Any]) -> Any:
+        reserved = estimate_tokens(messages, self.model_name)
+        self.limiter.acquire(reserved, self.priority)
+        response = self.backend.invoke(messages)
+        self._settle(reserved, response)
+        return response
+
+    async def ainvoke(self, messages: List[Any]) -> Any:
+        reserved = estimate_tokens(messages, self.model_name)
+        await self.limiter.aacquire(reserved, self.priority)
+        response = await self.backend.ainvoke(messages)
+        self._settle(reserved, response)
+        return response
+
+    def _settle(self, reserved: int, response: Any) -> None:
+        usage = getattr(response, "usage_metadata", None)
+        if usage and "total_tokens" in usage:
+            self.limiter.settle(reserved, usage["total_tokens"])
+
+
+class RecordingBackend(LLMBackend):
+    """
+    Records every prompt and response of another backend to a JSONL file.
+    """
+
+    def __init__(self, backend: LLMBackend, path: str):
+        """
+        Initialize the recorder.
+
+        Args:
+            backend: Backend that answers the prompts
+            path: JSONL file the records are appended to
+        """
+        self.backend = backend
+        self.model_name = backend.model_name
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def bind_schema(self, name: str, json_schema: Dict[str, Any]) -> LLMBackend:
+        bound = copy.copy(self)
+        bound.backend = self.backend.bind_schema(name, json_schema)
+        return bound
+
+    def invoke(self, messages: List[Any]) -> Any:
+        start = time.perf_counter()
+        response = self.backend.invoke(messages)
+        self._record(messages, response.content, time.perf_counter() - start)
+        return response
+
+    async def ainvoke(self, messages: List[Any]) -> Any:
+        start = time.perf_counter()
+        response = await self.backend.ainvoke(messages)
+        self._record(messages, response.content, time.perf_counter() - start)
+        return response
+
+    def _record(self, messages: List[Any], content: str, latency: float) -> None:
+        """Append one prompt/response record."""
+        record = {
+            "key": message_key(self.model_name, messages),
+            "model": self.model_name,
+            "content": content,
+            "latency": round(latency, 4)
+        }
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+
+class ReplayBackend(LLMBackend):
+    """
+    Answers prompts from a recording made by RecordingBackend.
+
+    Each call sleeps for a synthetic latency before answering: either the
+    latency recorded with the response or a fixed latency, plus uniform
+    jitter. Prompts missing from the recording raise KeyError.
+    """
+
+    def __init__(self, path: str, model_name: str = "", latency_seconds: Optional[float] = 0.0,
+                 jitter_seconds: float = 0.0, seed: Optional[int] = None):
+        """
+        Load a recording.
+
+        Args:
+            path: JSONL recording
+            model_name: Model the prompts are keyed on
+            latency_seconds: Fixed latency per call, or None to replay the recorded latency
+            jitter_seconds: Maximum random latency added to each call
+            seed: Seed for the jitter
+        """
+        self.path = path
+        self.model_name = model_name
+        self.latency_seconds = latency_seconds
+        self.jitter_seconds = jitter_seconds
+        self._random = random.Random(seed)
+        self._responses: Dict[str, Dict[str, Any]] = {}
+
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    self._responses[record["key"]] = record
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def invoke(self, messages: List[Any]) -> Any:
+        record = self._find(messages)
+        time.sleep(self._latency(record))
+        return AIMessage(content=record["content"])
+
+    async def ainvoke(self, messages: List[Any]) -> Any:
+        record = self._find(messages)
+        await asyncio.sleep(self._latency(record))
+        return AIMessage(content=record["content"])
+
+    def _find(self, messages: List[Any]) -> Dict[str, Any]:
+        """Look up the recorded response for a prompt."""
+        key = message_key(self.model_name, messages)
+        if key not in self._responses:
+            raise KeyError(f"No recorded response for this {self.model_name} prompt in {self.path}")
+        return self._responses[key]
+
+    def _latency(self, record: Dict[str, Any]) -> float:
+        """Synthetic latency of one call in seconds."""
+        base = record.get("latency", 0.0) if self.latency_seconds is None else self.latency_seconds
+        if self.jitter_seconds:
+            base += self._random.uniform(0.0, self.jitter_seconds)
+        return base
+
+
+def create_llm_backend(model_name: str, temperature: float = 0.2, api_key: Optional[str] = None,
+                       timeout: Optional[float] = None, priority: int = Priority.BACKGROUND) -> LLMBackend:
+    """
+    Create the backend configured by environment variables.
+
+    LLM_BACKEND selects 'openai' (default), 'record' or 'replay', and
+    LLM_RECORDING_PATH sets the recording file (default llm_recordings.jsonl).
+    For replay, LLM_REPLAY_LATENCY_MS sets a fixed latency or 'recorded' to
+    replay recorded latencies, and LLM_REPLAY_JITTER_MS adds random jitter.
+    OpenAI calls go through the shared rate limiter with the given priority.
+    """
+    mode = os.getenv("LLM_BACKEND", "openai").lower()
+    path = os.getenv("LLM_RECORDING_PATH", "llm_recordings.jsonl")
+
+    if mode in ("openai", "record"):
+        backend = RateLimitedBackend(
+            OpenAIBackend(model_name, temperature, api_key, timeout), get_rate_limiter(), priority
+        )
+        return backend if mode == "openai" else RecordingBackend(backend, path)
+    if mode == "replay":
+        latency = os.getenv("LLM_REPLAY_LATENCY_MS", "0")
+        return ReplayBackend(
+            path,
+            model_name,
+            latency_seconds=None if latency == "recorded" else float(latency) / 1000,
+            jitter_seconds=float(os.getenv("LLM_REPLAY_JITTER_MS", "0")) / 1000
+        )
+    raise ValueError(f"Unknown LLM backend '{mode}'. Expected 'openai', 'record' or 'replay'")
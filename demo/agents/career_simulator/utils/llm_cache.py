@@ -0,0 +1,371 @@
+import os
+import json
+import time
+import sqlite3
+import atexit
+import hashlib
+import weakref
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class LLMResponseCache:
+    """
+    Persistent LLM response cache shared by every process on the machine.
+
+    Entries live in a SQLite database in WAL mode, so concurrent readers and
+    writers in different processes (e.g. several uvicorn workers) are safe.
+    Entries expire after a TTL and the least recently used entries are evicted
+    once the cache grows past max_entries. Hit and miss counters are kept per
+    instance and as totals in the database.
+
+    Reads do not write: last access times and the shared counters are
+    buffered and written in one transaction every flush_every lookups or
+    flush_interval seconds. Expired and surplus entries are pruned every
+    prune_every writes or prune_interval seconds rather than on each write,
+    so the cache can briefly exceed max_entries.
+
+    The cache is optional: a database error (e.g. a locked or damaged file)
+    is logged once and the lookup counts as a miss, the store is skipped.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 7 * 24 * 3600, max_entries: int = 10000,
+                 flush_every: int = 64, flush_interval: float = 5.0,
+                 prune_every: int = 100, prune_interval: float = 60.0):
+        """
+        Initialize the cache, creating the database if needed.
+
+        Args:
+            path: SQLite database file
+            ttl_seconds: Default time-to-live of an entry
+            max_entries: Maximum number of entries before LRU eviction
+            flush_every: Buffered lookups that trigger a write of access times and counters
+            flush_interval: Seconds after which buffered lookups are written
+            prune_every: Writes between expiry and eviction passes
+            prune_interval: Seconds after which a write runs an expiry and eviction pass
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.prune_every = prune_every
+        self.prune_interval = prune_interval
+        self.hits = 0
+        self.misses = 0
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        # Buffered by lookups, written by _flush
+        self._pending_access: Dict[str, float] = {}
+        self._pending_counts: Dict[str, int] = {"hits": 0, "misses": 0}
+        self._pending_lookups = 0
+        self._last_flush = time.monotonic()
+
+        # Writes since the last prune
+        self._writes_since_prune = 0
+        self._last_prune = time.monotonic()
+
+        # Set once a database error has been logged
+        self._error_logged = False
+
+        # Write what is still buffered when the process exits
+        atexit.register(_flush_at_exit, weakref.ref(self))
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+            conn.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    @staticmethod
+    def make_key(model: str, template: str, arguments: Dict[str, Any]) -> str:
+        """Build a cache key from the model, the prompt template and its arguments."""
+        payload = json.dumps(
+            {"model": model, "template": template, "arguments": arguments},
+            sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Tuple[bool, Any, Optional[float]]:
+        """
+        Look up a key.
+
+        Returns:
+            (found, value, expires_at); value and expires_at (a time.time() timestamp)
+            are None when not found or expired
+        """
+        now = time.time()
+        try:
+            row = self._connection().execute(
+                "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            value = json.loads(row[0]) if row is not None and row[1] >= now else _MISSING
+        except (sqlite3.Error, ValueError) as e:
+            self._log_error("lookup", e)
+            value = _MISSING
+
+        if value is _MISSING:
+            self._count("misses")
+            return False, None, None
+
+        self._count("hits", key, now)
+        return True, value, row[1]
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Store a JSON-serializable value, evicting the least recently used entries if full."""
+        now = time.time()
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+
+        with self._lock:
+            self._writes_since_prune += 1
+            prune = (self._writes_since_prune >= self.prune_every
+                     or time.monotonic() - self._last_prune >= self.prune_interval)
+            if prune:
+                self._writes_since_prune = 0
+                self._last_prune = time.monotonic()
+
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value), now + ttl, now)
+                )
+                if prune:
+                    self._prune(conn, now)
+        except sqlite3.Error as e:
+            self._log_error("store", e)
+
+    def _prune(self, conn: sqlite3.Connection, now: float) -> None:
+        """Delete expired entries, then the least recently used ones past max_entries."""
+        # Evict by up-to-date access times
+        self._write_pending(conn)
+        conn.execute("DELETE FROM entries WHERE expires_at < ?", (now,))
+
+        overflow = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM entries WHERE key IN "
+                "(SELECT key FROM entries ORDER BY last_access ASC LIMIT ?)",
+                (overflow,)
+            )
+
+    def flush(self) -> None:
+        """Write buffered access times and counters now (dropped if the database fails)."""
+        try:
+            conn = self._connection()
+            with conn:
+                self._write_pending(conn)
+        except sqlite3.Error as e:
+            self._log_error("flush", e)
+
+    def _log_error(self, action: str, error: Exception) -> None:
+        """Report the first database error; later ones would repeat it on every call."""
+        with self._lock:
+            if self._error_logged:
+                return
+            self._error_logged = True
+        print(f"Persistent LLM cache {action} failed, continuing without it: {str(error)}")
+
+    def delete(self, key: str) -> None:
+        """Remove a single entry."""
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        """Remove all entries and reset the counters."""
+        conn = self._connection()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self._pending_access.clear()
+            self._pending_counts = {"hits": 0, "misses": 0}
+            self._pending_lookups = 0
+        with conn:
+            conn.execute("DELETE FROM entries")
+            conn.execute("DELETE FROM stats")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for this instance and totals across processes (None if unreadable)."""
+        self.flush()
+        try:
+            conn = self._connection()
+            totals = dict(conn.execute("SELECT name, value FROM stats").fetchall())
+            entries = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        except sqlite3.Error as e:
+            self._log_error("stats", e)
+            totals = {"hits": None, "misses": None}
+            entries = None
+        lookups = self.hits + self.misses
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "total_hits": totals.get("hits", 0),
+            "total_misses": totals.get("misses", 0),
+            "entries": entries,
+            "max_entries": self.max_entries
+        }
+
+    def _count(self, name: str, key: Optional[str] = None, accessed_at: Optional[float] = None) -> None:
+        """Count a hit/miss locally and buffer it, with the entry's access time, for the database."""
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+            self._pending_counts[name] += 1
+            if key is not None:
+                self._pending_access[key] = accessed_at
+            self._pending_lookups += 1
+            due = (self._pending_lookups >= self.flush_every
+                   or time.monotonic() - self._last_flush >= self.flush_interval)
+
+        if due:
+            self.flush()
+
+    def _write_pending(self, conn: sqlite3.Connection) -> None:
+        """Write buffered access times and counters inside the caller's transaction."""
+        with self._lock:
+            access = list(self._pending_access.items())
+            counts = [(name, count) for name, count in self._pending_counts.items() if count]
+            self._pending_access.clear()
+            self._pending_counts = {"hits": 0, "misses": 0}
+            self._pending_lookups = 0
+            self._last_flush = time.monotonic()
+
+        if access:
+            conn.executemany("UPDATE entries SET last_access = MAX(last_access, ?) WHERE key = ?",
+                             [(accessed_at, key) for key, accessed_at in access])
+        if counts:
+            conn.executemany(
+                "INSERT INTO stats (name, value) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                counts
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+
+def _flush_at_exit(cache_ref: "weakref.ref") -> None:
+    cache = cache_ref()
+    if cache is not None:
+        cache.flush()
+
+
+class TTLCache:
+    """
+    In-process cache whose entries expire after a TTL.
+
+    Supports the dict operations LLMManager uses for its memory caches (in,
+    get, [] and assignment). Expired entries behave as missing, and the least
+    recently used entries are evicted once max_entries is reached.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        """
+        Initialize an empty cache.
+
+        Args:
+            ttl_seconds: Time-to-live of an entry; also used for the persistent copy
+            max_entries: Maximum number of entries before LRU eviction
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the value for key, or default if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self.set(key, value)
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """
+        Store a value.
+
+        Args:
+            key: Entry key
+            value: Entry value
+            ttl_seconds: Remaining lifetime, e.g. of a copy of a persistent entry (capped at the cache's TTL)
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+
+_MISSING = object()
+
+
+def default_cache_from_env() -> Optional[LLMResponseCache]:
+    """
+    Create the persistent cache configured by environment variables.
+
+    LLM_CACHE_PATH sets the database file (default ~/.cache/career_simulator/llm_responses.sqlite3),
+    LLM_CACHE_TTL_SECONDS and LLM_CACHE_MAX_ENTRIES tune expiry and size, and
+    LLM_CACHE_DISABLED=1 turns the cache off. Returns None if the cache is
+    disabled or cannot be opened.
+    """
+    if os.getenv("LLM_CACHE_DISABLED", "").lower() in ("1", "true", "yes"):
+        return None
+
+    path = os.getenv("LLM_CACHE_PATH") or os.path.join(
+        os.path.expanduser("~"), ".cache", "career_simulator", "llm_responses.sqlite3"
+    )
+
+    try:
+        return LLMResponseCache(
+            path,
+            ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", 7 * 24 * 3600)),
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", 10000))
+        )
+    except (sqlite3.Error, OSError) as e:
+        print(f"Persistent LLM cache unavailable, continuing without it: {str(e)}")
+        return None
@@ -1,266 +1,287 @@
-import os
-from typing import Dict, List, Any, Callable, Optional
 import time
+import asyncio
+import hashlib
+from functools import partial
+from typing import Dict, List, Any, Awaitable, Callable, Optional, Tuple
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from langchain.prompts import ChatPromptTemplate
-from langchain.output_parsers import ResponseSchema, StructuredOutputParser
+from langchain.output_parsers import ResponseSchema
+from .llm_cache import LLMResponseCache, TTLCache, default_cache_from_env
+from .single_flight import SingleFlight
+from .role_names import canonical_role
+from .prompt_registry import PromptRegistry
+from .llm_backends import LLMBackend, create_llm_backend
+from .model_router import ModelRouter, ModelTier, get_model_router
+from .rate_limiter import Priority, get_rate_limiter
+from .llm_metrics import current_call, instrumented
+from .hedging import HedgePolicy
+from .resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, is_retryable
 
 # Load environment variables
 load_dotenv()
 
+# Prompt templates; the template text is part of the persistent cache key
+ROLE_SKILLS_TEMPLATE = """
+    You are a career and job market expert. Based on current industry trends,
+    provide a comprehensive list of 10-15 key skills required for the role of {role}.
+    
+    Include both technical and soft skills where relevant. Be specific and use
+    industry-standard terminology.
+    
+    {format_instructions}
+    """
+
+DEFAULT_SALARIES_TEMPLATE = """
+    You are a compensation and job market expert. Based on current industry data for technology roles,
+    provide realistic salary statistics for a {level} level position in the US technology industry.
+    
+    Return values in the following format:
+    - mean: average salary (numeric value)
+    - median: median salary (numeric value)
+    - q1: 1st quartile/25th percentile salary (numeric value)
+    - q3: 3rd quartile/75th percentile salary (numeric value)
+    
+    All values should be in USD without currency symbols or commas.
+    
+    {format_instructions}
+    """
+
+INTERMEDIATE_ROLES_TEMPLATE = """
+    You are a career transition expert. For someone looking to transition from {current_role} to {target_role},
+    suggest 2-3 intermediate roles that would create a logical stepping stone path.
+    
+    Consider roles that:
+    - Share skills with both the current and target roles
+    - Would help build relevant experience for the target role
+    - Represent a gradual progression rather than a dramatic leap
+    
+    {format_instructions}
+    """
+
+JOB_MARKET_INSIGHTS_TEMPLATE = """
+    You are a job market and industry expert. Provide insights about the current job market 
+    for the role of {role}. Include the following information:
+    
+    1. demand_level: Current demand level for this role (Very High, High, Moderate, Low)
+    2. avg_salary_range: Average salary range for this role in the US (formatted as $X-$Y)
+    3. top_companies: List of 3-5 top companies known for hiring this role
+    4. most_requested_skills: List of 5-10 most requested skills for this role
+    5. growth_outlook: Brief assessment of future growth prospects (1-2 sentences)
+    
+    {format_instructions}
+    """
+
+CAREER_PATH_DESCRIPTION_TEMPLATE = """
+    You are a career transition expert. Provide a concise 2-3 sentence description for the 
+    following career path from {current_role} to {target_role}:
+    
+    Path: {path_str}
+    Path type: {path_type}
+    {time_str}
+    
+    Focus on:
+    1. The key benefits of this specific path
+    2. What skills will be developed
+    3. Any tradeoffs or considerations
+    
+    Keep your description factual, realistic, and encouraging without using cliches.
+    Do not include phrases like "this path" or "this approach" at the beginning of your response.
+    Do not mention the time estimate in your description unless it's particularly relevant.
+    """
+
+SKILL_GAP_INSIGHTS_TEMPLATE = """
+    You are a career development and skills expert. Based on the following information:
+    
+    Current skills: {current_skills}
+    Required skills for {target_role}: {target_skills}
+    
+    Provide 2-3 sentences of strategic advice on:
+    1. Which skills to prioritize developing first and why
+    2. The most effective ways to acquire these skills (courses, projects, etc.)
+    3. Any insights on how long it might take to develop these skills to a professional level
+    
+    Be specific, practical, and brief.
+    """
+
+# Operation whose cache each career context field fills
+CAREER_CONTEXT_FIELD_OPERATIONS = {
+    "intermediate_roles": "intermediate_roles",
+    "role_adjacency": "intermediate_roles",
+    "target_role_skills": "role_skills",
+    "skill_gap_insights": "skill_gap_insights",
+    "market_insights": "job_market_insights",
+}
+
+# Parts of the combined career context prompt, by response field
+CAREER_CONTEXT_PARTS = [
+    ("intermediate_roles", """intermediate_roles: 2-3 intermediate roles that create a logical stepping stone path
+       from {current_role} to {target_role}. They should share skills with both roles,
+       build relevant experience and represent a gradual progression."""),
+    ("role_adjacency", """role_adjacency: an object with one entry for {current_role}, for each intermediate role
+       you suggested and for {target_role}. Each value is a list of 2-3 roles that would be a
+       logical next step from that role towards {target_role}."""),
+    ("target_role_skills", """target_role_skills: 10-15 key technical and soft skills required for {target_role},
+       using industry-standard terminology."""),
+    ("skill_gap_insights", """skill_gap_insights: 2-3 sentences of strategic advice on which missing skills to
+       prioritize, how to acquire them and how long that typically takes."""),
+    ("market_insights", """market_insights: an object with demand_level (Very High, High, Moderate, Low),
+       avg_salary_range (US, formatted as $X-$Y), top_companies (3-5 companies hiring
+       {target_role}), most_requested_skills (5-10 skills) and growth_outlook (1-2 sentences).""")
+]
+
+
+def career_context_template(fields: List[str]) -> str:
+    """The combined career context prompt asking for the given fields."""
+    parts = "\n    ".join(
+        f"{number}. {text}"
+        for number, text in enumerate((text for field, text in CAREER_CONTEXT_PARTS if field in fields), start=1)
+    )
+    return f"""
+    You are a career transition, skills and job market expert. A person with the skills
+    [{{current_skills}}] wants to move from {{current_role}} to {{target_role}}.
+    
+    Provide all of the following in a single response:
+    {parts}
+    
+    {{format_instructions}}
+    """
+
+CAREER_CONTEXT_TEMPLATE = career_context_template([field for field, _ in CAREER_CONTEXT_PARTS])
+
+# Time-to-live of cached results that go stale; the other caches use the persistent cache default
+MARKET_INSIGHTS_TTL_SECONDS = 6 * 3600
+SKILL_GAP_INSIGHTS_TTL_SECONDS = 3 * 24 * 3600
+PATH_DESCRIPTION_TTL_SECONDS = 14 * 24 * 3600
+
+# Marks a memory cache miss (None can be a cached value)
+_MISSING = object()
+
+# A prepared LLM request: the formatted messages and a function that parses the response text
+LLMRequest = Tuple[List[Any], Callable[[str], Any]]
+
 class LLMManager:
     """
     Manages interactions with language models and provides caching.
     """
     
-    def __init__(self, use_llm: bool = True):
-        """Initialize LLM manager with optional LLM usage."""
+    def __init__(self, use_llm: bool = True, response_cache: Optional[LLMResponseCache] = None,
+                 persistent_cache: bool = True, backend: Optional[LLMBackend] = None,
+                 retry_policy: Optional[RetryPolicy] = None, circuit_breaker: Optional[CircuitBreaker] = None,
+                 router: Optional[ModelRouter] = None, hedge_policy: Optional[HedgePolicy] = None):
+        """
+        Initialize LLM manager with optional LLM usage.
+        
+        Args:
+            use_llm: Whether to call the LLM
+            response_cache: Persistent cache to use (defaults to the one configured by LLM_CACHE_* variables)
+            persistent_cache: Set to False to keep responses in process memory only
+            backend: Chat model backend for every tier (defaults to one per tier, configured by LLM_BACKEND)
+            retry_policy: Retry, backoff and timeout policy for LLM requests
+            circuit_breaker: Breaker that fails fast while the provider is degraded
+            router: Assigns each call type a model tier (defaults to the one configured by LLM_TIER_* variables)
+            hedge_policy: Duplicates calls slower than their p95 (defaults to the one configured by LLM_HEDG* variables)
+        """
         self.use_llm = use_llm
         self.llm = None
+        self._tier_backends: Dict[str, LLMBackend] = {}
+        self._structured_backends: Dict[Tuple[str, str], LLMBackend] = {}
+        
+        # Skill lists and adjacency go to the fast tier, user-facing prose to the strong tier
+        self.router = router or get_model_router()
+        self.model_name = self.router.tiers[self.router.default_tier].model_name
         
         # Cache for LLM-generated data
         self._role_skills_cache = {}
         self._default_salaries_cache = {}
         self._career_paths_cache = {}
+        self._market_insights_cache = TTLCache(MARKET_INSIGHTS_TTL_SECONDS)
+        self._skill_gap_insights_cache = TTLCache(SKILL_GAP_INSIGHTS_TTL_SECONDS)
+        self._path_descriptions_cache = TTLCache(PATH_DESCRIPTION_TTL_SECONDS)
+        # The combined context includes market insights, so it expires with them
+        self._career_context_cache = TTLCache(MARKET_INSIGHTS_TTL_SECONDS)
+        
+        # Persistent cache shared across restarts and worker processes
+        if response_cache is None and persistent_cache:
+            response_cache = default_cache_from_env()
+        self.response_cache = response_cache
+        
+        # Templates and output parsers are compiled once and shared by every call
+        self.prompts = self._build_prompt_registry()
+        
+        # Concurrent misses for the same cache key share one LLM call
+        self._single_flight = SingleFlight()
+        
+        # Transient failures are retried; repeated failures open the circuit
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        
+        # Calls stuck in the latency tail are hedged with a duplicate request
+        self.hedge_policy = hedge_policy or HedgePolicy.from_env()
         
         # Initialize LLM if enabled
         if self.use_llm:
             try:
-                # Check if API key is available
-                api_key = os.getenv("OPENAI_API_KEY")
-                if not api_key:
-                    raise ValueError("OPENAI_API_KEY environment variable not set. Please set it before running.")
-                
-                self.llm = ChatOpenAI(
-                    model_name="gpt-3.5-turbo",
-                    temperature=0.2,
-                    api_key=api_key
-                )
+                # OpenAI by default; record and replay backends are selected with LLM_BACKEND
+                # Simulation enrichment yields to interactive chat under the shared rate limit
+                if backend is not None:
+                    self._tier_backends = {name: backend for name in self.router.tiers}
+                else:
+                    self._tier_backends = self.router.create_backends(
+                        temperature=0.2, priority=Priority.BACKGROUND, max_timeout=self.retry_policy.timeout_seconds
+                    )
+                self.llm = self._tier_backends[self.router.default_tier]
             except Exception as e:
                 error_msg = f"Error initializing LLM: {str(e)}"
                 print(error_msg)
                 # Instead of falling back, raise an exception to stop execution
                 raise RuntimeError(error_msg)
     
+    # ----------------------------------------------------------------------
+    # Public API (sync)
+    # ----------------------------------------------------------------------
+    
+    @instrumented("role_skills")
     def get_role_skills(self, role: str) -> List[str]:
         """Get skills for a specific role using LLM."""
-        # Check cache
-        if role in self._role_skills_cache:
-            return self._role_skills_cache[role]
-        
-        if not self.use_llm or self.llm is None:
-            # Instead of fallback, raise an error
-            raise RuntimeError("LLM is required but not available. Please check your OpenAI API key.")
-        
-        try:
-            # Define output schema
-            skills_schema = ResponseSchema(
-                name="skills",
-                description="List of key skills required for the role",
-                type="list[str]"
-            )
-            
-            output_parser = StructuredOutputParser.from_response_schemas([skills_schema])
-            format_instructions = output_parser.get_format_instructions()
-            
-            # Define prompt
-            template = """
-            You are a career and job market expert. Based on current industry trends,
-            provide a comprehensive list of 10-15 key skills required for the role of {role}.
-            
-            Include both technical and soft skills where relevant. Be specific and use
-            industry-standard terminology.
-            
-            {format_instructions}
-            """
-            
-            prompt = ChatPromptTemplate.from_template(template)
-            
-            # Generate response
-            messages = prompt.format_messages(
-                role=role,
-                format_instructions=format_instructions
-            )
-            
-            response = self.llm.invoke(messages)
-            parsed_response = output_parser.parse(response.content)
-            skills = parsed_response.get("skills", [])
-            
-            # Cache and return
-            self._role_skills_cache[role] = skills
-            return skills
-            
-        except Exception as e:
-            error_msg = f"Error generating skills for {role}: {str(e)}"
-            print(error_msg)
-            raise RuntimeError(error_msg)
+        role = canonical_role(role)
+        return self._cached(
+            "role_skills",
+            self._role_skills_cache, role, ROLE_SKILLS_TEMPLATE, {"role": role},
+            lambda: self._run("role_skills", partial(self._role_skills_request, role), f"Error generating skills for {role}")
+        )
     
+    @instrumented("default_salaries")
     def get_default_salaries(self, level: str) -> Dict[str, float]:
         """Get default salaries for a career level using LLM."""
-        # Check cache
-        if level in self._default_salaries_cache:
-            return self._default_salaries_cache[level]
-        
-        if not self.use_llm or self.llm is None:
-            # Instead of fallback, raise an error
-            raise RuntimeError("LLM is required but not available. Please check your OpenAI API key.")
-        
-        try:
-            # Define output schema
-            salary_schema = ResponseSchema(
-                name="salary_data",
-                description="Salary statistics for the given level",
-                type="object"
-            )
-            
-            output_parser = StructuredOutputParser.from_response_schemas([salary_schema])
-            format_instructions = output_parser.get_format_instructions()
-            
-            # Define prompt
-            template = """
-            You are a compensation and job market expert. Based on current industry data for technology roles,
-            provide realistic salary statistics for a {level} level position in the US technology industry.
-            
-            Return values in the following format:
-            - mean: average salary (numeric value)
-            - median: median salary (numeric value)
-            - q1: 1st quartile/25th percentile salary (numeric value)
-            - q3: 3rd quartile/75th percentile salary (numeric value)
-            
-            All values should be in USD without currency symbols or commas.
-            
-            {format_instructions}
-            """
-            
-            prompt = ChatPromptTemplate.from_template(template)
-            
-            # Generate response
-            messages = prompt.format_messages(
-                level=level,
-                format_instructions=format_instructions
-            )
-            
-            response = self.llm.invoke(messages)
-            parsed_response = output_parser.parse(response.content)
-            salary_data = parsed_response.get("salary_data", {})
-            
-            # Cache and return
-            self._default_salaries_cache[level] = salary_data
-            return salary_data
-            
-        except Exception as e:
-            error_msg = f"Error generating salary data for {level}: {str(e)}"
-            print(error_msg)
-            raise RuntimeError(error_msg)
+        return self._cached(
+            "default_salaries",
+            self._default_salaries_cache, level, DEFAULT_SALARIES_TEMPLATE, {"level": level},
+            lambda: self._run("default_salaries", partial(self._default_salaries_request, level), f"Error generating salary data for {level}")
+        )
     
+    @instrumented("intermediate_roles")
     def get_intermediate_roles(self, current_role: str, target_role: str) -> List[str]:
         """Get potential intermediate roles between current and target roles."""
-        # Check cache
+        current_role, target_role = canonical_role(current_role), canonical_role(target_role)
         cache_key = f"{current_role}_to_{target_role}"
-        if cache_key in self._career_paths_cache:
-            return self._career_paths_cache[cache_key]
-        
-        if not self.use_llm or self.llm is None:
-            # Instead of fallback, raise an error
-            raise RuntimeError("LLM is required but not available. Please check your OpenAI API key.")
-        
-        try:
-            # Define output schema
-            paths_schema = ResponseSchema(
-                name="intermediate_roles",
-                description="List of intermediate roles between current and target roles",
-                type="list[str]"
-            )
-            
-            output_parser = StructuredOutputParser.from_response_schemas([paths_schema])
-            format_instructions = output_parser.get_format_instructions()
-            
-            # Define prompt
-            template = """
-            You are a career transition expert. For someone looking to transition from {current_role} to {target_role},
-            suggest 2-3 intermediate roles that would create a logical stepping stone path.
-            
-            Consider roles that:
-            - Share skills with both the current and target roles
-            - Would help build relevant experience for the target role
-            - Represent a gradual progression rather than a dramatic leap
-            
-            {format_instructions}
-            """
-            
-            prompt = ChatPromptTemplate.from_template(template)
-            
-            # Generate response
-            messages = prompt.format_messages(
-                current_role=current_role,
-                target_role=target_role,
-                format_instructions=format_instructions
-            )
-            
-            response = self.llm.invoke(messages)
-            parsed_response = output_parser.parse(response.content)
-            intermediate_roles = parsed_response.get("intermediate_roles", [])
-            
-            # Cache and return
-            self._career_paths_cache[cache_key] = intermediate_roles
-            return intermediate_roles
-                
-        except Exception as e:
-            error_msg = f"Error generating intermediate roles: {str(e)}"
-            print(error_msg)
-            raise RuntimeError(error_msg)
+        return self._cached(
+            "intermediate_roles",
+            self._career_paths_cache, cache_key, INTERMEDIATE_ROLES_TEMPLATE,
+            {"current_role": current_role, "target_role": target_role},
+            lambda: self._run("intermediate_roles", partial(self._intermediate_roles_request, current_role, target_role),
+                              "Error generating intermediate roles")
+        )
     
+    @instrumented("job_market_insights")
     def get_job_market_insights(self, role: str) -> Dict[str, Any]:
         """Get job market insights for a role."""
-        if not self.use_llm or self.llm is None:
-            # Instead of fallback, raise an error
-            raise RuntimeError("LLM is required but not available. Please check your OpenAI API key.")
-            
-        try:
-            # Define output schema
-            insights_schema = ResponseSchema(
-                name="market_insights",
-                description="Job market insights for the specified role",
-                type="object"
-            )
-            
-            output_parser = StructuredOutputParser.from_response_schemas([insights_schema])
-            format_instructions = output_parser.get_format_instructions()
-            
-            # Define prompt
-            template = """
-            You are a job market and industry expert. Provide insights about the current job market 
-            for the role of {role}. Include the following information:
-            
-            1. demand_level: Current demand level for this role (Very High, High, Moderate, Low)
-            2. avg_salary_range: Average salary range for this role in the US (formatted as $X-$Y)
-            3. top_companies: List of 3-5 top companies known for hiring this role
-            4. most_requested_skills: List of 5-10 most requested skills for this role
-            5. growth_outlook: Brief assessment of future growth prospects (1-2 sentences)
-            
-            {format_instructions}
-            """
-            
-            prompt = ChatPromptTemplate.from_template(template)
-            
-            # Generate response
-            messages = prompt.format_messages(
-                role=role,
-                format_instructions=format_instructions
-            )
-            
-            response = self.llm.invoke(messages)
-            parsed_response = output_parser.parse(response.content)
-            market_insights = parsed_response.get("market_insights", {})
-            
-            return market_insights
-            
-        except Exception as e:
-            error_msg = f"Error generating market insights: {str(e)}"
-            print(error_msg)
-            raise RuntimeError(error_msg)
+        role = canonical_role(role)
+        return self._cached(
+            "job_market_insights",
+            self._market_insights_cache, role, JOB_MARKET_INSIGHTS_TEMPLATE, {"role": role},
+            lambda: self._run("job_market_insights", partial(self._job_market_insights_request, role), "Error generating market insights")
+        )
     
+    @instrumented("career_path_description")
     def get_career_path_description(self, path_roles: List[str], current_role: str, 
                                   target_role: str, path_type: str, time_estimate: str) -> str:
         """
@@ -276,57 +297,23 @@ class LLMManager:
         Returns:
             A description of the career path
         """
-        if not self.use_llm or self.llm is None:
-            # Instead of fallback, raise an error
-            raise RuntimeError("LLM is required but not available. Please check your OpenAI API key.")
-            
-        try:
-            # Build the path string
-            path_str = " → ".join(path_roles)
-            
-            # Define the prompt based on path type
-            template = """
-            You are a career transition expert. Provide a concise 2-3 sentence description for the 
-            following career path from {current_role} to {target_role}:
-            
-            Path: {path_str}
-            Path type: {path_type}
-            {time_str}
-            
-            Focus on:
-            1. The key benefits of this specific path
-            2. What skills will be developed
-            3. Any tradeoffs or considerations
-            
-            Keep your description factual, realistic, and encouraging without using cliches.
-            Do not include phrases like "this path" or "this approach" at the beginning of your response.
-            Do not mention the time estimate in your description unless it's particularly relevant.
-            """
-            
-            # Add time info if available
-            time_str = f"Estimated time: {time_estimate}" if time_estimate else ""
-            
-            prompt = ChatPromptTemplate.from_template(template)
-            
-            # Generate response
-            messages = prompt.format_messages(
-                current_role=current_role,
-                target_role=target_role,
-                path_str=path_str,
-                path_type=path_type,
-                time_str=time_str
+        # Descriptions do not depend on the time estimate enough to key on it
+        path_roles = [canonical_role(role) for role in path_roles]
+        current_role, target_role = canonical_role(current_role), canonical_role(target_role)
+        return self._cached(
+            "career_path_description",
+            self._path_descriptions_cache, self._path_description_key(path_roles, current_role, target_role, path_type),
+            CAREER_PATH_DESCRIPTION_TEMPLATE,
+            {"path_roles": path_roles, "current_role": current_role, "target_role": target_role, "path_type": path_type},
+            lambda: self._run(
+                "career_path_description",
+                partial(self._career_path_description_request,
+                        path_roles, current_role, target_role, path_type, time_estimate),
+                "Error generating career path description"
             )
-            
-            response = self.llm.invoke(messages)
-            description = response.content.strip()
-            
-            return description
-            
-        except Exception as e:
-            error_msg = f"Error generating career path description: {str(e)}"
-            print(error_msg)
-            raise RuntimeError(error_msg)
+        )
     
+    @instrumented("skill_gap_insights")
     def get_skill_gap_insights(self, current_skills: List[str], target_skills: List[str], 
                              target_role: str) -> str:
         """
@@ -340,73 +327,659 @@ class LLMManager:
         Returns:
             Insights about skill gaps and development strategies
         """
+        target_role = canonical_role(target_role)
+        return self._cached(
+            "skill_gap_insights",
+            self._skill_gap_insights_cache, self._skill_gap_key(current_skills, target_role),
+            SKILL_GAP_INSIGHTS_TEMPLATE, self._skill_gap_arguments(current_skills, target_role),
+            lambda: self._run(
+                "skill_gap_insights",
+                partial(self._skill_gap_insights_request, current_skills, target_skills, target_role),
+                "Error generating skill gap insights"
+            )
+        )
+    
+    @instrumented("career_context")
+    def get_career_context(self, current_role: str, target_role: str,
+                           current_skills: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Get everything a simulation needs from the LLM in a single round trip.
+        
+        The combined response covers intermediate roles, role adjacency, target role
+        skills, skill gap insights and market insights. Each part is written into
+        the individual caches, so the later get_* calls made while processing the
+        simulation are cache hits.
+        
+        Args:
+            current_role: Starting role
+            target_role: Target role
+            current_skills: Skills the user currently has
+            
+        Returns:
+            The combined career context
+        """
+        current_role, target_role = canonical_role(current_role), canonical_role(target_role)
+        current_skills = current_skills or []
+        context_key = f"{current_role}_to_{target_role}|{self._skill_gap_key(current_skills, target_role)}"
+        context = self._cached(
+            "career_context",
+            self._career_context_cache, context_key, self._career_context_template,
+            self._career_context_arguments(current_role, target_role, current_skills),
+            lambda: self._run(
+                "career_context",
+                partial(self._career_context_request, current_role, target_role, current_skills),
+                "Error generating career context"
+            )
+        )
+        self._distribute_career_context(current_role, target_role, current_skills, context)
+        return context
+    
+    # ----------------------------------------------------------------------
+    # Public API (async)
+    # ----------------------------------------------------------------------
+    # The async methods mirror the sync ones but use ainvoke, so they do not
+    # block the event loop and independent calls can be awaited concurrently
+    # with asyncio.gather. All calls share the ChatOpenAI client and its pool.
+    
+    @instrumented("role_skills")
+    async def aget_role_skills(self, role: str) -> List[str]:
+        """Async version of get_role_skills."""
+        role = canonical_role(role)
+        return await self._acached(
+            "role_skills",
+            self._role_skills_cache, role, ROLE_SKILLS_TEMPLATE, {"role": role},
+            lambda: self._arun("role_skills", partial(self._role_skills_request, role), f"Error generating skills for {role}")
+        )
+    
+    @instrumented("default_salaries")
+    async def aget_default_salaries(self, level: str) -> Dict[str, float]:
+        """Async version of get_default_salaries."""
+        return await self._acached(
+            "default_salaries",
+            self._default_salaries_cache, level, DEFAULT_SALARIES_TEMPLATE, {"level": level},
+            lambda: self._arun("default_salaries", partial(self._default_salaries_request, level), f"Error generating salary data for {level}")
+        )
+    
+    @instrumented("intermediate_roles")
+    async def aget_intermediate_roles(self, current_role: str, target_role: str) -> List[str]:
+        """Async version of get_intermediate_roles."""
+        current_role, target_role = canonical_role(current_role), canonical_role(target_role)
+        cache_key = f"{current_role}_to_{target_role}"
+        return await self._acached(
+            "intermediate_roles",
+            self._career_paths_cache, cache_key, INTERMEDIATE_ROLES_TEMPLATE,
+            {"current_role": current_role, "target_role": target_role},
+            lambda: self._arun("intermediate_roles", partial(self._intermediate_roles_request, current_role, target_role),
+                               "Error generating intermediate roles")
+        )
+    
+    @instrumented("job_market_insights")
+    async def aget_job_market_insights(self, role: str) -> Dict[str, Any]:
+        """Async version of get_job_market_insights."""
+        role = canonical_role(role)
+        return await self._acached(
+            "job_market_insights",
+            self._market_insights_cache, role, JOB_MARKET_INSIGHTS_TEMPLATE, {"role": role},
+            lambda: self._arun("job_market_insights", partial(self._job_market_insights_request, role), "Error generating market insights")
+        )
+    
+    @instrumented("career_path_description")
+    async def aget_career_path_description(self, path_roles: List[str], current_role: str,
+                                           target_role: str, path_type: str, time_estimate: str) -> str:
+        """Async version of get_career_path_description."""
+        path_roles = [canonical_role(role) for role in path_roles]
+        current_role, target_role = canonical_role(current_role), canonical_role(target_role)
+        return await self._acached(
+            "career_path_description",
+            self._path_descriptions_cache, self._path_description_key(path_roles, current_role, target_role, path_type),
+            CAREER_PATH_DESCRIPTION_TEMPLATE,
+            {"path_roles": path_roles, "current_role": current_role, "target_role": target_role, "path_type": path_type},
+            lambda: self._arun(
+                "career_path_description",
+                partial(self._career_path_description_request,
+                        path_roles, current_role, target_role, path_type, time_estimate),
+                "Error generating career path description"
+            )
+        )
+    
+    @instrumented("skill_gap_insights")
+    async def aget_skill_gap_insights(self, current_skills: List[str], target_skills: List[str],
+                                      target_role: str) -> str:
+        """Async version of get_skill_gap_insights."""
+        target_role = canonical_role(target_role)
+        return await self._acached(
+            "skill_gap_insights",
+            self._skill_gap_insights_cache, self._skill_gap_key(current_skills, target_role),
+            SKILL_GAP_INSIGHTS_TEMPLATE, self._skill_gap_arguments(current_skills, target_role),
+            lambda: self._arun(
+                "skill_gap_insights",
+                partial(self._skill_gap_insights_request, current_skills, target_skills, target_role),
+                "Error generating skill gap insights"
+            )
+        )
+    
+    @instrumented("career_context")
+    async def aget_career_context(self, current_role: str, target_role: str,
+                                  current_skills: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Async version of get_career_context."""
+        current_role, target_role = canonical_role(current_role), canonical_role(target_role)
+        current_skills = current_skills or []
+        context_key = f"{current_role}_to_{target_role}|{self._skill_gap_key(current_skills, target_role)}"
+        context = await self._acached(
+            "career_context",
+            self._career_context_cache, context_key, self._career_context_template,
+            self._career_context_arguments(current_role, target_role, current_skills),
+            lambda: self._arun(
+                "career_context",
+                partial(self._career_context_request, current_role, target_role, current_skills),
+                "Error generating career context"
+            )
+        )
+        if self.response_cache is None:
+            self._distribute_career_context(current_role, target_role, current_skills, context)
+        else:
+            await asyncio.to_thread(self._distribute_career_context, current_role, target_role, current_skills, context)
+        return context
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Return persistent cache hit/miss statistics and request coalescing counts."""
+        stats = self.response_cache.stats() if self.response_cache is not None else {}
+        stats["coalesced"] = self._single_flight.coalesced
+        stats["in_flight"] = self._single_flight.in_flight()
+        return stats
+    
+    def tier_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-tier models, latency budgets and call latencies."""
+        return self.router.stats()
+    
+    def hedge_stats(self) -> Dict[str, Any]:
+        """Return hedged request counts and the current hedge delay per operation."""
+        return self.hedge_policy.stats()
+    
+    def model_for(self, operation: str) -> str:
+        """Return the model an operation is routed to."""
+        return self.router.model_for(operation)
+    
+    def rate_limit_stats(self) -> Dict[str, Any]:
+        """Return the shared rate limiter's queue and wait statistics."""
+        return get_rate_limiter().stats()
+    
+    def prompt_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-prompt template sizes, call counts and average prompt sizes in tokens."""
+        return self.prompts.token_counts()
+    
+    # ----------------------------------------------------------------------
+    # Request builders (shared by the sync and async paths)
+    # ----------------------------------------------------------------------
+    
+    def _role_skills_request(self, role: str) -> LLMRequest:
+        """Build the prompt and parser for role skills."""
+        return self.prompts.request("role_skills", role=role)
+    
+    def _default_salaries_request(self, level: str) -> LLMRequest:
+        """Build the prompt and parser for default salaries."""
+        return self.prompts.request("default_salaries", level=level)
+    
+    def _intermediate_roles_request(self, current_role: str, target_role: str) -> LLMRequest:
+        """Build the prompt and parser for intermediate roles."""
+        return self.prompts.request("intermediate_roles", current_role=current_role, target_role=target_role)
+    
+    def _job_market_insights_request(self, role: str) -> LLMRequest:
+        """Build the prompt and parser for job market insights."""
+        return self.prompts.request("job_market_insights", role=role)
+    
+    def _career_path_description_request(self, path_roles: List[str], current_role: str,
+                                         target_role: str, path_type: str, time_estimate: str) -> LLMRequest:
+        """Build the prompt for a career path description."""
+        # Build the path string
+        path_str = " → ".join(path_roles)
+        
+        # Add time info if available
+        time_str = f"Estimated time: {time_estimate}" if time_estimate else ""
+        
+        return self.prompts.request(
+            "career_path_description",
+            current_role=current_role,
+            target_role=target_role,
+            path_str=path_str,
+            path_type=path_type,
+            time_str=time_str
+        )
+    
+    def _skill_gap_insights_request(self, current_skills: List[str], target_skills: List[str],
+                                    target_role: str) -> LLMRequest:
+        """Build the prompt for skill gap insights."""
+        # Format the skills lists
+        current_skills_str = ", ".join(current_skills) if current_skills else "None"
+        target_skills_str = ", ".join(target_skills) if target_skills else "Unknown"
+        
+        return self.prompts.request(
+            "skill_gap_insights",
+            current_skills=current_skills_str,
+            target_skills=target_skills_str,
+            target_role=target_role
+        )
+    
+    def _career_context_request(self, current_role: str, target_role: str,
+                                current_skills: List[str]) -> LLMRequest:
+        """Build the prompt and parser for the combined career context."""
+        return self.prompts.request(
+            "career_context",
+            current_role=current_role,
+            target_role=target_role,
+            current_skills=", ".join(current_skills) if current_skills else "None"
+        )
+    
+    def _build_prompt_registry(self) -> PromptRegistry:
+        """Compile every prompt template and output parser once."""
+        registry = PromptRegistry(self.model_name)
+        
+        registry.register(
+            "role_skills", ROLE_SKILLS_TEMPLATE,
+            [ResponseSchema(
+                name="skills",
+                description="List of key skills required for the role",
+                type="list[str]"
+            )],
+            output_key="skills", default=[]
+        )
+        registry.register(
+            "default_salaries", DEFAULT_SALARIES_TEMPLATE,
+            [ResponseSchema(
+                name="salary_data",
+                description="Salary statistics for the given level",
+                type="object"
+            )],
+            output_key="salary_data", default={}
+        )
+        registry.register(
+            "intermediate_roles", INTERMEDIATE_ROLES_TEMPLATE,
+            [ResponseSchema(
+                name="intermediate_roles",
+                description="List of intermediate roles between current and target roles",
+                type="list[str]"
+            )],
+            output_key="intermediate_roles", default=[]
+        )
+        registry.register(
+            "job_market_insights", JOB_MARKET_INSIGHTS_TEMPLATE,
+            [ResponseSchema(
+                name="market_insights",
+                description="Job market insights for the specified role",
+                type="object"
+            )],
+            output_key="market_insights", default={}
+        )
+        registry.register("career_path_description", CAREER_PATH_DESCRIPTION_TEMPLATE)
+        registry.register("skill_gap_insights", SKILL_GAP_INSIGHTS_TEMPLATE)
+        # The combined call only asks for the parts that can stand in for their own calls,
+        # i.e. whose operations are routed to the same model as career_context
+        context_model = self.model_for("career_context")
+        fields = [
+            field for field, operation in CAREER_CONTEXT_FIELD_OPERATIONS.items()
+            if self.model_for(operation) == context_model
+        ]
+        self._career_context_template = career_context_template(fields)
+        context_schemas = [
+            ResponseSchema(
+                name="intermediate_roles",
+                description="List of intermediate roles between current and target roles",
+                type="list[str]"
+            ),
+            ResponseSchema(
+                name="role_adjacency",
+                description="Object mapping each role on the path to its logical next roles towards the target",
+                type="object"
+            ),
+            ResponseSchema(
+                name="target_role_skills",
+                description="List of key skills required for the target role",
+                type="list[str]"
+            ),
+            ResponseSchema(
+                name="skill_gap_insights",
+                description="Strategic advice on closing the skill gap",
+                type="string"
+            ),
+            ResponseSchema(
+                name="market_insights",
+                description="Job market insights for the target role",
+                type="object"
+            )
+        ]
+        registry.register(
+            "career_context", self._career_context_template,
+            [schema for schema in context_schemas if schema.name in fields]
+        )
+        
+        return registry
+    
+    # ----------------------------------------------------------------------
+    # Invocation and caching
+    # ----------------------------------------------------------------------
+    
+    @property
+    def llm_available(self) -> bool:
+        """
+        Whether LLM calls can currently be made.
+        
+        False when the LLM is disabled or while the circuit breaker is open;
+        models check this to fall back to data-only results without waiting.
+        """
+        return self.use_llm and self.llm is not None and self.circuit_breaker.available
+    
+    def _require_llm(self) -> None:
+        """Raise if the LLM is disabled or failed to initialize."""
         if not self.use_llm or self.llm is None:
+            # Instead of fallback, raise an error
             raise RuntimeError("LLM is required but not available. Please check your OpenAI API key.")
-            
+    
+    def _run(self, operation: str, build_request: Callable[[], LLMRequest], error_prefix: str) -> Any:
+        """Build a request, invoke the operation's model tier with retries and parse the response."""
+        self._require_llm()
+        tier = self.router.tier_for(operation)
+        llm = self._backend_for(tier, operation)
+        
+        start = time.perf_counter()
         try:
-            # Format the skills lists
-            current_skills_str = ", ".join(current_skills) if current_skills else "None"
-            target_skills_str = ", ".join(target_skills) if target_skills else "Unknown"
-            
-            # Define the prompt
-            template = """
-            You are a career development and skills expert. Based on the following information:
-            
-            Current skills: {current_skills}
-            Required skills for {target_role}: {target_skills}
-            
-            Provide 2-3 sentences of strategic advice on:
-            1. Which skills to prioritize developing first and why
-            2. The most effective ways to acquire these skills (courses, projects, etc.)
-            3. Any insights on how long it might take to develop these skills to a professional level
-            
-            Be specific, practical, and brief.
-            """
-            
-            prompt = ChatPromptTemplate.from_template(template)
-            
-            # Generate response
-            messages = prompt.format_messages(
-                current_skills=current_skills_str,
-                target_skills=target_skills_str,
-                target_role=target_role
-            )
-            
-            response = self.llm.invoke(messages)
-            insights = response.content.strip()
-            
-            return insights
-            
+            messages, parse = build_request()
+            response = self._guarded(lambda: self.retry_policy.call(
+                lambda: self.hedge_policy.call(operation, lambda: llm.invoke(messages))
+            ))
+            self.router.record(tier, time.perf_counter() - start)
+            self._record_usage(messages, response)
+            return parse(response.content)
         except Exception as e:
-            error_msg = f"Error generating skill gap insights: {str(e)}"
+            self.router.record(tier, time.perf_counter() - start, error=True)
+            error_msg = f"{error_prefix}: {str(e)}"
             print(error_msg)
-            raise RuntimeError(error_msg)
+            raise RuntimeError(error_msg) from e
+    
+    async def _arun(self, operation: str, build_request: Callable[[], LLMRequest], error_prefix: str) -> Any:
+        """Async version of _run using ainvoke; retries wait without blocking the event loop."""
+        self._require_llm()
+        tier = self.router.tier_for(operation)
+        llm = self._backend_for(tier, operation)
+        
+        start = time.perf_counter()
+        try:
+            messages, parse = build_request()
+            response = await self._aguarded(lambda: self.retry_policy.acall(
+                lambda: self.hedge_policy.acall(operation, lambda: llm.ainvoke(messages))
+            ))
+            self.router.record(tier, time.perf_counter() - start)
+            self._record_usage(messages, response)
+            return parse(response.content)
+        except Exception as e:
+            self.router.record(tier, time.perf_counter() - start, error=True)
+            error_msg = f"{error_prefix}: {str(e)}"
+            print(error_msg)
+            raise RuntimeError(error_msg) from e
+    
+    def _backend_for(self, tier: ModelTier, operation: str) -> LLMBackend:
+        """
+        The tier's backend, bound to the response schema of the operation's prompt.
+
+        Structured prompts are answered through function calling, so the model
+        returns JSON arguments instead of free text that may fail to parse.
+        """
+        key = (tier.name, operation)
+        if key not in self._structured_backends:
+            llm = self._tier_backends[tier.name]
+            if operation in self.prompts.names() and self.prompts.get(operation).json_schema:
+                llm = llm.bind_schema(operation, self.prompts.get(operation).json_schema)
+            self._structured_backends[key] = llm
+        return self._structured_backends[key]
+    
+    def _guarded(self, invoke: Callable[[], Any]) -> Any:
+        """Run an invocation through the circuit breaker."""
+        if not self.circuit_breaker.allow():
+            raise CircuitOpenError("LLM circuit breaker is open; the provider is degraded")
+        try:
+            response = invoke()
+        except Exception as e:
+            self._record_outcome(e)
+            raise
+        self._record_outcome(None)
+        return response
+    
+    async def _aguarded(self, invoke: Callable[[], Awaitable[Any]]) -> Any:
+        """Async version of _guarded."""
+        if not self.circuit_breaker.allow():
+            raise CircuitOpenError("LLM circuit breaker is open; the provider is degraded")
+        try:
+            response = await invoke()
+        except Exception as e:
+            self._record_outcome(e)
+            raise
+        self._record_outcome(None)
+        return response
+    
+    def _record_outcome(self, error: Optional[BaseException]) -> None:
+        """Only transient failures count against the provider; any response means it is up."""
+        if error is not None and is_retryable(error):
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+    
+    def _record_usage(self, messages: List[Any], response: Any) -> None:
+        """Add the tokens of a request to the call being tracked."""
+        call = current_call()
+        if call is not None:
+            call.record_usage(messages, response)
+    
+    def _cached(self, operation: str, memory_cache: Dict, memory_key: str, template: str,
+                arguments: Dict[str, Any], compute: Callable[[], Any]) -> Any:
+        """
+        Return a cached LLM result, computing and storing it on a miss.
+        
+        Looks in the in-process cache first, then the persistent cache, which is
+        keyed by the operation's model, prompt template and arguments. Concurrent
+        misses for the same key are coalesced, so only the first caller calls the LLM.
+        """
+        found, value, persistent_key = self._lookup(operation, memory_cache, memory_key, template, arguments)
+        if found:
+            return value
+        
+        def load():
+            # The previous flight for this key may have finished since the lookup
+            cached = memory_cache.get(memory_key, _MISSING)
+            if cached is not _MISSING:
+                return cached
+            result = compute()
+            self._store(memory_cache, memory_key, persistent_key, result)
+            return result
+        
+        return self._single_flight.do((id(memory_cache), memory_key), load)
+    
+    async def _acached(self, operation: str, memory_cache: Dict, memory_key: str, template: str,
+                       arguments: Dict[str, Any], compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Async version of _cached; compute returns an awaitable.
+        
+        The persistent cache is SQLite, so its lookup and store run in a worker
+        thread rather than blocking the event loop.
+        """
+        if self.response_cache is None or memory_key in memory_cache:
+            found, value, persistent_key = self._lookup(operation, memory_cache, memory_key, template, arguments)
+        else:
+            found, value, persistent_key = await asyncio.to_thread(
+                self._lookup, operation, memory_cache, memory_key, template, arguments
+            )
+        if found:
+            return value
+        
+        async def load():
+            cached = memory_cache.get(memory_key, _MISSING)
+            if cached is not _MISSING:
+                return cached
+            result = await compute()
+            if persistent_key is None:
+                self._store(memory_cache, memory_key, persistent_key, result)
+            else:
+                await asyncio.to_thread(self._store, memory_cache, memory_key, persistent_key, result)
+            return result
+        
+        return await self._single_flight.ado((id(memory_cache), memory_key), load)
+    
+    def _lookup(self, operation: str, memory_cache: Dict, memory_key: str, template: str,
+                arguments: Dict[str, Any]) -> Tuple[bool, Any, Optional[str]]:
+        """Look a result up in memory, then in the persistent cache."""
+        call = current_call()
+        value = memory_cache.get(memory_key, _MISSING)
+        if value is not _MISSING:
+            if call is not None:
+                call.cache_hit = True
+            return True, value, None
+        
+        persistent_key = None
+        if self.response_cache is not None:
+            persistent_key = LLMResponseCache.make_key(self.model_for(operation), template, arguments)
+            found, value, expires_at = self.response_cache.get(persistent_key)
+            if found:
+                if isinstance(memory_cache, TTLCache):
+                    # The memory copy expires with the persistent entry, not a full TTL from now
+                    memory_cache.set(memory_key, value, expires_at - time.time())
+                else:
+                    memory_cache[memory_key] = value
+                if call is not None:
+                    call.cache_hit = True
+                return True, value, persistent_key
+        
+        if call is not None:
+            call.cache_hit = False
+        return False, None, persistent_key
+    
+    def _store(self, memory_cache: Dict, memory_key: str, persistent_key: Optional[str], value: Any) -> None:
+        """Store a freshly computed result in memory and in the persistent cache, with the memory cache's TTL."""
+        memory_cache[memory_key] = value
+        if persistent_key is not None:
+            self.response_cache.set(persistent_key, value, getattr(memory_cache, "ttl_seconds", None))
+    
+    def _distribute_career_context(self, current_role: str, target_role: str,
+                                   current_skills: List[str], context: Dict[str, Any]) -> None:
+        """Write the parts of a combined career context into the individual caches."""
+        parts = []
+        
+        intermediate_roles = context.get("intermediate_roles")
+        if intermediate_roles:
+            parts.append((
+                "intermediate_roles",
+                self._career_paths_cache, f"{current_role}_to_{target_role}", INTERMEDIATE_ROLES_TEMPLATE,
+                {"current_role": current_role, "target_role": target_role}, intermediate_roles
+            ))
+        
+        # Adjacency entries answer get_intermediate_roles(role, target_role) for other path roles
+        for role, next_roles in (context.get("role_adjacency") or {}).items():
+            role = canonical_role(role)
+            if role != current_role and isinstance(next_roles, list):
+                parts.append((
+                    "intermediate_roles",
+                    self._career_paths_cache, f"{role}_to_{target_role}", INTERMEDIATE_ROLES_TEMPLATE,
+                    {"current_role": role, "target_role": target_role}, next_roles
+                ))
+        
+        if context.get("target_role_skills"):
+            parts.append((
+                "role_skills",
+                self._role_skills_cache, target_role, ROLE_SKILLS_TEMPLATE,
+                {"role": target_role}, context["target_role_skills"]
+            ))
+        
+        if context.get("skill_gap_insights"):
+            parts.append((
+                "skill_gap_insights",
+                self._skill_gap_insights_cache, self._skill_gap_key(current_skills, target_role),
+                SKILL_GAP_INSIGHTS_TEMPLATE, self._skill_gap_arguments(current_skills, target_role),
+                context["skill_gap_insights"]
+            ))
+        
+        if context.get("market_insights"):
+            parts.append((
+                "job_market_insights",
+                self._market_insights_cache, target_role, JOB_MARKET_INSIGHTS_TEMPLATE,
+                {"role": target_role}, context["market_insights"]
+            ))
+        
+        # A part only stands in for its own call if both are routed to the same model
+        context_model = self.model_for("career_context")
+        for operation, memory_cache, memory_key, template, arguments, value in parts:
+            if memory_key in memory_cache or self.model_for(operation) != context_model:
+                continue
+            persistent_key = None
+            if self.response_cache is not None:
+                persistent_key = LLMResponseCache.make_key(context_model, template, arguments)
+            self._store(memory_cache, memory_key, persistent_key, value)
+    
+    def _skill_gap_key(self, current_skills: List[str], target_role: str) -> str:
+        """Cache key for skill gap insights: a hash of the sorted current skill set plus the target role."""
+        skills = sorted({skill.strip().lower() for skill in current_skills if skill.strip()})
+        skills_hash = hashlib.sha256("\n".join(skills).encode("utf-8")).hexdigest()[:16]
+        return f"{target_role}|{skills_hash}"
+    
+    def _path_description_key(self, path_roles: List[str], current_role: str,
+                               target_role: str, path_type: str) -> str:
+        """Cache key for a career path description: the path roles plus the path type."""
+        return f"{current_role}_to_{target_role}|{' → '.join(path_roles)}|{path_type}"
+    
+    def _skill_gap_arguments(self, current_skills: List[str], target_role: str) -> Dict[str, Any]:
+        """Persistent cache arguments for skill gap insights."""
+        return {"skills_key": self._skill_gap_key(current_skills, target_role)}
+    
+    def _career_context_arguments(self, current_role: str, target_role: str,
+                                  current_skills: List[str]) -> Dict[str, Any]:
+        """Persistent cache arguments for the combined career context."""
+        return {
+            "current_role": current_role,
+            "target_role": target_role,
+            "skills_key": self._skill_gap_key(current_skills, target_role)
+        }
     
     def with_fallbacks(self, llm_method: Callable, *args, max_retries=2, **kwargs) -> Any:
         """
         Call an LLM method with retries and fallbacks.
         
+        Retries back off exponentially with jitter, as configured by the
+        manager's retry policy.
+        
         Args:
             llm_method: The LLM method to call
-            max_retries: Maximum number of retries
+            max_retries: Maximum number of attempts
             *args, **kwargs: Arguments to pass to the method
             
         Returns:
-            The result of the LLM method or None if all attempts fail
+            The result of the LLM method
         """
         if not self.use_llm:
             raise RuntimeError("LLM is required but not available. Please check your OpenAI API key.")
-            
-        for attempt in range(max_retries):
-            try:
-                return llm_method(*args, **kwargs)
-            except Exception as e:
-                print(f"LLM call failed (attempt {attempt+1}/{max_retries}): {str(e)}")
-                if attempt < max_retries - 1:
-                    # Wait a bit before retrying
-                    time.sleep(1)
-                    
-        # If all retries failed, raise an error
-        error_msg = f"All LLM calls failed after {max_retries} attempts."
-        print(error_msg)
-        raise RuntimeError(error_msg) 
\ No newline at end of file
+        
+        policy = self._fallback_policy(max_retries)
+        try:
+            return policy.call(lambda: llm_method(*args, **kwargs))
+        except Exception as e:
+            error_msg = f"All LLM calls failed after {max_retries} attempts: {str(e)}"
+            print(error_msg)
+            raise RuntimeError(error_msg)
+    
+    async def awith_fallbacks(self, llm_method: Callable[..., Awaitable[Any]], *args, max_retries=2, **kwargs) -> Any:
+        """Async version of with_fallbacks; waits between attempts without blocking the event loop."""
+        if not self.use_llm:
+            raise RuntimeError("LLM is required but not available. Please check your OpenAI API key.")
+        
+        policy = self._fallback_policy(max_retries)
+        try:
+            return await policy.acall(lambda: llm_method(*args, **kwargs))
+        except Exception as e:
+            error_msg = f"All LLM calls failed after {max_retries} attempts: {str(e)}"
+            print(error_msg)
+            raise RuntimeError(error_msg)
+    
+    def _fallback_policy(self, max_attempts: int) -> RetryPolicy:
+        """Retry policy for with_fallbacks: any error except an open circuit is retried."""
+        return RetryPolicy(
+            max_attempts=max_attempts,
+            base_delay=self.retry_policy.base_delay,
+            max_delay=self.retry_policy.max_delay,
+            timeout_seconds=None,
+            retryable=lambda e: not isinstance(e.__cause__, CircuitOpenError)
+        )
@@ -0,0 +1,334 @@
+"""
+Per-call LLM instrumentation.
+
+Each LLM call site runs inside track_llm_call(operation, model), which
+records the wall time, prompt and completion tokens, cache hit or miss,
+retries and errors of the call. Code deeper in the call (cache lookups,
+retry loops) adds to the active record through current_call(). Records are
+aggregated per operation and model into histograms that can be read with
+get_metrics().snapshot() or exported as JSON or Prometheus text.
+"""
+import json
+import time
+import asyncio
+import bisect
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS_SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model_name: str):
+    """Return the tiktoken encoding for a model, or None when it cannot be loaded."""
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        print(f"Token encoding unavailable, estimating token counts: {str(e)}")
+        return None
+
+
+def count_tokens(text: str, model_name: str = "gpt-3.5-turbo") -> int:
+    """Count the tokens of a text, estimating four characters per token without tiktoken."""
+    encoding = get_encoding(model_name)
+    if encoding is None:
+        return max(1, len(text) // 4) if text else 0
+    return len(encoding.encode(text))
+
+
+def _message_text(message: Any) -> str:
+    """Text content of a LangChain, dict or (role, content) message."""
+    if isinstance(message, dict):
+        return str(message.get("content", ""))
+    if isinstance(message, (tuple, list)):
+        return str(message[1])
+    return str(getattr(message, "content", message))
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram with count, sum, min and max.
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        """Initialize with sorted bucket upper bounds; values above the last bound go to +Inf."""
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float) -> None:
+        """Add one observation."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Approximate the q-th percentile (0-100) by the upper bound of its bucket."""
+        if not self.count:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "buckets": {str(bound): count for bound, count in zip(self.buckets + ("+Inf",), self.counts)}
+        }
+
+
+class LLMCall:
+    """
+    Measurements of one instrumented LLM call.
+    """
+
+    def __init__(self, operation: str, model: str):
+        self.operation = operation
+        self.model = model
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cache_hit: Optional[bool] = None
+        self.retries = 0
+        self.error = False
+        self.latency = 0.0
+
+    def record_usage(self, messages: List[Any], response: Any) -> None:
+        """Add the tokens of a request, from the provider's usage data or counted with tiktoken."""
+        usage = getattr(response, "usage_metadata", None)
+        if usage:
+            self.prompt_tokens += usage.get("input_tokens", 0)
+            self.completion_tokens += usage.get("output_tokens", 0)
+            return
+
+        self.prompt_tokens += sum(count_tokens(_message_text(message), self.model) for message in messages)
+        self.completion_tokens += count_tokens(_message_text(response), self.model)
+
+    def add_tokens(self, prompt_tokens: int, completion_tokens: int) -> None:
+        """Add token counts reported by the provider."""
+        self.prompt_tokens += prompt_tokens or 0
+        self.completion_tokens += completion_tokens or 0
+
+
+class _OperationStats:
+    """Aggregated measurements of one operation and model."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.retries = 0
+        self.latency = Histogram(LATENCY_BUCKETS_SECONDS)
+        self.prompt_tokens = Histogram(TOKEN_BUCKETS)
+        self.completion_tokens = Histogram(TOKEN_BUCKETS)
+
+    def add(self, call: LLMCall) -> None:
+        self.calls += 1
+        self.errors += int(call.error)
+        self.retries += call.retries
+        if call.cache_hit is True:
+            self.cache_hits += 1
+        elif call.cache_hit is False:
+            self.cache_misses += 1
+
+        self.latency.observe(call.latency)
+        # Cache hits send no tokens; keep them out of the token histograms
+        if call.cache_hit is not True:
+            self.prompt_tokens.observe(call.prompt_tokens)
+            self.completion_tokens.observe(call.completion_tokens)
+
+    def to_dict(self) -> Dict[str, Any]:
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_rate": self.cache_hits / lookups if lookups else None,
+            "latency_seconds": self.latency.to_dict(),
+            "prompt_tokens": self.prompt_tokens.to_dict(),
+            "completion_tokens": self.completion_tokens.to_dict()
+        }
+
+
+class LLMMetrics:
+    """
+    Thread-safe aggregation of LLM call measurements per operation and model.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], _OperationStats] = {}
+
+    def record(self, call: LLMCall) -> None:
+        """Aggregate a finished call."""
+        with self._lock:
+            key = (call.operation, call.model)
+            if key not in self._stats:
+                self._stats[key] = _OperationStats()
+            self._stats[key].add(call)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Current aggregates, keyed by 'operation|model'."""
+        with self._lock:
+            return {f"{operation}|{model}": stats.to_dict() for (operation, model), stats in self._stats.items()}
+
+    def reset(self) -> None:
+        """Drop all aggregates."""
+        with self._lock:
+            self._stats.clear()
+
+    def export_json(self, path: Optional[str] = None) -> str:
+        """Export the snapshot as JSON, optionally writing it to a file."""
+        text = json.dumps(self.snapshot(), indent=2)
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        return text
+
+    def export_prometheus(self) -> str:
+        """Export the aggregates in the Prometheus text exposition format."""
+        lines = []
+        counters = ("calls", "errors", "retries", "cache_hits", "cache_misses")
+        histograms = (
+            ("latency", "llm_call_latency_seconds"),
+            ("prompt_tokens", "llm_prompt_tokens"),
+            ("completion_tokens", "llm_completion_tokens")
+        )
+
+        with self._lock:
+            items = sorted(self._stats.items())
+            for name in counters:
+                lines.append(f"# TYPE llm_{name}_total counter")
+                for (operation, model), stats in items:
+                    lines.append(f'llm_{name}_total{{operation="{operation}",model="{model}"}} {getattr(stats, name)}')
+
+            for attribute, metric in histograms:
+                lines.append(f"# TYPE {metric} histogram")
+                for (operation, model), stats in items:
+                    histogram = getattr(stats, attribute)
+                    labels = f'operation="{operation}",model="{model}"'
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+                        cumulative += count
+                        lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                    lines.append(f"{metric}_sum{{{labels}}} {histogram.sum}")
+                    lines.append(f"{metric}_count{{{labels}}} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+
+_metrics = LLMMetrics()
+_current_call: contextvars.ContextVar = contextvars.ContextVar("current_llm_call", default=None)
+_call_observers: contextvars.ContextVar = contextvars.ContextVar("llm_call_observers", default=())
+
+
+def get_metrics() -> LLMMetrics:
+    """Return the process-wide metrics registry."""
+    return _metrics
+
+
+def current_call() -> Optional[LLMCall]:
+    """Return the call being tracked in this context, if any."""
+    return _current_call.get()
+
+
+@contextmanager
+def track_llm_call(operation: str, model: str) -> Iterator[LLMCall]:
+    """
+    Track one LLM call: time it and record it when the block exits.
+
+    Nested tracking inside an already tracked call adds to the outer call.
+    """
+    outer = _current_call.get()
+    if outer is not None:
+        yield outer
+        return
+
+    call = LLMCall(operation, model)
+    token = _current_call.set(call)
+    start = time.perf_counter()
+    try:
+        yield call
+    except BaseException:
+        call.error = True
+        raise
+    finally:
+        call.latency = time.perf_counter() - start
+        _current_call.reset(token)
+        _metrics.record(call)
+        for observer in _call_observers.get():
+            observer.append(call)
+
+
+@contextmanager
+def observe_llm_calls() -> Iterator[List[LLMCall]]:
+    """
+    Collect the calls tracked in this block, without tracking anything itself.
+
+    Unlike an outer track_llm_call, which would absorb the calls and record
+    them under its own operation, observing leaves the metrics unchanged.
+    """
+    calls: List[LLMCall] = []
+    token = _call_observers.set(_call_observers.get() + (calls,))
+    try:
+        yield calls
+    finally:
+        _call_observers.reset(token)
+
+
+def instrumented(operation: str) -> Callable:
+    """
+    Decorate an LLMManager method so each call is tracked under operation.
+
+    Works for sync and async methods; the model is the one self.model_for
+    routes the operation to.
+    """
+    def decorator(method: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def async_wrapper(self, *args, **kwargs):
+                with track_llm_call(operation, self.model_for(operation)):
+                    return await method(self, *args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with track_llm_call(operation, self.model_for(operation)):
+                return method(self, *args, **kwargs)
+        return wrapper
+
+    return decorator
@@ -0,0 +1,203 @@
+"""
+Model tiering for LLM calls.
+
+Each call type (operation) is assigned a tier, and each tier names a model
+and a latency budget. Structured lookups such as skill lists, market data
+and role adjacency go to the fast tier; prose shown to the user goes to the
+strong tier. The latency budget is the request timeout of the tier's
+clients, and calls are timed per tier so budget overruns are visible.
+
+Tiers are configured with environment variables:
+
+- LLM_TIER_FAST_MODEL / LLM_TIER_STRONG_MODEL: model of each tier
+- LLM_TIER_FAST_BUDGET_MS / LLM_TIER_STRONG_BUDGET_MS: latency budget of each tier
+- LLM_OPERATION_TIERS: overrides as "operation=tier,...", e.g. "skill_gap_insights=fast"
+"""
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from .llm_backends import LLMBackend, create_llm_backend
+from .llm_metrics import LATENCY_BUCKETS_SECONDS, Histogram
+from .rate_limiter import Priority
+
+FAST = "fast"
+STRONG = "strong"
+
+# Operation names match the ones LLM calls are tracked under in llm_metrics.
+# The combined career_context call answers intermediate_roles, role_skills,
+# skill_gap_insights and job_market_insights only for operations on its own tier,
+# so those stay together; LLMManager drops the other parts from the prompt.
+DEFAULT_OPERATION_TIERS = {
+    "role_skills": FAST,
+    "default_salaries": FAST,
+    "intermediate_roles": FAST,
+    "job_market_insights": FAST,
+    "career_context": FAST,
+    "skill_gap_insights": FAST,
+    "extract_career_data": FAST,
+    "career_path_description": STRONG,
+    "get_career_response": STRONG,
+    "manager_interface": STRONG,
+}
+
+
+class ModelTier:
+    """
+    A model and the latency budget of the calls routed to it.
+    """
+
+    def __init__(self, name: str, model_name: str, latency_budget_seconds: Optional[float] = None):
+        """
+        Initialize a tier.
+
+        Args:
+            name: Tier name
+            model_name: OpenAI model of the tier
+            latency_budget_seconds: Time a call may take (None for no budget)
+        """
+        self.name = name
+        self.model_name = model_name
+        self.latency_budget_seconds = latency_budget_seconds
+
+    def __repr__(self) -> str:
+        return f"ModelTier({self.name!r}, {self.model_name!r}, {self.latency_budget_seconds!r})"
+
+
+class _TierStats:
+    """Latency and budget overruns of one tier."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.over_budget = 0
+        self.latency = Histogram(LATENCY_BUCKETS_SECONDS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "over_budget": self.over_budget,
+            "latency_seconds": self.latency.to_dict()
+        }
+
+
+class ModelRouter:
+    """
+    Assigns operations to model tiers and creates the tiers' backends.
+    """
+
+    def __init__(self, tiers: Optional[Dict[str, ModelTier]] = None,
+                 operation_tiers: Optional[Dict[str, str]] = None, default_tier: str = FAST):
+        """
+        Initialize the router.
+
+        Args:
+            tiers: Tiers by name (defaults to gpt-3.5-turbo as fast and gpt-4 as strong)
+            operation_tiers: Tier name of each operation
+            default_tier: Tier of operations without an assignment
+        """
+        self.tiers = tiers or {
+            FAST: ModelTier(FAST, "gpt-3.5-turbo", 10.0),
+            STRONG: ModelTier(STRONG, "gpt-4", 30.0)
+        }
+        self.operation_tiers = dict(DEFAULT_OPERATION_TIERS)
+        self.operation_tiers.update(operation_tiers or {})
+        self.default_tier = default_tier
+
+        for operation, tier in self.operation_tiers.items():
+            if tier not in self.tiers:
+                raise ValueError(f"Operation '{operation}' is assigned to unknown tier '{tier}'")
+
+        self._lock = threading.Lock()
+        self._stats = {name: _TierStats() for name in self.tiers}
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        """Create a router configured by the LLM_TIER_* and LLM_OPERATION_TIERS variables."""
+        tiers = {}
+        for name, model_name, budget_seconds in ((FAST, "gpt-3.5-turbo", 10.0), (STRONG, "gpt-4", 30.0)):
+            budget_ms = os.getenv(f"LLM_TIER_{name.upper()}_BUDGET_MS")
+            tiers[name] = ModelTier(
+                name,
+                os.getenv(f"LLM_TIER_{name.upper()}_MODEL", model_name),
+                float(budget_ms) / 1000 if budget_ms else budget_seconds
+            )
+
+        operation_tiers = {}
+        for entry in os.getenv("LLM_OPERATION_TIERS", "").split(","):
+            if "=" in entry:
+                operation, tier = entry.split("=", 1)
+                operation_tiers[operation.strip()] = tier.strip()
+
+        return cls(tiers, operation_tiers)
+
+    def tier_for(self, operation: str) -> ModelTier:
+        """Tier an operation is routed to."""
+        return self.tiers[self.operation_tiers.get(operation, self.default_tier)]
+
+    def model_for(self, operation: str) -> str:
+        """Model an operation is routed to."""
+        return self.tier_for(operation).model_name
+
+    def create_backends(self, temperature: float = 0.2, api_key: Optional[str] = None,
+                        priority: int = Priority.BACKGROUND,
+                        max_timeout: Optional[float] = None) -> Dict[str, LLMBackend]:
+        """
+        Create one backend per tier, with the tier's latency budget as request timeout.
+
+        Args:
+            temperature: Sampling temperature
+            api_key: API key (defaults to OPENAI_API_KEY)
+            priority: Rate limiter priority of the calls
+            max_timeout: Upper bound of the request timeout
+
+        Returns:
+            Backends by tier name
+        """
+        backends = {}
+        for name, tier in self.tiers.items():
+            timeout = tier.latency_budget_seconds
+            if max_timeout is not None:
+                timeout = max_timeout if timeout is None else min(timeout, max_timeout)
+            backends[name] = create_llm_backend(
+                tier.model_name, temperature=temperature, api_key=api_key, timeout=timeout, priority=priority
+            )
+        return backends
+
+    def record(self, tier: ModelTier, latency: float, error: bool = False) -> None:
+        """Record the latency of a call routed to a tier."""
+        with self._lock:
+            stats = self._stats.setdefault(tier.name, _TierStats())
+            stats.calls += 1
+            stats.errors += int(error)
+            stats.latency.observe(latency)
+            if tier.latency_budget_seconds is not None and latency > tier.latency_budget_seconds:
+                stats.over_budget += 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-tier model, budget, call counts and latency."""
+        with self._lock:
+            return {
+                name: {
+                    "model": self.tiers[name].model_name if name in self.tiers else None,
+                    "latency_budget_seconds": (
+                        self.tiers[name].latency_budget_seconds if name in self.tiers else None
+                    ),
+                    **stats.to_dict()
+                }
+                for name, stats in self._stats.items()
+            }
+
+
+_shared_router: Optional[ModelRouter] = None
+_shared_lock = threading.Lock()
+
+
+def get_model_router() -> ModelRouter:
+    """Return the router shared by every LLM client in the process."""
+    global _shared_router
+    with _shared_lock:
+        if _shared_router is None:
+            _shared_router = ModelRouter.from_env()
+        return _shared_router
@@ -0,0 +1,85 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional, Set, Tuple
+
+from .data_loader import DataLoader
+from .llm_manager import LLMManager
+from .role_names import canonical_role
+
+
+class RolePrefetcher:
+    """
+    Warms role data in the background as soon as roles are known.
+
+    Chat handlers call prefetch() when a current or target role first shows
+    up in the conversation, turns before the user asks for a simulation.
+    The work runs on a small thread pool and fills the same LLM and posting
+    caches the simulation reads, so the later simulation mostly hits warm
+    caches. Prefetching the same roles again while a prefetch is running is
+    a no-op.
+    """
+
+    def __init__(self, llm_manager: LLMManager, data_loader: DataLoader, max_workers: int = 2):
+        """
+        Initialize the prefetcher.
+
+        Args:
+            llm_manager: LLM manager whose caches are warmed
+            data_loader: Data loader whose role skills are warmed
+            max_workers: Background threads
+        """
+        self.llm_manager = llm_manager
+        self.data_loader = data_loader
+        self.scheduled = 0
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="role-prefetch")
+        self._in_flight: Set[Tuple[str, str]] = set()
+        self._lock = threading.Lock()
+
+    def prefetch(self, current_role: Optional[str], target_role: Optional[str] = None,
+                 current_skills: Optional[List[str]] = None) -> Optional[Future]:
+        """
+        Schedule warming for the given roles without waiting for it.
+
+        Returns:
+            Future of the background work, or None if nothing was scheduled
+        """
+        current_role = canonical_role(current_role) if current_role else ""
+        target_role = canonical_role(target_role) if target_role else ""
+        if not current_role and not target_role:
+            return None
+
+        key = (current_role, target_role)
+        with self._lock:
+            if key in self._in_flight:
+                return None
+            self._in_flight.add(key)
+            self.scheduled += 1
+
+        future = self._pool.submit(self._warm, current_role, target_role, list(current_skills or []))
+        future.add_done_callback(lambda _: self._done(key))
+        return future
+
+    def _done(self, key: Tuple[str, str]) -> None:
+        with self._lock:
+            self._in_flight.discard(key)
+
+    def _warm(self, current_role: str, target_role: str, current_skills: List[str]) -> None:
+        """Fill the posting and LLM caches for the roles."""
+        try:
+            for role in (current_role, target_role):
+                if role:
+                    self.data_loader.extract_skills_from_job_posting(role)
+
+            if not self.llm_manager.llm_available:
+                return
+
+            if current_role and target_role:
+                # One combined call fills target skills, intermediate roles and market insights
+                self.llm_manager.get_career_context(current_role, target_role, current_skills)
+                self.llm_manager.get_role_skills(current_role)
+            else:
+                role = current_role or target_role
+                self.llm_manager.get_role_skills(role)
+                self.llm_manager.get_job_market_insights(role)
+        except Exception as e:
+            print(f"Role prefetch failed for {current_role or '?'} -> {target_role or '?'}: {str(e)}")
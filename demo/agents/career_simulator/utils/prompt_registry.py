@@ -0,0 +1,168 @@
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from langchain.prompts import ChatPromptTemplate
+from langchain.output_parsers import ResponseSchema, StructuredOutputParser
+from .json_repair import loads_tolerant
+from .llm_metrics import get_encoding
+
+# JSON schema of each ResponseSchema type used by the prompts
+_SCHEMA_TYPES = {
+    "string": {"type": "string"},
+    "object": {"type": "object"},
+    "list[str]": {"type": "array", "items": {"type": "string"}},
+    "list[object]": {"type": "array", "items": {"type": "object"}},
+    "int": {"type": "integer"},
+    "float": {"type": "number"},
+    "bool": {"type": "boolean"},
+}
+
+
+class CompiledPrompt:
+    """
+    A prompt template and its output parser, compiled once.
+
+    Format instructions are rendered at compile time and bound into the
+    template, so formatting a request only fills in the call arguments.
+    Structured prompts also carry a JSON schema of their response, which
+    backends use to constrain the model's output (function calling).
+    """
+
+    def __init__(self, name: str, template: str, response_schemas: Optional[List[ResponseSchema]] = None,
+                 output_key: Optional[str] = None, default: Any = None):
+        """
+        Compile a prompt.
+
+        Args:
+            name: Registry name of the prompt
+            template: Template text with {placeholders}
+            response_schemas: Structured output schemas; None for free-text responses
+            output_key: Key of the parsed response to return (None returns the whole object)
+            default: Value returned when output_key is missing from the response
+        """
+        self.name = name
+        self.template = template
+        self.output_key = output_key
+        self.default = default
+
+        self.parser = None
+        self.format_instructions = ""
+        self.json_schema: Optional[Dict[str, Any]] = None
+        self.prompt = ChatPromptTemplate.from_template(template)
+        if response_schemas:
+            self.parser = StructuredOutputParser.from_response_schemas(response_schemas)
+            self.format_instructions = self.parser.get_format_instructions()
+            self.prompt = self.prompt.partial(format_instructions=self.format_instructions)
+            self.json_schema = self._build_json_schema(response_schemas)
+            self._keys = [schema.name for schema in response_schemas]
+
+    def format(self, **kwargs) -> List[Any]:
+        """Fill in the template and return the chat messages."""
+        return self.prompt.format_messages(**kwargs)
+
+    def parse(self, content: str) -> Any:
+        """
+        Parse a response: structured output, or stripped text for free-text prompts.
+
+        Structured output is parsed tolerantly (see json_repair), so near-valid
+        JSON does not cost another request.
+        """
+        if self.parser is None:
+            return content.strip()
+
+        parsed = loads_tolerant(content)
+        if not isinstance(parsed, dict):
+            if len(self._keys) != 1:
+                raise ValueError(f"Expected a JSON object for prompt '{self.name}', got {type(parsed).__name__}")
+            # A bare value for a single-field response
+            parsed = {self._keys[0]: parsed}
+
+        if self.output_key is None:
+            return parsed
+        return parsed.get(self.output_key, self.default)
+
+    @staticmethod
+    def _build_json_schema(response_schemas: List[ResponseSchema]) -> Dict[str, Any]:
+        """JSON schema of a structured response."""
+        properties = {}
+        for schema in response_schemas:
+            prop = dict(_SCHEMA_TYPES.get(schema.type, {}))
+            prop["description"] = schema.description
+            properties[schema.name] = prop
+        return {"type": "object", "properties": properties, "required": list(properties)}
+
+
+class PromptRegistry:
+    """
+    Named prompts compiled once, with token accounting.
+
+    Records the token count of each template (including its format
+    instructions) and the number and total size of the prompts formatted from
+    it. Tokens are counted with tiktoken for the model when available,
+    otherwise estimated at four characters per token.
+    """
+
+    def __init__(self, model_name: str = "gpt-3.5-turbo"):
+        """Initialize an empty registry for a model."""
+        self.model_name = model_name
+        self._prompts: Dict[str, CompiledPrompt] = {}
+        self._usage: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._encoding = get_encoding(model_name)
+
+    def register(self, name: str, template: str, response_schemas: Optional[List[ResponseSchema]] = None,
+                 output_key: Optional[str] = None, default: Any = None) -> CompiledPrompt:
+        """Compile and register a prompt (see CompiledPrompt for the arguments)."""
+        compiled = CompiledPrompt(name, template, response_schemas, output_key, default)
+        self._prompts[name] = compiled
+        self._usage[name] = {
+            "template_tokens": self.count_tokens(template.replace("{format_instructions}", compiled.format_instructions)),
+            "calls": 0,
+            "prompt_tokens": 0
+        }
+        return compiled
+
+    def get(self, name: str) -> CompiledPrompt:
+        """Return a registered prompt."""
+        if name not in self._prompts:
+            raise KeyError(f"Unknown prompt '{name}'")
+        return self._prompts[name]
+
+    def names(self) -> List[str]:
+        """Names of the registered prompts."""
+        return list(self._prompts)
+
+    def request(self, name: str, **kwargs) -> Tuple[List[Any], Callable[[str], Any]]:
+        """
+        Format a registered prompt and record its size.
+
+        Returns:
+            (messages, parse) for the LLM call
+        """
+        compiled = self.get(name)
+        messages = compiled.format(**kwargs)
+        tokens = sum(self.count_tokens(str(message.content)) for message in messages)
+
+        with self._lock:
+            usage = self._usage[name]
+            usage["calls"] += 1
+            usage["prompt_tokens"] += tokens
+
+        return messages, compiled.parse
+
+    def count_tokens(self, text: str) -> int:
+        """Count the tokens of a text for the registry's model."""
+        if self._encoding is None:
+            return max(1, len(text) // 4)
+        return len(self._encoding.encode(text))
+
+    def token_counts(self) -> Dict[str, Dict[str, Any]]:
+        """Per-prompt template size, call count and average prompt size in tokens."""
+        with self._lock:
+            return {
+                name: {
+                    "template_tokens": usage["template_tokens"],
+                    "calls": usage["calls"],
+                    "avg_prompt_tokens": usage["prompt_tokens"] / usage["calls"] if usage["calls"] else 0.0
+                }
+                for name, usage in self._usage.items()
+            }
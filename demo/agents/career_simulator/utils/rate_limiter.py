@@ -0,0 +1,302 @@
+"""
+Process-wide rate limiting for OpenAI calls.
+
+All LLM clients in the process share one TokenBucketRateLimiter (see
+get_rate_limiter), which limits requests per minute and tokens per minute.
+Callers wait in a priority queue, so interactive chat is served before
+background simulation enrichment, and the queue works for threads and
+asyncio tasks alike.
+
+A request reserves its estimated tokens (prompt plus expected completion)
+before it is sent; settle() corrects the bucket with the actual usage.
+"""
+import os
+import time
+import heapq
+import asyncio
+import itertools
+import threading
+from typing import Any, Dict, List, Optional
+from langchain_core.rate_limiters import BaseRateLimiter
+
+from .llm_metrics import count_tokens
+
+# Completion size assumed when reserving tokens before a request
+DEFAULT_COMPLETION_TOKENS = 500
+
+
+class Priority:
+    """Priority classes; lower values are served first."""
+    INTERACTIVE = 0
+    BACKGROUND = 10
+
+    NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+
+class _Waiter:
+    """A caller waiting for capacity."""
+
+    def __init__(self, priority: int, seq: int, tokens: int, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+        self.granted = False
+        self.cancelled = False
+        self.loop = loop
+        self.event = threading.Event() if loop is None else None
+        self.future = loop.create_future() if loop is not None else None
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+    def wake(self) -> None:
+        if self.event is not None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class TokenBucketRateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute token buckets with a priority queue.
+
+    Each bucket holds up to one minute of capacity and refills continuously.
+    Waiters are granted strictly in (priority, arrival) order, so a queued
+    interactive call is never overtaken by background calls.
+    """
+
+    def __init__(self, requests_per_minute: float = 500, tokens_per_minute: float = 200000):
+        """
+        Initialize full buckets.
+
+        Args:
+            requests_per_minute: Request budget per minute
+            tokens_per_minute: Token budget per minute
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._request_rate = requests_per_minute / 60.0
+        self._token_rate = tokens_per_minute / 60.0
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+
+        self._lock = threading.Lock()
+        self._queue: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._stats: Dict[int, Dict[str, float]] = {}
+
+    def acquire(self, tokens: int = 0, priority: int = Priority.BACKGROUND) -> float:
+        """
+        Block until a request of the given token size may be sent.
+
+        Returns:
+            Seconds spent waiting
+        """
+        start = time.monotonic()
+        waiter = self._enqueue(tokens, priority, None)
+        while True:
+            delay = self._dispatch()
+            if waiter.granted:
+                break
+            waiter.event.wait(delay)
+            waiter.event.clear()
+        return self._record_wait(priority, time.monotonic() - start)
+
+    async def aacquire(self, tokens: int = 0, priority: int = Priority.BACKGROUND) -> float:
+        """Async version of acquire; waits without blocking the event loop."""
+        start = time.monotonic()
+        waiter = self._enqueue(tokens, priority, asyncio.get_running_loop())
+        try:
+            while True:
+                delay = self._dispatch()
+                if waiter.granted:
+                    break
+                await asyncio.wait({waiter.future}, timeout=delay)
+                if waiter.future.done():
+                    waiter.future = waiter.loop.create_future()
+        except asyncio.CancelledError:
+            self._cancel(waiter)
+            raise
+        return self._record_wait(priority, time.monotonic() - start)
+
+    def try_acquire(self, tokens: int = 0, priority: int = Priority.BACKGROUND) -> bool:
+        """Take capacity only if it is available now and nobody is queued ahead."""
+        with self._lock:
+            self._refill()
+            tokens = self._clamp(tokens)
+            if self._queue or self._requests < 1 or self._tokens < tokens:
+                return False
+            self._requests -= 1
+            self._tokens -= tokens
+        self._record_wait(priority, 0.0)
+        return True
+
+    def has_capacity(self, tokens: int = 0) -> bool:
+        """Whether a request could be granted now without queueing, without taking capacity."""
+        with self._lock:
+            self._refill()
+            return not self._queue and self._requests >= 1 and self._tokens >= self._clamp(tokens)
+
+    def settle(self, reserved_tokens: int, used_tokens: int) -> None:
+        """Correct the token bucket once the actual usage of a request is known."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.tokens_per_minute, self._tokens + self._clamp(reserved_tokens) - used_tokens)
+        self._dispatch()
+
+    def stats(self) -> Dict[str, Any]:
+        """Grant counts and wait times per priority class, and the current queue length."""
+        with self._lock:
+            self._refill()
+            return {
+                "queued": sum(1 for waiter in self._queue if not waiter.cancelled),
+                "available_requests": self._requests,
+                "available_tokens": self._tokens,
+                "priorities": {
+                    Priority.NAMES.get(priority, str(priority)): {
+                        "granted": int(stats["granted"]),
+                        "avg_wait_seconds": stats["wait"] / stats["granted"] if stats["granted"] else 0.0,
+                        "max_wait_seconds": stats["max_wait"]
+                    }
+                    for priority, stats in sorted(self._stats.items())
+                }
+            }
+
+    def _enqueue(self, tokens: int, priority: int, loop: Optional[asyncio.AbstractEventLoop]) -> _Waiter:
+        waiter = _Waiter(priority, next(self._seq), tokens, loop)
+        with self._lock:
+            heapq.heappush(self._queue, waiter)
+        return waiter
+
+    def _cancel(self, waiter: _Waiter) -> None:
+        with self._lock:
+            waiter.cancelled = True
+            if waiter.granted:
+                # Capacity was granted but will not be used
+                self._requests = min(self.requests_per_minute, self._requests + 1)
+                self._tokens = min(self.tokens_per_minute, self._tokens + self._clamp(waiter.tokens))
+        self._dispatch()
+
+    def _dispatch(self) -> Optional[float]:
+        """
+        Grant waiters in priority order while capacity lasts.
+
+        Returns:
+            Seconds until the first remaining waiter can be granted, or None if none remain
+        """
+        granted = []
+        delay = None
+        with self._lock:
+            self._refill()
+            while self._queue:
+                head = self._queue[0]
+                if head.cancelled:
+                    heapq.heappop(self._queue)
+                    continue
+
+                tokens = self._clamp(head.tokens)
+                if self._requests >= 1 and self._tokens >= tokens:
+                    heapq.heappop(self._queue)
+                    self._requests -= 1
+                    self._tokens -= tokens
+                    head.granted = True
+                    granted.append(head)
+                    continue
+
+                delay = max(
+                    (1 - self._requests) / self._request_rate if self._requests < 1 else 0.0,
+                    (tokens - self._tokens) / self._token_rate if self._tokens < tokens else 0.0
+                )
+                break
+
+        for waiter in granted:
+            waiter.wake()
+        return delay
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(self.requests_per_minute, self._requests + elapsed * self._request_rate)
+        self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self._token_rate)
+
+    def _clamp(self, tokens: int) -> int:
+        # A request larger than the bucket could never be granted; let it drain the full bucket instead
+        return min(max(0, tokens), int(self.tokens_per_minute))
+
+    def _record_wait(self, priority: int, waited: float) -> float:
+        with self._lock:
+            stats = self._stats.setdefault(priority, {"granted": 0, "wait": 0.0, "max_wait": 0.0})
+            stats["granted"] += 1
+            stats["wait"] += waited
+            stats["max_wait"] = max(stats["max_wait"], waited)
+        return waited
+
+
+def estimate_tokens(messages: List[Any], model_name: str,
+                    completion_tokens: int = DEFAULT_COMPLETION_TOKENS) -> int:
+    """Tokens to reserve for a request: the prompt plus the expected completion."""
+    prompt_tokens = 0
+    for message in messages:
+        if isinstance(message, dict):
+            content = message.get("content", "")
+        elif isinstance(message, (tuple, list)):
+            content = message[1]
+        else:
+            content = getattr(message, "content", "")
+        prompt_tokens += count_tokens(str(content), model_name)
+    return prompt_tokens + completion_tokens
+
+
+class LangChainRateLimiter(BaseRateLimiter):
+    """
+    Adapter that lets LangChain chat models (rate_limiter=...) use the shared limiter.
+
+    LangChain does not pass the request to the limiter, so every request
+    reserves a fixed token estimate.
+    """
+
+    def __init__(self, limiter: TokenBucketRateLimiter, priority: int = Priority.INTERACTIVE,
+                 tokens_per_request: int = 1000):
+        self.limiter = limiter
+        self.priority = priority
+        self.tokens_per_request = tokens_per_request
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        if not blocking:
+            return self.limiter.try_acquire(self.tokens_per_request, self.priority)
+        self.limiter.acquire(self.tokens_per_request, self.priority)
+        return True
+
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        if not blocking:
+            return self.limiter.try_acquire(self.tokens_per_request, self.priority)
+        await self.limiter.aacquire(self.tokens_per_request, self.priority)
+        return True
+
+
+_shared_limiter: Optional[TokenBucketRateLimiter] = None
+_shared_lock = threading.Lock()
+
+
+def get_rate_limiter() -> TokenBucketRateLimiter:
+    """
+    Return the limiter shared by every LLM client in the process.
+
+    Limits come from LLM_RATE_LIMIT_RPM and LLM_RATE_LIMIT_TPM (defaults 500
+    requests and 200000 tokens per minute).
+    """
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = TokenBucketRateLimiter(
+                requests_per_minute=float(os.getenv("LLM_RATE_LIMIT_RPM", 500)),
+                tokens_per_minute=float(os.getenv("LLM_RATE_LIMIT_TPM", 200000))
+            )
+        return _shared_limiter
@@ -0,0 +1,161 @@
+import time
+import random
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Optional
+
+try:
+    import openai
+except ImportError:
+    openai = None
+
+from .llm_metrics import current_call
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is rejected because the circuit breaker is open."""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether an error is transient: timeouts, connection errors, rate limits and server errors."""
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+
+    if openai is not None and isinstance(error, (openai.APITimeoutError, openai.APIConnectionError,
+                                                 openai.RateLimitError, openai.InternalServerError)):
+        return True
+
+    status_code = getattr(error, "status_code", None)
+    return isinstance(status_code, int) and (status_code == 429 or status_code >= 500)
+
+
+class RetryPolicy:
+    """
+    Retries transient failures with exponential backoff and full jitter.
+
+    The delay before retry n is uniform in [0, min(max_delay, base_delay * 2**n)].
+    The async path sleeps with asyncio.sleep and bounds every attempt with
+    timeout_seconds; sync callers should pass timeout_seconds to the client
+    instead, since a blocking call cannot be interrupted.
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0,
+                 timeout_seconds: Optional[float] = 30.0, retryable: Callable[[BaseException], bool] = is_retryable):
+        """
+        Initialize the policy.
+
+        Args:
+            max_attempts: Total attempts including the first
+            base_delay: Backoff before the first retry, in seconds
+            max_delay: Upper bound of any backoff, in seconds
+            timeout_seconds: Time limit of a single attempt (None for no limit)
+            retryable: Predicate deciding which errors are retried
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout_seconds = timeout_seconds
+        self.retryable = retryable
+        self._random = random.Random()
+
+    def backoff(self, retry: int) -> float:
+        """Delay before the given retry (0 for the first retry)."""
+        return self._random.uniform(0.0, min(self.max_delay, self.base_delay * (2 ** retry)))
+
+    def call(self, fn: Callable[[], Any]) -> Any:
+        """Call fn, retrying transient failures."""
+        for attempt in range(self.max_attempts):
+            try:
+                return fn()
+            except Exception as e:
+                if attempt + 1 >= self.max_attempts or not self.retryable(e):
+                    raise
+                self._count_retry()
+                time.sleep(self.backoff(attempt))
+
+    async def acall(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Async version of call; every attempt is bounded by timeout_seconds."""
+        for attempt in range(self.max_attempts):
+            try:
+                if self.timeout_seconds is None:
+                    return await fn()
+                return await asyncio.wait_for(fn(), self.timeout_seconds)
+            except Exception as e:
+                if attempt + 1 >= self.max_attempts or not self.retryable(e):
+                    raise
+                self._count_retry()
+                await asyncio.sleep(self.backoff(attempt))
+
+    @staticmethod
+    def _count_retry() -> None:
+        call = current_call()
+        if call is not None:
+            call.retries += 1
+
+
+class CircuitBreaker:
+    """
+    Fails fast while the LLM provider is degraded.
+
+    After failure_threshold consecutive failures the circuit opens and calls
+    are rejected for reset_timeout seconds. Then a single trial call is let
+    through (half-open): success closes the circuit, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Initialize a closed circuit.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a trial call
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        """Whether a call could currently go through, without claiming the trial call."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            return self._cooled_down() and not self._trial_in_flight
+
+    def allow(self) -> bool:
+        """Claim permission for one call."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self._cooled_down() and not self._trial_in_flight:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    print(f"LLM circuit breaker opened after {self.failures} failures")
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def _cooled_down(self) -> bool:
+        return time.monotonic() - self._opened_at >= self.reset_timeout
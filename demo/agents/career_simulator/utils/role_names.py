@@ -0,0 +1,104 @@
+import re
+from functools import lru_cache
+from typing import Optional
+
+# Abbreviations expanded word by word ("Sr. SWE" -> "Senior Software Engineer")
+ROLE_ABBREVIATIONS = {
+    'sr': 'senior',
+    'snr': 'senior',
+    'jr': 'junior',
+    'jnr': 'junior',
+    'assoc': 'associate',
+    'mgr': 'manager',
+    'eng': 'engineer',
+    'engr': 'engineer',
+    'dev': 'developer',
+    'swe': 'software engineer',
+    'sde': 'software engineer',
+    'mle': 'machine learning engineer',
+    'ml': 'machine learning',
+    'sre': 'site reliability engineer',
+    'em': 'engineering manager',
+    'ds': 'data scientist'
+}
+
+# Phrase synonyms applied after abbreviation expansion
+ROLE_SYNONYMS = [
+    (r'\bfront[\s-]?end\b', 'frontend'),
+    (r'\bback[\s-]?end\b', 'backend'),
+    (r'\bfull[\s-]?stack\b', 'full stack'),
+    (r'\bsoftware (?:developer|development engineer)\b', 'software engineer'),
+    (r'\b(frontend|backend|full stack) developer\b', r'\1 engineer'),
+    (r'\bmachine learning developer\b', 'machine learning engineer')
+]
+_ROLE_SYNONYM_PATTERNS = [(re.compile(pattern), replacement) for pattern, replacement in ROLE_SYNONYMS]
+
+# Title families used to group job postings: any title containing the key maps to the value
+JOB_TITLE_FAMILIES = {
+    'software developer': 'Software Engineer',
+    'front end developer': 'Frontend Engineer',
+    'backend developer': 'Backend Engineer',
+    'full stack developer': 'Full Stack Engineer',
+    'data scientist': 'Data Scientist',
+    'data analyst': 'Data Analyst',
+    'data engineer': 'Data Engineer',
+    'machine learning engineer': 'Machine Learning Engineer',
+    'devops engineer': 'DevOps Engineer',
+    'product manager': 'Product Manager',
+    'ux designer': 'UX Designer',
+    'ui designer': 'UI Designer'
+}
+
+# Words written in a fixed case rather than title case
+_FIXED_CASE = {
+    'ai': 'AI', 'bi': 'BI', 'qa': 'QA', 'ui': 'UI', 'ux': 'UX', 'it': 'IT', 'hr': 'HR',
+    'vp': 'VP', 'cto': 'CTO', 'ceo': 'CEO', 'cfo': 'CFO', 'ii': 'II', 'iii': 'III', 'iv': 'IV',
+    'devops': 'DevOps', 'mlops': 'MLOps'
+}
+
+
+@lru_cache(maxsize=4096)
+def canonical_role(role: Optional[str]) -> Optional[str]:
+    """
+    Canonical form of a role name, used for cache keys and data lookups.
+
+    Normalizes case and whitespace, expands abbreviations and maps synonyms,
+    while keeping seniority and specialization: "sr. swe" and "Senior Software
+    Developer" both become "Senior Software Engineer".
+
+    Args:
+        role: Role name as entered by the user or returned by the LLM
+
+    Returns:
+        The canonical role name (empty or None input is returned unchanged)
+    """
+    if not role or not isinstance(role, str):
+        return role
+
+    text = re.sub(r'[.,]', ' ', role.strip().lower())
+    text = ' '.join(ROLE_ABBREVIATIONS.get(word, word) for word in text.split())
+    for pattern, replacement in _ROLE_SYNONYM_PATTERNS:
+        text = pattern.sub(replacement, text)
+
+    return ' '.join(_FIXED_CASE.get(word, word.capitalize()) for word in text.split())
+
+
+def normalize_job_title(title: str) -> str:
+    """
+    Normalize a job posting title for grouping postings.
+
+    Titles that contain one of the JOB_TITLE_FAMILIES keys collapse to that
+    family. When several keys occur, the first key in table order wins, as
+    with the original column-wide replacement (a replaced title no longer
+    contained any lowercase key). All other titles get their canonical role
+    name; missing (NaN) or non-string titles give an empty string.
+    """
+    # NaN and other non-string values would otherwise become "Nan"
+    if not isinstance(title, str) or not title.strip():
+        return ''
+
+    lowered = ' '.join(title.lower().split())
+    for key, family in JOB_TITLE_FAMILIES.items():
+        if key in lowered:
+            return family
+    return canonical_role(title)
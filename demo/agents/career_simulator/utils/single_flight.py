@@ -0,0 +1,105 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Tuple
+
+
+class _Call:
+    """An in-flight call and the callers waiting for its result."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+        self.waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    def result(self) -> Any:
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key.
+
+    The first caller for a key runs the function; callers arriving while it is
+    in flight wait for that result instead of running it again. Threads use
+    do() and coroutines use ado(), and both share the same in-flight calls, so a
+    coroutine can wait on a call started by a thread and vice versa. Errors
+    are propagated to every waiter and nothing is remembered once the call
+    finishes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn for key, or wait for the call already in flight for key."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            return call.result()
+
+        try:
+            value = fn()
+        except BaseException as e:
+            self._finish(key, call, error=e)
+            raise
+        self._finish(key, call, value=value)
+        return value
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Async version of do; fn returns an awaitable."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+                waiter = loop.create_future()
+                call.waiters.append((loop, waiter))
+
+        if not leader:
+            await waiter
+            return call.result()
+
+        try:
+            value = await fn()
+        except BaseException as e:
+            self._finish(key, call, error=e)
+            raise
+        self._finish(key, call, value=value)
+        return value
+
+    def in_flight(self) -> int:
+        """Number of calls currently in flight."""
+        with self._lock:
+            return len(self._calls)
+
+    def _finish(self, key: Hashable, call: _Call, value: Any = None, error: BaseException = None) -> None:
+        """Publish the result of a call and wake its waiters."""
+        with self._lock:
+            self._calls.pop(key, None)
+            call.value = value
+            call.error = error
+            waiters = call.waiters
+
+        call.event.set()
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(_wake, waiter)
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
@@ -0,0 +1,129 @@
+import re
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+# Common skill keywords looked for in posting text
+SKILL_KEYWORDS = (
+    'python', 'java', 'javascript', 'c++', 'sql', 'react', 'aws',
+    'machine learning', 'data analysis', 'cloud', 'agile'
+)
+
+# Bullet point lines, whose text is taken as a skill when it is short
+BULLET_PATTERN = re.compile(r'[•·■◦-]\s*(.*?)(?:\n|$)')
+
+_STOP_WORDS = {'the', 'and', 'or', 'with'}
+
+
+def display_skill(keyword: str) -> str:
+    """Display form of a skill keyword ("sql" -> "SQL", "machine learning" -> "Machine Learning")."""
+    if keyword in ['html', 'css', 'sql', 'aws']:
+        return keyword.upper()
+    if keyword in ['javascript', 'python', 'java', 'c++']:
+        return keyword.capitalize()
+    return ' '.join(word.capitalize() for word in keyword.split())
+
+
+def _keep_skill(skill: str) -> bool:
+    return len(skill) > 2 and len(skill.split()) <= 3 and skill.lower() not in _STOP_WORDS
+
+
+class KeywordMatcher:
+    """
+    Finds which of a set of keywords occur in a text in one pass.
+
+    All keywords are compiled into a single lookahead alternation (longest
+    first) that the regex engine tries at every position, so overlapping
+    occurrences are found; keywords contained in a longer match at the same
+    position ("java" in "javascript") are added from the match. The result is
+    the same as a substring test per keyword.
+    """
+
+    def __init__(self, keywords: Sequence[str]):
+        self.keywords = list(dict.fromkeys(keywords))
+        alternation = '|'.join(re.escape(k) for k in sorted(self.keywords, key=len, reverse=True))
+        self._pattern = re.compile(f'(?=({alternation}))')
+        self._contained: Dict[str, List[str]] = {
+            keyword: [other for other in self.keywords if other in keyword] for keyword in self.keywords
+        }
+
+    def find(self, text: str) -> set:
+        """Keywords occurring in text."""
+        found = set()
+        for match in self._pattern.finditer(text):
+            keyword = match.group(1)
+            if keyword not in found:
+                found.update(self._contained[keyword])
+        return found
+
+
+class PostingSkillMatrix:
+    """
+    Sparse posting x skill incidence matrix in CSR form.
+
+    Skills are extracted once for the whole corpus: keywords with a
+    KeywordMatcher and short bullet point lines with a precompiled regex.
+    Row i lists the skill ids of posting i (indices[indptr[i]:indptr[i + 1]]),
+    so the skills of a set of postings are a column count over their rows.
+    """
+
+    def __init__(self, texts: Iterable[str], keywords: Sequence[str] = SKILL_KEYWORDS):
+        """
+        Build the matrix.
+
+        Args:
+            texts: Lowercased text of each posting, in row order
+            keywords: Skill keywords to look for
+        """
+        matcher = KeywordMatcher(keywords)
+        self.skills: List[str] = []
+        self._skill_ids: Dict[str, int] = {}
+
+        indptr = [0]
+        indices: List[int] = []
+        for text in texts:
+            row = {display_skill(keyword) for keyword in matcher.find(text)}
+            for point in BULLET_PATTERN.findall(text):
+                words = point.split()
+                if 1 <= len(words) <= 5:
+                    row.add(' '.join(word.capitalize() for word in words))
+            indices.extend(self._skill_id(skill) for skill in row if _keep_skill(skill))
+            indptr.append(len(indices))
+
+        self.indptr = np.array(indptr, dtype=np.int64)
+        self.indices = np.array(indices, dtype=np.int64)
+
+    @classmethod
+    def from_arrays(cls, skills: Sequence[str], indptr: np.ndarray, indices: np.ndarray) -> "PostingSkillMatrix":
+        """Restore a matrix from its skill names and CSR arrays (see DataLoader snapshots)."""
+        matrix = cls.__new__(cls)
+        matrix.skills = list(skills)
+        matrix._skill_ids = {skill: i for i, skill in enumerate(matrix.skills)}
+        matrix.indptr = indptr
+        matrix.indices = indices
+        return matrix
+
+    def _skill_id(self, skill: str) -> int:
+        skill_id = self._skill_ids.get(skill)
+        if skill_id is None:
+            skill_id = self._skill_ids[skill] = len(self.skills)
+            self.skills.append(skill)
+        return skill_id
+
+    @property
+    def shape(self) -> tuple:
+        return len(self.indptr) - 1, len(self.skills)
+
+    def skill_counts(self, rows: Sequence[int]) -> np.ndarray:
+        """Number of the given postings that list each skill (column sums over the rows)."""
+        if not len(rows):
+            return np.zeros(len(self.skills), dtype=np.int64)
+        columns = np.concatenate([self.indices[self.indptr[row]:self.indptr[row + 1]] for row in rows])
+        return np.bincount(columns, minlength=len(self.skills))
+
+    def skills_for(self, rows: Sequence[int]) -> List[str]:
+        """Skills listed by any of the given postings, most frequent first."""
+        counts = self.skill_counts(rows)
+        present = np.flatnonzero(counts)
+        order = present[np.argsort(-counts[present], kind='stable')]
+        return [self.skills[skill_id] for skill_id in order]
@@ -0,0 +1,175 @@
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+# Substrings of up to this length are indexed for every vocabulary token
+GRAM_SIZE = 3
+
+_EMPTY = np.empty(0, dtype=np.int64)
+
+
+class LRUCache:
+    """
+    Thread-safe mapping that keeps only the most recently used max_entries entries.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _substrings(token: str, size: int) -> set:
+    return {token[i:i + size] for i in range(len(token) - size + 1)}
+
+
+class TitleIndex:
+    """
+    Inverted index from title tokens to posting row positions.
+
+    Answers the same question as a lowercase substring scan of a title column
+    ("which titles contain this text?") without touching every row. Each
+    whitespace token of the query must occur inside some token of a matching
+    title, so the candidates are the intersection of the posting lists of
+    the vocabulary tokens containing each query token. Those vocabulary
+    tokens are found through an index of their substrings of up to GRAM_SIZE
+    characters: short query tokens are looked up directly, longer ones are
+    checked only against the tokens sharing all their trigrams. Only the
+    candidate rows are checked for the full substring, so a query costs the
+    size of its matches rather than of the vocabulary or the corpus.
+    """
+
+    def __init__(self, titles: Iterable[str], max_cached_tokens: int = 4096):
+        """
+        Build the index.
+
+        Args:
+            titles: Title of each row, in row order
+            max_cached_tokens: Query tokens whose posting lists are kept (least recently used are dropped)
+        """
+        self.titles: List[str] = [str(title).lower() for title in titles]
+
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for row, title in enumerate(self.titles):
+            for token in set(title.split()):
+                postings[token].append(row)
+        self.postings: Dict[str, np.ndarray] = {
+            token: np.array(rows, dtype=np.int64) for token, rows in postings.items()
+        }
+        self._init_lookup(max_cached_tokens)
+
+    @classmethod
+    def from_arrays(cls, titles: Sequence[str], arrays: Dict[str, np.ndarray], vocabulary: Sequence[str],
+                    max_cached_tokens: int = 4096) -> "TitleIndex":
+        """Restore an index saved with to_arrays, without re-tokenizing the titles."""
+        index = cls.__new__(cls)
+        index.titles = [str(title).lower() for title in titles]
+        indptr, rows = arrays["indptr"], arrays["rows"]
+        index.postings = {token: rows[indptr[i]:indptr[i + 1]] for i, token in enumerate(vocabulary)}
+        index._init_lookup(max_cached_tokens)
+        return index
+
+    def _init_lookup(self, max_cached_tokens: int) -> None:
+        self.vocabulary: List[str] = list(self.postings)
+        # Vocabulary token ids by substring, built on the first search
+        self._grams: Optional[Dict[str, np.ndarray]] = None
+        self._grams_lock = threading.Lock()
+        # Posting lists of recent query tokens, built from every vocabulary token containing them
+        self._token_rows = LRUCache(max_cached_tokens)
+
+    def to_arrays(self) -> tuple:
+        """The posting lists as flat arrays ({"indptr", "rows"}) and the vocabulary in the same order."""
+        vocabulary = self.vocabulary
+        lengths = [len(self.postings[token]) for token in vocabulary]
+        indptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        rows = np.concatenate([self.postings[token] for token in vocabulary]) if vocabulary else _EMPTY
+        return {"indptr": indptr, "rows": rows}, vocabulary
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def _gram_index(self) -> Dict[str, np.ndarray]:
+        if self._grams is None:
+            with self._grams_lock:
+                if self._grams is None:
+                    grams: Dict[str, List[int]] = defaultdict(list)
+                    for token_id, token in enumerate(self.vocabulary):
+                        for size in range(1, GRAM_SIZE + 1):
+                            for gram in _substrings(token, size):
+                                grams[gram].append(token_id)
+                    self._grams = {gram: np.array(ids, dtype=np.int64) for gram, ids in grams.items()}
+        return self._grams
+
+    def _vocabulary_containing(self, token: str) -> List[str]:
+        """Vocabulary tokens that contain token."""
+        grams = self._gram_index()
+        if len(token) <= GRAM_SIZE:
+            return [self.vocabulary[token_id] for token_id in grams.get(token, _EMPTY)]
+
+        lists = sorted((grams.get(gram, _EMPTY) for gram in _substrings(token, GRAM_SIZE)), key=len)
+        candidates = lists[0]
+        for ids in lists[1:]:
+            if not len(candidates):
+                break
+            candidates = np.intersect1d(candidates, ids, assume_unique=True)
+        return [self.vocabulary[token_id] for token_id in candidates if token in self.vocabulary[token_id]]
+
+    def _rows_for_token(self, token: str) -> np.ndarray:
+        rows = self._token_rows.get(token)
+        if rows is None:
+            lists = [self.postings[other] for other in self._vocabulary_containing(token)]
+            if len(lists) == 1:
+                rows = lists[0]
+            else:
+                rows = np.unique(np.concatenate(lists)) if lists else _EMPTY
+            self._token_rows[token] = rows
+        return rows
+
+    def search(self, text: str) -> np.ndarray:
+        """
+        Row positions of the titles containing text (case-insensitive).
+
+        Returns:
+            Sorted row positions
+        """
+        text = text.lower()
+        tokens = sorted(set(text.split()), key=len, reverse=True)
+        if not tokens:
+            # Empty or whitespace-only query: nothing to look up
+            return np.array([row for row, title in enumerate(self.titles) if text in title], dtype=np.int64)
+
+        # Intersect the shortest posting lists first
+        lists = sorted((self._rows_for_token(token) for token in tokens), key=len)
+        candidates = lists[0]
+        for rows in lists[1:]:
+            if not len(candidates):
+                break
+            candidates = np.intersect1d(candidates, rows, assume_unique=True)
+
+        if len(tokens) == 1 and text == tokens[0]:
+            return candidates
+        return np.array([row for row in candidates if text in self.titles[row]], dtype=np.int64)
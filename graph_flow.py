@@ -77,7 +77,8 @@
 # # Run the asynchronous chat function
 # asyncio.run(chat())
 import asyncio
-from langchain_openai import ChatOpenAI
+import threading
+import time
 from langchain_core.prompts import ChatPromptTemplate
 from state import CareerBotState
 import json
@@ -88,9 +89,68 @@ import sys
 # Add the demo directory to the Python path to import the agent
 sys.path.append(os.path.join(os.path.dirname(__file__), "demo"))
 from agents.career_simulator.career_simulator_agent import CareerSimulatorAgent
+from agents.career_simulator.models.simulation_executors import executor_from_env
+from agents.career_simulator.utils.data_loader import default_salary_data_path
+from agents.career_simulator.utils.model_router import get_model_router
+from agents.career_simulator.utils.llm_metrics import track_llm_call
+from agents.career_simulator.utils.resilience import RetryPolicy
+from agents.career_simulator.utils.rate_limiter import Priority
+from agents.career_simulator.utils.json_repair import loads_tolerant
 
-# Set up OpenAI client
-llm = ChatOpenAI(model="gpt-4", temperature=0.3, api_key=OPENAI_API_KEY)
+# Transient LLM failures are retried with backoff that does not block the event loop
+llm_retry_policy = RetryPolicy()
+
+# Set up one chat model per tier (LLM_BACKEND=record/replay captures or replays responses offline);
+# data extraction runs on the fast tier, replies shown to the user on the strong tier
+model_router = get_model_router()
+chat_llms = model_router.create_backends(temperature=0.3, api_key=OPENAI_API_KEY, priority=Priority.INTERACTIVE,
+                                         max_timeout=llm_retry_policy.timeout_seconds)
+
+# Chat models bound to a response schema, by (tier, operation)
+structured_chat_llms = {}
+
+async def invoke_chat_model(operation, messages, json_schema=None):
+    """
+    Send messages to the model tier of an operation, with retries and per-tier latency tracking.
+    
+    With a json_schema the model answers through function calling and the response
+    content is JSON arguments matching the schema.
+    """
+    tier = model_router.tier_for(operation)
+    llm = chat_llms[tier.name]
+    if json_schema is not None:
+        key = (tier.name, operation)
+        if key not in structured_chat_llms:
+            structured_chat_llms[key] = llm.bind_schema(operation, json_schema)
+        llm = structured_chat_llms[key]
+    start = time.perf_counter()
+    try:
+        with track_llm_call(operation, llm.model_name) as call:
+            response = await llm_retry_policy.acall(lambda: llm.ainvoke(messages))
+            call.record_usage(messages, response)
+    except Exception:
+        model_router.record(tier, time.perf_counter() - start, error=True)
+        raise
+    model_router.record(tier, time.perf_counter() - start)
+    return response
+
+# Fields extract_career_data returns; the model fills them through function calling
+CAREER_DATA_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "current_role": {"type": ["string", "null"]},
+        "target_role": {"type": ["string", "null"]},
+        "current_level": {"type": ["string", "null"]},
+        "years_experience": {"type": ["integer", "null"]},
+        "current_skills": {"type": "array", "items": {"type": "string"}},
+        "location": {"type": ["string", "null"]},
+        "current_salary": {"type": ["integer", "null"]},
+        "current_company": {"type": ["string", "null"]},
+        "target_companies": {"type": "array", "items": {"type": "string"}},
+        "goals": {"type": ["string", "null"]},
+        "timeline": {"type": ["string", "null"]}
+    }
+}
 
 # Define system prompt
 SYSTEM_PROMPT = """
@@ -114,34 +174,40 @@ Your responses should be conversational and helpful.
 # Initialize CareerSimulatorAgent once to reuse
 def get_career_simulator_agent():
     """Initialize and return the career simulator agent with the correct data files."""
-    # Get the absolute path to the project root directory
-    project_root = os.path.dirname(os.path.abspath(__file__))
-    
-    # Try both possible locations for the data file
-    possible_paths = [
-        os.path.join(project_root, "demo/agents/career_simulator/data/Level_compensation_by_company.csv"),
-        os.path.join(project_root, "data/Level_compensation_by_company.csv")
-    ]
-    
-    # Find which path exists
-    salary_data_path = None
-    for path in possible_paths:
-        if os.path.exists(path):
-            salary_data_path = path
-            break
-    
+    # The agent's bundled compensation data, else the project data directory
+    salary_data_path = default_salary_data_path()
     if not salary_data_path:
         raise FileNotFoundError("Could not find required salary compensation data files")
     
-    # Initialize agent
-    return CareerSimulatorAgent(salary_data_dir=salary_data_path, use_llm=True)
+    # Initialize agent; SIMULATION_EXECUTOR selects where simulations run
+    return CareerSimulatorAgent(salary_data_dir=salary_data_path, use_llm=True, executor=executor_from_env())
 
-# Global instance of the agent that can be reused
-try:
-    career_agent = get_career_simulator_agent()
-except Exception as e:
-    print(f"⚠️ Warning: Could not initialize career simulator agent: {e}")
-    career_agent = None
+# Global instance of the agent, created on first use so chat-only workers never pay for it
+career_agent = None
+_career_agent_failed = False
+_career_agent_init_started = False
+_career_agent_lock = threading.Lock()
+
+def get_career_agent():
+    """Return the shared career simulator agent, creating it on first call (None if it cannot be created)."""
+    global career_agent, _career_agent_failed
+    if career_agent is not None or _career_agent_failed:
+        return career_agent
+    with _career_agent_lock:
+        if career_agent is None and not _career_agent_failed:
+            try:
+                career_agent = get_career_simulator_agent()
+            except Exception as e:
+                print(f"⚠️ Warning: Could not initialize career simulator agent: {e}")
+                _career_agent_failed = True
+    return career_agent
+
+def warmup_career_agent():
+    """Create the career simulator agent and load its data now (e.g. at worker startup)."""
+    agent = get_career_agent()
+    if agent is not None:
+        agent.warmup()
+    return agent
 
 async def run_career_simulation(user_profile):
     """
@@ -158,11 +224,18 @@ async def run_career_simulation(user_profile):
             - current_salary: Current salary
             - current_company: Current employer
             - target_companies: List of target companies
+            - n_steps: Simulation horizon in months
+            - step_resolution: Simulation step length (monthly, quarterly, yearly)
+            - horizon_months: Horizon of the exact outlook in months (defaults to n_steps)
     
     Returns:
         dict: Career simulation results
     """
-    if career_agent is None:
+    agent = career_agent
+    if agent is None or not agent.is_loaded:
+        # Only the first simulation creates the agent and loads its data; keep that off the event loop
+        agent = None if _career_agent_failed else await asyncio.to_thread(warmup_career_agent)
+    if agent is None:
         return {"error": "Career simulator agent not initialized"}
     
     # Ensure minimum required fields are present
@@ -179,7 +252,8 @@ async def run_career_simulation(user_profile):
         "current_company": None,
         "target_companies": [],
         "n_steps": 48,
-        "n_simulations": 1000
+        "n_simulations": 1000,
+        "step_resolution": "monthly"
     }
     
     # Apply defaults for missing fields
@@ -188,8 +262,8 @@ async def run_career_simulation(user_profile):
             user_profile[key] = value
             
     try:
-        # Run the simulation (this can take some time)
-        result = career_agent.process(user_profile)
+        # Run the simulation (this can take some time) without blocking the event loop
+        result = await agent.aprocess(user_profile)
         return result
     except Exception as e:
         return {"error": f"Simulation error: {str(e)}"}
@@ -236,28 +310,59 @@ async def extract_career_data(chat_history):
         messages.append({"role": message["role"], "content": message["content"]})
     
     try:
-        response = await llm.ainvoke(messages)
-        extracted_text = response.content
+        response = await invoke_chat_model("extract_career_data", messages, json_schema=CAREER_DATA_SCHEMA)
         
-        # Extract JSON from response text
+        # Parse tolerantly (code fences, trailing commas, truncation) rather than asking again
         try:
-            # Find JSON content (it might be enclosed in ```json and ```)
-            if "```json" in extracted_text:
-                json_start = extracted_text.find("```json") + 7
-                json_end = extracted_text.find("```", json_start)
-                extracted_text = extracted_text[json_start:json_end].strip()
-            elif "```" in extracted_text:
-                json_start = extracted_text.find("```") + 3
-                json_end = extracted_text.find("```", json_start)
-                extracted_text = extracted_text[json_start:json_end].strip()
-                
-            return json.loads(extracted_text)
-        except json.JSONDecodeError:
-            # If not valid JSON, return empty dict
+            career_data = loads_tolerant(response.content)
+        except ValueError:
+            # If no JSON can be recovered, return empty dict
+            return {}
+        if not isinstance(career_data, dict):
             return {}
     except Exception as e:
         print(f"Error extracting career data: {e}")
         return {}
+    
+    prefetch_career_data(career_data)
+    return career_data
+
+def prefetch_career_data(career_data):
+    """
+    Start warming simulator caches for the roles mentioned in the chat so far.
+    
+    Runs in the background; a later simulation for these roles mostly hits warm caches.
+    Turns before the agent exists only start its creation once and otherwise skip the prefetch.
+    """
+    global _career_agent_init_started
+    if not isinstance(career_data, dict) or _career_agent_failed:
+        return
+    
+    current_role = career_data.get("current_role")
+    target_role = career_data.get("target_role")
+    if not current_role and not target_role:
+        return
+    
+    def prefetch():
+        agent = get_career_agent()
+        if agent is not None:
+            agent.prefetch_roles(current_role, target_role, career_data.get("current_skills") or [])
+    
+    if career_agent is not None:
+        prefetch()
+        return
+    
+    # The first role mentioned creates the agent in the background rather than in the chat turn.
+    # A held lock means the agent is being created already, so don't wait for it here.
+    if not _career_agent_lock.acquire(blocking=False):
+        return
+    try:
+        if _career_agent_init_started:
+            return
+        _career_agent_init_started = True
+    finally:
+        _career_agent_lock.release()
+    threading.Thread(target=prefetch, name="career-agent-init", daemon=True).start()
 
 async def get_career_response(user_input, chat_history):
     """Processes a user query and returns a response from the AI assistant."""
@@ -273,7 +378,7 @@ async def get_career_response(user_input, chat_history):
 
     # Get response from LLM
     try:
-        response = await llm.ainvoke(messages)
+        response = await invoke_chat_model("get_career_response", messages)
         ai_message = response.content
         chat_history.append({"role": "assistant", "content": ai_message})
         return ai_message
@@ -1,10 +1,28 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 import asyncio
-from graph_flow import get_career_response, handle_career_simulation
+import os
+from contextlib import asynccontextmanager
+from graph_flow import get_career_response, handle_career_simulation, warmup_career_agent
+from agents.career_simulator.utils.llm_metrics import get_metrics
+from agents.career_simulator.utils.http_client import aclose_http_clients, http_pool_stats
+from agents.career_simulator.utils.model_router import get_model_router
+from agents.career_simulator.utils.json_repair import repair_stats
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Load the career simulator in the background when CAREER_AGENT_WARMUP=1 (otherwise the
+    first simulation does), and close the shared OpenAI connection pools on shutdown.
+    """
+    if os.getenv("CAREER_AGENT_WARMUP", "").lower() in ("1", "true", "yes"):
+        asyncio.get_running_loop().run_in_executor(None, warmup_career_agent)
+    yield
+    await aclose_http_clients()
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -66,3 +84,25 @@ async def career_simulation(request: SimulationRequest):
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/metrics/llm")
+async def llm_metrics(format: str = "json"):
+    """LLM call latency, token and cache metrics per operation and model (format=json or prometheus)."""
+    if format == "prometheus":
+        return PlainTextResponse(get_metrics().export_prometheus())
+    return get_metrics().snapshot()
+
+@app.get("/metrics/http")
+async def http_metrics():
+    """Connection reuse and pool wait time of the shared OpenAI HTTP clients."""
+    return http_pool_stats()
+
+@app.get("/metrics/tiers")
+async def tier_metrics():
+    """Model, latency budget and call latency of each LLM model tier."""
+    return get_model_router().stats()
+
+@app.get("/metrics/json")
+async def json_parse_metrics():
+    """How many structured LLM responses parsed as-is, needed local repair, or could not be parsed."""
+    return repair_stats()
@@ -0,0 +1,59 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from agents.career_simulator.utils.data_loader import DataLoader
+from agents.career_simulator.utils.data_snapshot import DataSnapshot, pack_frame, unpack_frame
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+
+
+def test_frame_round_trips_through_a_snapshot(tmp_path):
+    frame = pd.DataFrame({
+        "title": ["Data Scientist", None, "Ingénieur", ""],
+        "salary": [120000.5, np.nan, 80000.0, 0.0],
+        "openings": np.array([3, 0, 7, 1], dtype=np.int64),
+        "remote": [True, False, True, False]
+    })
+    source = tmp_path / "source.csv"
+    source.write_text("title\n")
+    arrays = {}
+    layout = pack_frame("postings", frame, arrays)
+
+    snapshot = DataSnapshot(str(tmp_path / "snapshot.npz"))
+    snapshot.save("key", [str(source)], arrays, {"postings": layout})
+    loaded_arrays, meta = snapshot.load("key")
+
+    pd.testing.assert_frame_equal(unpack_frame("postings", meta["postings"], loaded_arrays), frame)
+
+
+def test_snapshot_is_rejected_for_another_key_or_a_changed_source(tmp_path):
+    source = tmp_path / "source.csv"
+    source.write_text("title\nData Scientist\n")
+    snapshot = DataSnapshot(str(tmp_path / "snapshot.npz"))
+    snapshot.save("key", [str(source)], {"values": np.arange(3)})
+
+    assert snapshot.load("other key") is None
+    assert snapshot.load("key") is not None
+
+    source.write_text("title\nData Engineer\n")
+    assert snapshot.load("key") is None
+
+
+@pytest.mark.skipif(not os.path.exists(os.path.join(DATA_DIR, "Level_compensation_by_company.csv")),
+                    reason="project data is not available")
+def test_data_loader_restores_the_same_data_from_its_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATA_SNAPSHOT_DIR", str(tmp_path))
+    monkeypatch.delenv("DATA_SNAPSHOT_DISABLED", raising=False)
+
+    built = DataLoader(DATA_DIR, use_snapshot=False, lazy=False)
+    assert built.save_snapshot() is not None
+    restored = DataLoader(DATA_DIR, lazy=False)
+
+    for name in ("company_salary_data", "general_salary_data", "job_postings_data"):
+        pd.testing.assert_frame_equal(getattr(restored, name), getattr(built, name))
+    for role in ("Software Engineer", "Data Analyst", "manager", "sr. swe"):
+        np.testing.assert_array_equal(restored.matching_posting_ids(role), built.matching_posting_ids(role))
+        assert restored.extract_skills_from_job_posting(role) == built.extract_skills_from_job_posting(role)
@@ -0,0 +1,72 @@
+import os
+import threading
+
+# graph_flow creates its chat model at import time
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import graph_flow  # noqa: E402
+
+CAREER_DATA = {"current_role": "Data Analyst", "target_role": "Data Scientist", "current_skills": ["SQL"]}
+
+
+class FakeAgent:
+    def __init__(self):
+        self.prefetched = []
+
+    def prefetch_roles(self, current_role, target_role, skills):
+        self.prefetched.append((current_role, target_role))
+
+
+def reset_agent(monkeypatch):
+    monkeypatch.setattr(graph_flow, "career_agent", None)
+    monkeypatch.setattr(graph_flow, "_career_agent_failed", False)
+    monkeypatch.setattr(graph_flow, "_career_agent_init_started", False)
+
+
+def wait_for_init_threads():
+    for thread in threading.enumerate():
+        if thread.name == "career-agent-init":
+            thread.join(timeout=5.0)
+
+
+def test_prefetch_starts_agent_creation_once(monkeypatch):
+    reset_agent(monkeypatch)
+    release = threading.Event()
+    created = []
+
+    def create_agent():
+        release.wait(timeout=5.0)
+        created.append(FakeAgent())
+        return created[-1]
+
+    monkeypatch.setattr(graph_flow, "get_career_simulator_agent", create_agent)
+
+    for _ in range(5):
+        graph_flow.prefetch_career_data(CAREER_DATA)
+    assert sum(thread.name == "career-agent-init" for thread in threading.enumerate()) == 1
+
+    release.set()
+    wait_for_init_threads()
+    assert len(created) == 1
+    assert created[0].prefetched == [("Data Analyst", "Data Scientist")]
+
+    # Once the agent exists, later turns prefetch directly
+    graph_flow.prefetch_career_data(CAREER_DATA)
+    assert len(created[0].prefetched) == 2
+
+
+def test_prefetch_skips_when_agent_creation_failed(monkeypatch):
+    reset_agent(monkeypatch)
+
+    def failing_agent():
+        raise FileNotFoundError("no data")
+
+    monkeypatch.setattr(graph_flow, "get_career_simulator_agent", failing_agent)
+
+    graph_flow.prefetch_career_data(CAREER_DATA)
+    wait_for_init_threads()
+    assert graph_flow._career_agent_failed
+
+    monkeypatch.setattr(graph_flow, "_career_agent_init_started", False)
+    graph_flow.prefetch_career_data(CAREER_DATA)
+    assert not any(thread.name == "career-agent-init" for thread in threading.enumerate())
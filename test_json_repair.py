@@ -0,0 +1,48 @@
+import pytest
+
+from agents.career_simulator.utils.json_repair import loads_tolerant, repair_stats
+
+EXPECTED = {"roles": ["Data Analyst", "Data Scientist"], "years": 2, "remote": True, "notes": None}
+
+
+@pytest.mark.parametrize("text", [
+    '{"roles": ["Data Analyst", "Data Scientist"], "years": 2, "remote": true, "notes": null}',
+    'Here you go:\n```json\n{"roles": ["Data Analyst", "Data Scientist"], "years": 2, "remote": true, "notes": null}\n```',
+    'Sure! {"roles": ["Data Analyst", "Data Scientist"], "years": 2, "remote": true, "notes": null} Hope it helps.',
+    '{"roles": ["Data Analyst", "Data Scientist",], "years": 2, "remote": true, "notes": null,}',
+    # A missing comma is recognized when the next value starts on a new line
+    '{\n"roles": ["Data Analyst"\n"Data Scientist"]\n"years": 2\n"remote": true\n"notes": null\n}',
+    "{'roles': ['Data Analyst', 'Data Scientist'], 'years': 2, 'remote': True, 'notes': None}",
+    '{roles: ["Data Analyst", "Data Scientist"], years: 2, remote: true, notes: null}',
+])
+def test_repairs_documented_defects(text):
+    assert loads_tolerant(text) == EXPECTED
+
+
+def test_raw_newlines_and_quotes_in_strings_are_kept():
+    assert loads_tolerant('{"description": "line one\nline two"}') == {"description": "line one\nline two"}
+    assert loads_tolerant('{"title": "the "lead" role"}') == {"title": 'the "lead" role'}
+
+
+def test_truncated_output_keeps_the_complete_part():
+    value = loads_tolerant('{"roles": ["Data Analyst", "Data Scientist"], "years": 2, "notes": "cut of')
+
+    assert value["roles"] == ["Data Analyst", "Data Scientist"]
+    assert value["years"] == 2
+
+
+@pytest.mark.parametrize("text", ["I cannot help with that.", "", None])
+def test_output_without_json_raises_value_error(text):
+    with pytest.raises(ValueError):
+        loads_tolerant(text)
+
+
+def test_outcomes_are_counted():
+    before = repair_stats()
+    loads_tolerant('{"a": 1}')
+    loads_tolerant('{"a": 1,}')
+    with pytest.raises(ValueError):
+        loads_tolerant("no json")
+    after = repair_stats()
+
+    assert {outcome: after[outcome] - before[outcome] for outcome in after} == {"parsed": 1, "repaired": 1, "failed": 1}
@@ -0,0 +1,108 @@
+import json
+import sqlite3
+import time
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from agents.career_simulator.utils import llm_cache, llm_manager
+from agents.career_simulator.utils.llm_backends import LLMBackend
+from agents.career_simulator.utils.llm_cache import LLMResponseCache, TTLCache
+from agents.career_simulator.utils.llm_manager import MARKET_INSIGHTS_TTL_SECONDS, LLMManager
+
+
+class CountingBackend(LLMBackend):
+    model_name = "test-model"
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        return AIMessage(content=json.dumps({
+            "skills": ["Python", "SQL"], "demand_level": "High", "growth_outlook": "Growing"
+        }))
+
+
+class FakeClock:
+    """Stands in for the time module; time() and monotonic() return the same settable clock."""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMResponseCache(str(tmp_path / "responses.sqlite3"))
+
+
+def break_database(cache):
+    with sqlite3.connect(cache.path) as conn:
+        conn.execute("DROP TABLE entries")
+
+
+def test_database_errors_count_as_misses_and_skipped_stores(cache):
+    cache.set("key", {"value": 1})
+    break_database(cache)
+
+    assert cache.get("key") == (False, None, None)
+    cache.set("key", {"value": 2})
+    assert cache.stats()["misses"] == 1
+
+
+def test_getter_returns_the_computed_value_when_the_database_breaks(cache):
+    backend = CountingBackend()
+    manager = LLMManager(use_llm=True, response_cache=cache, backend=backend)
+    break_database(cache)
+
+    skills = manager.get_role_skills("Data Scientist")
+
+    assert skills and backend.calls == 1
+    # The result is still kept in memory
+    assert manager.get_role_skills("Data Scientist") == skills
+    assert backend.calls == 1
+
+
+def test_ttl_cache_entry_can_be_set_with_its_remaining_lifetime(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(llm_cache, "time", clock)
+    cache = TTLCache(ttl_seconds=100)
+
+    cache.set("copy", 1, ttl_seconds=10)
+    cache.set("capped", 2, ttl_seconds=1000)
+    clock.now += 11
+
+    assert "copy" not in cache
+    assert "capped" in cache
+    clock.now += 90
+    assert "capped" not in cache
+
+
+def test_memory_copy_of_a_persistent_hit_expires_with_the_persistent_entry(cache, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(llm_cache, "time", clock)
+    monkeypatch.setattr(llm_manager, "time", clock)
+
+    writer = LLMManager(use_llm=True, response_cache=cache, backend=CountingBackend())
+    insights = writer.get_job_market_insights("Data Scientist")
+
+    # Another process reads the entry from disk shortly before it expires
+    clock.now += MARKET_INSIGHTS_TTL_SECONDS - 60
+    backend = CountingBackend()
+    reader = LLMManager(use_llm=True, response_cache=cache, backend=backend)
+    assert reader.get_job_market_insights("Data Scientist") == insights
+    assert backend.calls == 0
+
+    # Its memory copy must not outlive the stored entry
+    clock.now += 120
+    reader.get_job_market_insights("Data Scientist")
+    assert backend.calls == 1
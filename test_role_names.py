@@ -0,0 +1,36 @@
+import math
+
+import pandas as pd
+import pytest
+
+from agents.career_simulator.utils.role_names import JOB_TITLE_FAMILIES, canonical_role, normalize_job_title
+
+
+def baseline_families(titles):
+    """The column-wide title family replacement normalize_job_title replaced."""
+    normalized = pd.Series(titles).str.lower()
+    for key, family in JOB_TITLE_FAMILIES.items():
+        normalized[normalized.str.contains(key, na=False, regex=False)] = family
+    return normalized.tolist()
+
+
+def test_first_family_in_table_order_wins_like_the_baseline():
+    titles = [
+        "Data Scientist / Data Engineer",
+        "Data Engineer or Data Scientist",
+        "Senior UI Designer and UX Designer",
+        "Software Developer - Product Manager"
+    ]
+    expected = baseline_families(titles)
+
+    assert [normalize_job_title(title) for title in titles] == expected
+    assert expected[:2] == ["Data Scientist", "Data Scientist"]
+
+
+@pytest.mark.parametrize("title", [math.nan, float("nan"), None, 42, "", "   "])
+def test_missing_or_non_string_titles_normalize_to_empty(title):
+    assert normalize_job_title(title) == ""
+
+
+def test_other_titles_get_their_canonical_role():
+    assert normalize_job_title("sr. swe") == canonical_role("Senior Software Developer") == "Senior Software Engineer"
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from agents.career_simulator.models import simulation_engine
+from agents.career_simulator.models.simulation_engine import replay_path, run_simulation
+
+MATRIX = np.array([
+    [0.70, 0.20, 0.05, 0.05],
+    [0.05, 0.70, 0.20, 0.05],
+    [0.00, 0.10, 0.70, 0.20],
+    [0.00, 0.00, 0.00, 1.00]
+])
+TARGET_MASK = np.array([False, False, False, True])
+
+
+def simulate(engine, seed=11, n_simulations=1000):
+    return run_simulation(MATRIX, 0, TARGET_MASK, n_periods=36, n_simulations=n_simulations, seed=seed, engine=engine)
+
+
+@pytest.mark.skipif(not simulation_engine.NUMBA_AVAILABLE, reason="numba is not installed")
+def test_numpy_and_numba_kernels_match_for_a_fixed_seed():
+    numpy_result = simulate("numpy")
+    numba_result = simulate("numba")
+
+    assert numpy_result["engine"] == "numpy"
+    assert numba_result["engine"] == "numba"
+    np.testing.assert_array_equal(numba_result["state_counts"], numpy_result["state_counts"])
+    np.testing.assert_array_equal(numba_result["first_hit"], numpy_result["first_hit"])
+
+
+def test_same_seed_gives_the_same_result_and_other_seeds_differ():
+    first, again, other = simulate("numpy"), simulate("numpy"), simulate("numpy", seed=12)
+
+    np.testing.assert_array_equal(first["first_hit"], again["first_hit"])
+    assert not np.array_equal(first["first_hit"], other["first_hit"])
+
+
+def test_counts_cover_every_walk_and_replayed_paths_agree():
+    result = simulate("numpy", n_simulations=600)
+
+    assert (result["state_counts"].sum(axis=1) == 600).all()
+    for sim_index in (0, 255, 256, 599):
+        path = replay_path(result["spec"], sim_index)
+        hits = np.flatnonzero(TARGET_MASK[path])
+        assert result["first_hit"][sim_index] == (hits[0] if len(hits) else -1)
+
+
+def test_failing_numba_kernel_falls_back_to_numpy(monkeypatch):
+    def broken_kernel(*args):
+        args[-1][0, 0] += 1
+        raise RuntimeError("compilation failed")
+
+    monkeypatch.setattr(simulation_engine, "NUMBA_AVAILABLE", True)
+    monkeypatch.setattr(simulation_engine, "_compiled_kernel", broken_kernel)
+    monkeypatch.setattr(simulation_engine, "_numba_verified", False)
+    monkeypatch.setattr(simulation_engine, "_numba_failed", False)
+
+    result = simulate("numba")
+
+    assert result["engine"] == "numpy"
+    np.testing.assert_array_equal(result["state_counts"], simulate("numpy")["state_counts"])
@@ -0,0 +1,105 @@
+import socket
+import socketserver
+import struct
+import threading
+
+import numpy as np
+import pytest
+
+from agents.career_simulator.models.simulation_engine import run_simulation
+from agents.career_simulator.models.simulation_executors import (
+    InProcessExecutor, LocalProcessExecutor, RemoteExecutor, SimulationWorkerServer,
+    receive_message, send_message
+)
+
+MATRIX = np.array([
+    [0.6, 0.3, 0.1],
+    [0.1, 0.7, 0.2],
+    [0.0, 0.0, 1.0]
+])
+TARGET_MASK = np.array([False, False, True])
+
+
+def simulate(executor=None):
+    return run_simulation(MATRIX, 0, TARGET_MASK, n_periods=10, n_simulations=3000, seed=42,
+                          engine="numpy", executor=executor)
+
+
+def assert_same_result(result, expected):
+    np.testing.assert_array_equal(result["state_counts"], expected["state_counts"])
+    np.testing.assert_array_equal(result["first_hit"], expected["first_hit"])
+
+
+def dead_address():
+    """A localhost address nothing listens on."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()
+
+
+class _MalformedHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        receive_message(self.request)
+        send_message(self.request, {"unexpected": True})
+
+
+@pytest.fixture
+def workers():
+    servers = [SimulationWorkerServer() for _ in range(2)]
+    for server in servers:
+        server.start_background()
+    yield [server.server_address for server in servers]
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_remote_executor_matches_in_process_with_a_dead_worker(workers):
+    expected = simulate(InProcessExecutor())
+
+    with RemoteExecutor([workers[0], dead_address(), workers[1]], timeout=5.0) as executor:
+        assert executor.ping() == [True, False, True]
+        assert_same_result(simulate(executor), expected)
+
+
+def test_remote_executor_fails_over_on_malformed_responses(workers):
+    malformed = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _MalformedHandler)
+    malformed.daemon_threads = True
+    threading.Thread(target=malformed.serve_forever, daemon=True).start()
+    try:
+        with RemoteExecutor([malformed.server_address, workers[0]], timeout=5.0) as executor:
+            assert_same_result(simulate(executor), simulate())
+    finally:
+        malformed.shutdown()
+        malformed.server_close()
+
+
+@pytest.mark.parametrize("body", [b"{not json", b"\xff\xfe"])
+def test_worker_replies_with_an_error_to_undecodable_frames(workers, body):
+    with socket.create_connection(workers[0], timeout=5.0) as sock:
+        sock.sendall(struct.pack(">I", len(body)) + body)
+        assert "Malformed message" in receive_message(sock)["error"]
+        # The worker closes the connection after reporting the bad frame
+        assert sock.recv(1) == b""
+
+    with RemoteExecutor([workers[0]], timeout=5.0) as executor:
+        assert executor.ping() == [True]
+
+
+def test_worker_rejects_non_object_messages(workers):
+    with socket.create_connection(workers[0], timeout=5.0) as sock:
+        send_message(sock, [])
+        assert "expected an object" in receive_message(sock)["error"]
+        send_message(sock, {"type": "ping"})
+        assert receive_message(sock) == {"status": "ok"}
+
+
+def test_remote_executor_raises_when_every_worker_fails():
+    with RemoteExecutor([dead_address()], timeout=5.0) as executor:
+        with pytest.raises(RuntimeError):
+            simulate(executor)
+
+
+def test_local_process_executor_matches_in_process():
+    with LocalProcessExecutor(max_workers=2) as executor:
+        assert_same_result(simulate(executor), simulate(InProcessExecutor()))
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from agents.career_simulator.models.transition_model import CareerTransitionModel
+from agents.career_simulator.utils.llm_manager import LLMManager
+
+PROFILE = {
+    "current_role": "Data Analyst",
+    "current_level": "Entry",
+    "target_role": "Data Scientist",
+    "years_experience": 1
+}
+
+
+@pytest.fixture
+def model():
+    return CareerTransitionModel(LLMManager(use_llm=False, persistent_cache=False), engine="numpy")
+
+
+def test_evaluate_horizon_matches_simulated_success_rate(model):
+    results = model.simulate_career_paths(PROFILE, n_steps=24, n_simulations=20000, seed=3)
+    horizon = model.evaluate_horizon(PROFILE, 24, results["transition_data"])
+
+    assert horizon["reached_target_prob"] == pytest.approx(results["success_rate"], abs=0.01)
+    assert sum(horizon["state_probs"]) == pytest.approx(1.0)
+    assert horizon["target_role_prob"] <= horizon["reached_target_prob"] + 1e-12
+
+
+def test_converting_to_a_finer_resolution_takes_the_matrix_root(model):
+    monthly = np.array(model.create_transition_matrix(PROFILE)["matrix"])
+    yearly = model.convert_transition_matrix(monthly, "yearly")
+
+    root = model.convert_transition_matrix(yearly, "monthly", base_resolution="yearly")
+
+    np.testing.assert_allclose(root.sum(axis=1), 1.0)
+    assert (root >= 0).all()
+    np.testing.assert_allclose(np.linalg.matrix_power(root, 12), yearly, atol=1e-6)